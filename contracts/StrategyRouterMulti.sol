@@ -0,0 +1,497 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.8.28;
+
+import {SafeERC20, IERC20} from "@yearnvaults/contracts/BaseStrategy.sol";
+import {Math} from "@openzeppelin/contracts/utils/math/Math.sol";
+import {IVault} from "contracts/interfaces/IVault.sol";
+import {StrategyRouterV3} from "contracts/StrategyRouterV3.sol";
+import {ShareValueHelper, IYearnVaultV2} from "contracts/ShareValueHelper.sol";
+
+/// @notice StrategyRouterV3 split across several destination vaults, V2 and V3. Our yVault is our first leg, and all of
+///  our accounting (profit, losses, dust, triggers) is StrategyRouterV3's; only how we move want in and out of our
+///  destinations is our own.
+contract StrategyRouterMulti is StrategyRouterV3 {
+    using SafeERC20 for IERC20;
+
+    /* ========== STATE VARIABLES ========== */
+
+    /// @notice The yVaults we are routing this strategy to, both V2 and V3. Our yVault is always the first.
+    address[] public destinations;
+
+    /// @notice Whether a destination is a V3 (ERC-4626) vault. V2 vaults use ShareValueHelper for conversions.
+    mapping(address => bool) public isV3Destination;
+
+    /// @notice Share of our assets we aim to hold in each destination, in basis points (100% = 10_000).
+    mapping(address => uint256) public targetWeight;
+
+    /* ========== CONSTRUCTOR ========== */
+
+    constructor(
+        address _vault,
+        address _yVault,
+        string memory _strategyName
+    ) StrategyRouterV3(_vault, _yVault, _strategyName) {}
+
+    // clones go through StrategyRouterV3's cloneRouterStrategy and initialize, which end up here
+    function _initializeThis(address _yVault, string memory _strategyName)
+        internal
+        virtual
+        override
+    {
+        super._initializeThis(_yVault, _strategyName);
+        destinations.push(_yVault);
+        isV3Destination[_yVault] = true;
+        targetWeight[_yVault] = 10_000;
+    }
+
+    /* ========== VIEWS ========== */
+
+    /// @notice All of the yVaults we currently route to.
+    function getDestinations() external view returns (address[] memory) {
+        return destinations;
+    }
+
+    /// @notice Balance of a given destination's vault tokens sitting in our strategy.
+    function balanceOfDestination(address _destination)
+        public
+        view
+        returns (uint256)
+    {
+        return IERC20(_destination).balanceOf(address(this));
+    }
+
+    /// @notice Balance of underlying we are holding as vault tokens of a given destination.
+    function valueOfDestination(address _destination)
+        public
+        view
+        returns (uint256)
+    {
+        uint256 shares = balanceOfDestination(_destination);
+        if (shares == 0) {
+            return 0;
+        }
+
+        if (isV3Destination[_destination]) {
+            return IVault(_destination).convertToAssets(shares);
+        }
+        return ShareValueHelper.sharesToAmount(_destination, shares, false);
+    }
+
+    /// @notice Balance of underlying we are holding as vault tokens across all of our destinations.
+    function valueOfInvestment()
+        public
+        view
+        virtual
+        override
+        returns (uint256 value)
+    {
+        uint256 length = destinations.length;
+        for (uint256 i; i < length; ++i) {
+            value += valueOfDestination(destinations[i]);
+        }
+    }
+
+    /// @notice Amount of want a given destination will currently accept from us.
+    function depositLimitOfDestination(address _destination)
+        public
+        view
+        returns (uint256)
+    {
+        if (isV3Destination[_destination]) {
+            return IVault(_destination).maxDeposit(address(this));
+        }
+
+        uint256 limit = IYearnVaultV2(_destination).depositLimit();
+        uint256 assets = IYearnVaultV2(_destination).totalAssets();
+        if (limit > assets) {
+            unchecked {
+                return limit - assets;
+            }
+        }
+        return 0;
+    }
+
+    /// @notice Amount of want all of our destinations together will currently accept from us.
+    function availableDepositLimit()
+        public
+        view
+        virtual
+        override
+        returns (uint256 limit)
+    {
+        uint256 length = destinations.length;
+        for (uint256 i; i < length; ++i) {
+            limit += depositLimitOfDestination(destinations[i]);
+        }
+    }
+
+    /// @notice Amount of want we could readily pull from a given destination.
+    /// @dev For V3 this is what the vault will let us withdraw within maxLoss, for V2 it's the vault's idle want.
+    function liquidityOfDestination(address _destination)
+        public
+        view
+        returns (uint256)
+    {
+        uint256 value = valueOfDestination(_destination);
+        if (value == 0) {
+            return 0;
+        }
+
+        if (isV3Destination[_destination]) {
+            return IVault(_destination).maxWithdraw(address(this), maxLoss);
+        }
+        return Math.min(value, want.balanceOf(_destination));
+    }
+
+    /// @notice Not supported here, each leg's liquidity changes as we withdraw from the others.
+    function previewLiquidate(uint256)
+        external
+        pure
+        override
+        returns (
+            uint256,
+            uint256,
+            uint256
+        )
+    {
+        revert("!multi");
+    }
+
+    /* ========== CORE STRATEGY FUNCTIONS ========== */
+
+    function adjustPosition(uint256 _debtOutstanding)
+        internal
+        virtual
+        override
+    {
+        if (emergencyExit) {
+            return;
+        }
+
+        uint256 balance = balanceOfWant();
+        if (balance <= dustThreshold) {
+            return;
+        }
+
+        // value each leg once, we need both the total and the individual values
+        uint256 length = destinations.length;
+        uint256[] memory values = new uint256[](length);
+        uint256 totalAssets = balance;
+        for (uint256 i; i < length; ++i) {
+            values[i] = valueOfDestination(destinations[i]);
+            totalAssets += values[i];
+        }
+
+        // fill our most underweight destination up to its target, then the next, until we run out of want
+        uint256[] memory limits = new uint256[](length);
+        bool[] memory used = new bool[](length);
+        for (uint256 j; j < length && balance > dustThreshold; ++j) {
+            uint256 best = type(uint256).max;
+            uint256 bestHeadroom;
+            for (uint256 i; i < length; ++i) {
+                address destination = destinations[i];
+                uint256 target =
+                    (totalAssets * targetWeight[destination]) / 10_000;
+                if (used[i] || target <= values[i]) {
+                    continue;
+                }
+
+                uint256 headroom;
+                unchecked {
+                    headroom = target - values[i];
+                }
+                if (headroom <= bestHeadroom) {
+                    continue;
+                }
+
+                limits[i] = depositLimitOfDestination(destination);
+                if (limits[i] > dustThreshold) {
+                    best = i;
+                    bestHeadroom = headroom;
+                }
+            }
+
+            if (best == type(uint256).max) {
+                break;
+            }
+
+            // make sure we don't come back to this one
+            used[best] = true;
+            uint256 toDeploy =
+                Math.min(Math.min(balance, bestHeadroom), limits[best]);
+            if (toDeploy <= dustThreshold) {
+                break;
+            }
+
+            _depositToDestination(destinations[best], toDeploy);
+            unchecked {
+                balance -= toDeploy;
+            }
+        }
+
+        // whatever our underweight legs couldn't take goes to any leg with room left, rather than sitting idle
+        for (uint256 i; i < length && balance > dustThreshold; ++i) {
+            uint256 toDeploy =
+                Math.min(balance, depositLimitOfDestination(destinations[i]));
+            if (toDeploy <= dustThreshold) {
+                continue;
+            }
+
+            _depositToDestination(destinations[i], toDeploy);
+            unchecked {
+                balance -= toDeploy;
+            }
+        }
+    }
+
+    function _depositToDestination(address _destination, uint256 _amount)
+        internal
+    {
+        if (isV3Destination[_destination]) {
+            IVault(_destination).deposit(_amount, address(this));
+        } else {
+            IYearnVaultV2(_destination).deposit(_amount);
+        }
+    }
+
+    function liquidatePosition(uint256 _amountNeeded)
+        internal
+        virtual
+        override
+        returns (uint256 _liquidatedAmount, uint256 _loss)
+    {
+        uint256 balance = balanceOfWant();
+        if (balance >= _amountNeeded) {
+            return (_amountNeeded, 0);
+        }
+
+        // pull from our most liquid destinations first
+        uint256 length = destinations.length;
+        uint256[] memory liquidity = new uint256[](length);
+        bool[] memory used = new bool[](length);
+        for (uint256 i; i < length; ++i) {
+            liquidity[i] = liquidityOfDestination(destinations[i]);
+        }
+
+        for (uint256 j; j < length && balance < _amountNeeded; ++j) {
+            uint256 mostLiquid = type(uint256).max;
+            for (uint256 i; i < length; ++i) {
+                if (
+                    !used[i] &&
+                    (mostLiquid == type(uint256).max ||
+                        liquidity[i] > liquidity[mostLiquid])
+                ) {
+                    mostLiquid = i;
+                }
+            }
+
+            // make sure we don't come back to this one, and only ask it for what it can give, the rest falls through
+            used[mostLiquid] = true;
+            uint256 toWithdraw;
+            unchecked {
+                toWithdraw = Math.min(
+                    _amountNeeded - balance,
+                    liquidity[mostLiquid]
+                );
+            }
+            _withdrawFromDestination(destinations[mostLiquid], toWithdraw);
+            balance = balanceOfWant();
+        }
+
+        // V2 vaults pull from their own strategies past their idle want, so they can cover whatever is still missing
+        for (uint256 i; i < length && balance < _amountNeeded; ++i) {
+            address destination = destinations[i];
+            if (isV3Destination[destination]) {
+                continue;
+            }
+
+            unchecked {
+                _withdrawFromDestination(destination, _amountNeeded - balance);
+            }
+            balance = balanceOfWant();
+        }
+
+        return _liquidationResult(_amountNeeded, balance);
+    }
+
+    /// @notice Manually withdraw underlying assets from one of our destination vaults.
+    /// @dev Only governance or management may call this.
+    /// @param _destination The destination vault to withdraw from.
+    /// @param _amount Amount of underlying to withdraw.
+    function withdrawFromDestination(address _destination, uint256 _amount)
+        external
+        onlyVaultManagers
+    {
+        _withdrawFromDestination(_destination, _amount);
+    }
+
+    function _withdrawFromDestination(address _destination, uint256 _amount)
+        internal
+    {
+        if (_amount == 0) {
+            return;
+        }
+
+        uint256 shares;
+        if (isV3Destination[_destination]) {
+            shares = _sharesToWithdraw(IVault(_destination), _amount);
+        } else {
+            shares = Math.min(
+                ShareValueHelper.amountToShares(_destination, _amount, true),
+                balanceOfDestination(_destination)
+            );
+        }
+        _redeem(_destination, shares);
+    }
+
+    function _redeem(address _destination, uint256 _shares) internal {
+        if (_shares == 0) {
+            return;
+        }
+
+        if (isV3Destination[_destination]) {
+            IVault(_destination).redeem(
+                _shares,
+                address(this),
+                address(this),
+                maxLoss
+            );
+        } else {
+            IYearnVaultV2(_destination).withdraw(
+                _shares,
+                address(this),
+                maxLoss
+            );
+        }
+    }
+
+    function liquidateAllPositions()
+        internal
+        virtual
+        override
+        returns (uint256 _amountFreed)
+    {
+        // withdraw as much as we can from each of our destinations, one chunk at a time if we have a chunk size
+        uint256 length = destinations.length;
+        for (uint256 i; i < length; ++i) {
+            uint256 shares = balanceOfDestination(destinations[i]);
+            if (exitChunkSize > 0) {
+                shares = Math.min(shares, exitChunkSize);
+            }
+            _redeem(destinations[i], shares);
+        }
+
+        // return our want balance
+        return balanceOfWant();
+    }
+
+    /// @notice Exit our position by sending every destination's vault tokens to a receiver instead of redeeming them.
+    /// @dev Only governance may call this, and only in emergency exit. Emits ExitedInKind for each destination.
+    /// @param _receiver Address to send our destination vault shares to.
+    function exitInKind(address _receiver)
+        external
+        virtual
+        override
+        onlyGovernance
+    {
+        require(emergencyExit, "!emergencyExit");
+        require(_receiver != address(0), "!receiver");
+        uint256 length = destinations.length;
+        for (uint256 i; i < length; ++i) {
+            address destination = destinations[i];
+            uint256 vaultTokenBalance = balanceOfDestination(destination);
+            uint256 value = valueOfDestination(destination);
+            if (vaultTokenBalance > 0) {
+                IERC20(destination).safeTransfer(_receiver, vaultTokenBalance);
+            }
+
+            emit ExitedInKind(_receiver, vaultTokenBalance, value);
+        }
+    }
+
+    function prepareMigration(address _newStrategy) internal virtual override {
+        uint256 length = destinations.length;
+        for (uint256 i; i < length; ++i) {
+            address destination = destinations[i];
+            uint256 vaultTokenBalance = balanceOfDestination(destination);
+            if (vaultTokenBalance > 0) {
+                IERC20(destination).safeTransfer(
+                    _newStrategy,
+                    vaultTokenBalance
+                );
+            }
+        }
+    }
+
+    /* ========== SETTERS ========== */
+    // These functions are useful for setting parameters of the strategy that may need to be adjusted.
+
+    /// @notice Add a new yVault to route funds to. It starts with a target weight of zero.
+    /// @dev Only governance may call this.
+    /// @param _destination The yVault to add.
+    /// @param _isV3 Whether this is a V3 (ERC-4626) vault or a V2 vault.
+    function addDestination(address _destination, bool _isV3)
+        external
+        onlyGovernance
+    {
+        uint256 length = destinations.length;
+        for (uint256 i; i < length; ++i) {
+            require(destinations[i] != _destination, "already added");
+        }
+
+        if (_isV3) {
+            require(
+                IVault(_destination).asset() == address(want),
+                "wrong want"
+            );
+        } else {
+            require(
+                IYearnVaultV2(_destination).token() == address(want),
+                "wrong want"
+            );
+        }
+
+        destinations.push(_destination);
+        isV3Destination[_destination] = _isV3;
+        want.safeApprove(_destination, type(uint256).max);
+    }
+
+    /// @notice Pull all of our funds out of a yVault and stop routing to it.
+    /// @dev Only governance may call this. Set its target weight to zero first. Our yVault can't be removed.
+    /// @param _destination The yVault to remove.
+    function removeDestination(address _destination) external onlyGovernance {
+        require(_destination != address(yVault), "!yVault");
+        require(targetWeight[_destination] == 0, "!weight");
+        _redeem(_destination, balanceOfDestination(_destination));
+        require(balanceOfDestination(_destination) == 0, "!empty");
+
+        uint256 length = destinations.length;
+        for (uint256 i; i < length; ++i) {
+            if (destinations[i] == _destination) {
+                destinations[i] = destinations[length - 1];
+                destinations.pop();
+                delete isV3Destination[_destination];
+                want.safeApprove(_destination, 0);
+                return;
+            }
+        }
+        revert("!destination");
+    }
+
+    /// @notice Set how we split our assets between our destinations.
+    /// @param _weights Target weights in basis points, in the same order as our destinations. Must add up to 10_000.
+    function setTargetWeights(uint256[] calldata _weights)
+        external
+        onlyVaultManagers
+    {
+        uint256 length = destinations.length;
+        require(_weights.length == length, "!length");
+
+        uint256 total;
+        for (uint256 i; i < length; ++i) {
+            targetWeight[destinations[i]] = _weights[i];
+            total += _weights[i];
+        }
+        require(total == 10_000, "!bps");
+    }
+}
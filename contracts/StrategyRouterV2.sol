@@ -24,6 +24,10 @@ contract StrategyRouterV2 is BaseStrategy {
     /// @notice Amount we accept as a loss in liquidatePosition if we don't get 100% back due to rounding errors.
     uint256 public dustThreshold;
 
+    /// @notice Max destination vault shares an emergency exit harvest redeems at once. Zero means no limit.
+    /// @dev See setExitChunkSize().
+    uint256 public exitChunkSize;
+
     /// @notice Will only be true on the original deployed contract and not on clones; we don't want to clone a clone.
     bool public isOriginal = true;
 
@@ -157,6 +161,44 @@ contract StrategyRouterV2 is BaseStrategy {
             );
     }
 
+    /// @notice Quote the outcome of liquidatePosition for a given amount without touching the destination vault.
+    /// @dev Assumes the destination vault can honor our withdrawal without realizing losses in its own strategies; any such
+    ///  loss on the actual withdrawal would be capped by maxLoss.
+    /// @param _amountNeeded Amount of want we would like to free up.
+    /// @return _liquidatedAmount Amount of want we would free.
+    /// @return _loss Dust-sized loss we would accept.
+    /// @return _sharesBurned Destination vault shares we would withdraw.
+    function previewLiquidate(uint256 _amountNeeded)
+        external
+        view
+        returns (
+            uint256 _liquidatedAmount,
+            uint256 _loss,
+            uint256 _sharesBurned
+        )
+    {
+        uint256 balance = balanceOfWant();
+        if (balance >= _amountNeeded) {
+            return (_amountNeeded, 0, 0);
+        }
+
+        unchecked {
+            _sharesBurned = _sharesToWithdraw(_amountNeeded - balance);
+        }
+
+        uint256 looseWant =
+            balance +
+                ShareValueHelper.sharesToAmount(
+                    address(yVault),
+                    _sharesBurned,
+                    false
+                );
+        (_liquidatedAmount, _loss) = _liquidationResult(
+            _amountNeeded,
+            looseWant
+        );
+    }
+
     /// @notice Balance of underlying we will gain on our next harvest
     function claimableProfits() external view returns (uint256 profits) {
         uint256 assets = estimatedTotalAssets();
@@ -252,13 +294,19 @@ contract StrategyRouterV2 is BaseStrategy {
         // withdraw the remainder we need
         _withdrawFromYVault(toWithdraw);
 
-        uint256 looseWant = balanceOfWant();
+        return _liquidationResult(_amountNeeded, balanceOfWant());
+    }
 
+    function _liquidationResult(uint256 _amountNeeded, uint256 _looseWant)
+        internal
+        view
+        returns (uint256 _liquidatedAmount, uint256 _loss)
+    {
         // because of slippage, dust-sized losses are acceptable
         // however, we don't want to take losses for funds stuck in a strategy in the destination vault
-        if (_amountNeeded > looseWant) {
-            uint256 diff = _amountNeeded - looseWant;
-            _liquidatedAmount = looseWant;
+        if (_amountNeeded > _looseWant) {
+            uint256 diff = _amountNeeded - _looseWant;
+            _liquidatedAmount = _looseWant;
             if (diff < dustThreshold) {
                 _loss = diff;
             }
@@ -274,17 +322,35 @@ contract StrategyRouterV2 is BaseStrategy {
         _withdrawFromYVault(_amount);
     }
 
+    event ExitedInKind(
+        address indexed receiver,
+        uint256 shares,
+        uint256 value
+    );
+
+    /// @notice Exit our position by sending our destination vault shares to a receiver instead of redeeming them.
+    /// @dev Only governance may call this, and only in emergency exit. Useful when the destination vault is impaired and
+    ///  redeeming would be slow or lossy. ExitedInKind records the shares sent out and their value in want, so the
+    ///  loss our next harvest writes off our debt can be reconciled against them.
+    /// @param _receiver Address to send our destination vault shares to.
+    function exitInKind(address _receiver) external onlyGovernance {
+        require(emergencyExit, "!emergencyExit");
+        require(_receiver != address(0), "!receiver");
+        uint256 vaultTokenBalance = balanceOfVault();
+        uint256 value = valueOfInvestment();
+        if (vaultTokenBalance > 0) {
+            IERC20(address(yVault)).safeTransfer(_receiver, vaultTokenBalance);
+        }
+
+        emit ExitedInKind(_receiver, vaultTokenBalance, value);
+    }
+
     function _withdrawFromYVault(uint256 _amount) internal {
         if (_amount == 0) {
             return;
         }
 
-        uint256 _balanceOfYShares = balanceOfVault();
-        uint256 sharesToWithdraw =
-            Math.min(
-                ShareValueHelper.amountToShares(address(yVault), _amount, true),
-                _balanceOfYShares
-            );
+        uint256 sharesToWithdraw = _sharesToWithdraw(_amount);
 
         if (sharesToWithdraw == 0) {
             return;
@@ -293,14 +359,29 @@ contract StrategyRouterV2 is BaseStrategy {
         yVault.withdraw(sharesToWithdraw, address(this), maxLoss);
     }
 
+    function _sharesToWithdraw(uint256 _amount)
+        internal
+        view
+        returns (uint256)
+    {
+        return
+            Math.min(
+                ShareValueHelper.amountToShares(address(yVault), _amount, true),
+                balanceOfVault()
+            );
+    }
+
     function liquidateAllPositions()
         internal
         virtual
         override
         returns (uint256 _amountFreed)
     {
-        // withdraw as much as we can from vault tokens
+        // withdraw as much as we can from vault tokens, one chunk at a time if we have a chunk size
         uint256 vaultTokenBalance = balanceOfVault();
+        if (exitChunkSize > 0) {
+            vaultTokenBalance = Math.min(vaultTokenBalance, exitChunkSize);
+        }
         if (vaultTokenBalance > 0) {
             yVault.withdraw(vaultTokenBalance, address(this), maxLoss);
         }
@@ -358,4 +439,17 @@ contract StrategyRouterV2 is BaseStrategy {
         require(_dustThreshold < 1e6, "Your size is too much size");
         dustThreshold = _dustThreshold;
     }
+
+    /// @notice Limit how many destination vault shares each emergency exit harvest redeems.
+    /// @dev With a chunk size set, an emergency exit winds down over several harvests instead of redeeming our whole
+    ///  position at once, bounding each transaction's gas and maxLoss. Like any emergency harvest that can't free
+    ///  everything, the first one reports what's still in our destination as a loss, and every later chunk comes back
+    ///  as profit. Progress is simply our remaining share balance, so harvests resume where they left off.
+    /// @param _exitChunkSize Max shares of our destination vault to redeem per emergency harvest, zero for no limit.
+    function setExitChunkSize(uint256 _exitChunkSize)
+        external
+        onlyEmergencyAuthorized
+    {
+        exitChunkSize = _exitChunkSize;
+    }
 }
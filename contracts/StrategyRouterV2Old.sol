@@ -3,6 +3,7 @@ pragma solidity ^0.8.15;
 
 import "@yearnvaults/contracts/BaseStrategy.sol";
 import "@openzeppelin/contracts/utils/math/Math.sol";
+import {IOracle} from "contracts/interfaces/IOracle.sol";
 
 interface IVault is IERC20 {
     function token() external view returns (address);
@@ -28,14 +29,6 @@ interface IVault is IERC20 {
     ) external returns (uint256);
 }
 
-interface IOracle {
-    // pull our asset price, in usdc, via yearn's oracle
-    function getPriceUsdcRecommended(address tokenAddress)
-        external
-        view
-        returns (uint256);
-}
-
 interface IHelper {
     function sharesToAmount(address vault, uint256 shares)
         external
@@ -74,6 +67,20 @@ contract StrategyRouterV2Old is BaseStrategy {
     /// @notice Amount we accept as a loss in liquidatePosition if we don't get 100% back due to rounding errors.
     uint256 public dustThreshold;
 
+    /// @notice Price of one want token in USDC (6 decimals) as of wantPriceUpdated.
+    /// @dev Cached so keepers polling harvestTrigger don't pay for a lens oracle call every time.
+    uint256 public wantPriceInUsdc;
+
+    /// @notice Timestamp of our last cached want price.
+    uint256 public wantPriceUpdated;
+
+    /// @notice Oldest our cached want price can be before harvestTrigger goes back to asking the oracle directly.
+    uint256 public maxPriceAge;
+
+    /// @notice Yearn's lens oracle, which we use to price our profit in USDC.
+    IOracle public constant yearnOracle =
+        IOracle(0x83d95e0D5f402511dB06817Aff3f9eA88224B030);
+
     /// @notice Will only be true on the original deployed contract and not on clones; we don't want to clone a clone.
     bool public isOriginal = true;
 
@@ -160,6 +167,7 @@ contract StrategyRouterV2Old is BaseStrategy {
         harvestProfitMinInUsdc = 5_000e6;
         harvestProfitMaxInUsdc = 50_000e6;
         dustThreshold = 10;
+        maxPriceAge = 1 days;
     }
 
     /* ========== VIEWS ========== */
@@ -227,6 +235,9 @@ contract StrategyRouterV2Old is BaseStrategy {
             uint256 _debtPayment
         )
     {
+        // keep our price for harvestTrigger fresh while we're already paying for a harvest
+        _updateWantPrice();
+
         // serious loss should never happen, but if it does, let's record it accurately
         uint256 assets = estimatedTotalAssets();
         uint256 debt = delegatedAssets();
@@ -453,18 +464,40 @@ contract StrategyRouterV2Old is BaseStrategy {
     }
 
     /// @notice Calculates the profit if all claimable assets were sold for USDC (6 decimals).
-    /// @dev Uses yearn's lens oracle, if returned values are strange then troubleshoot there.
+    /// @dev Uses our cached want price while it's fresh, otherwise yearn's lens oracle. If returned values are strange
+    ///  then troubleshoot there.
     /// @return Total return in USDC from taking profits on yToken gains.
     function claimableProfitInUsdc() public view returns (uint256) {
-        IOracle yearnOracle =
-            IOracle(0x83d95e0D5f402511dB06817Aff3f9eA88224B030); // yearn lens oracle
-        uint256 underlyingPrice =
-            yearnOracle.getPriceUsdcRecommended(address(want));
+        uint256 underlyingPrice = wantPriceInUsdc;
+        if (block.timestamp - wantPriceUpdated > maxPriceAge) {
+            underlyingPrice = yearnOracle.getPriceUsdcRecommended(
+                address(want)
+            );
+        }
 
         // Oracle returns prices as 6 decimals, so multiply by claimable amount and divide by token decimals
         return (claimableProfits() * underlyingPrice) / (10**yVault.decimals());
     }
 
+    /// @notice Refresh our cached want price from yearn's lens oracle.
+    /// @dev Permissionless, since all it does is copy the oracle's price. Keepers may call this to keep triggers cheap.
+    function updateWantPrice() external {
+        _updateWantPrice();
+    }
+
+    // a bad oracle read shouldn't ever block a harvest, we just keep our old price (and it eventually goes stale)
+    function _updateWantPrice() internal {
+        if (address(yearnOracle).code.length == 0) {
+            return;
+        }
+        try yearnOracle.getPriceUsdcRecommended(address(want)) returns (
+            uint256 price
+        ) {
+            wantPriceInUsdc = price;
+            wantPriceUpdated = block.timestamp;
+        } catch {}
+    }
+
     /* ========== SETTERS ========== */
     // These functions are useful for setting parameters of the strategy that may need to be adjusted.
 
@@ -500,4 +533,10 @@ contract StrategyRouterV2Old is BaseStrategy {
         harvestProfitMinInUsdc = _harvestProfitMinInUsdc;
         harvestProfitMaxInUsdc = _harvestProfitMaxInUsdc;
     }
+
+    /// @notice Set how old our cached want price can get before harvestTrigger asks the oracle directly again.
+    /// @param _maxPriceAge Max age in seconds, zero to always use the oracle.
+    function setMaxPriceAge(uint256 _maxPriceAge) external onlyVaultManagers {
+        maxPriceAge = _maxPriceAge;
+    }
 }
@@ -9,6 +9,7 @@ import {
 } from "@yearnvaults/contracts/BaseStrategy.sol";
 import {Math} from "@openzeppelin/contracts/utils/math/Math.sol";
 import {IVault} from "contracts/interfaces/IVault.sol";
+import {IOracle} from "contracts/interfaces/IOracle.sol";
 
 contract StrategyRouterV3 is BaseStrategy {
     using SafeERC20 for IERC20;
@@ -24,6 +25,29 @@ contract StrategyRouterV3 is BaseStrategy {
     /// @notice Amount we accept as a loss in liquidatePosition if we don't get 100% back due to rounding errors.
     uint256 public dustThreshold;
 
+    /// @notice Max destination vault shares an emergency exit harvest redeems at once. Zero means no limit.
+    /// @dev See setExitChunkSize().
+    uint256 public exitChunkSize;
+
+    /// @notice Whether our keeper triggers account for how much our destination vault will still accept.
+    /// @dev When true, we don't harvest for credit we couldn't deploy, our harvests offer back idle want our destination
+    ///  won't take, and we tend once room opens up for it.
+    bool public capacityAware;
+
+    /// @notice Harvest once our claimable profit is worth this many times our keeper's call cost. Zero turns this off.
+    uint256 public profitFactor;
+
+    /// @notice Want (in wei) that one ETH was worth as of our last refresh.
+    /// @dev Cached so our harvestTrigger never has to call an oracle. Zero until we have a price.
+    uint256 public wantPerEth;
+
+    /// @notice Oracle we price want and ETH with in USDC, only read when a keeper refreshes wantPerEth.
+    /// @dev Unset by default, see setOracle().
+    IOracle public oracle;
+
+    /// @notice WETH's address on this chain, as our oracle prices it.
+    address public weth;
+
     /// @notice Will only be true on the original deployed contract and not on clones; we don't want to clone a clone.
     bool public isOriginal = true;
 
@@ -104,6 +128,7 @@ contract StrategyRouterV3 is BaseStrategy {
 
     function _initializeThis(address _yVault, string memory _strategyName)
         internal
+        virtual
     {
         require(IVault(_yVault).asset() == address(want), "wrong want");
         yVault = IVault(_yVault);
@@ -148,12 +173,50 @@ contract StrategyRouterV3 is BaseStrategy {
     }
 
     /// @notice Balance of underlying we are holding as vault tokens of our delegated vault.
-    function valueOfInvestment() public view returns (uint256) {
+    function valueOfInvestment() public view virtual returns (uint256) {
         return yVault.convertToAssets(balanceOfVault());
     }
 
+    /// @notice Amount of want our destination vault will currently accept from us.
+    function availableDepositLimit() public view virtual returns (uint256) {
+        return yVault.maxDeposit(address(this));
+    }
+
+    /// @notice Quote the outcome of liquidatePosition for a given amount without touching the destination vault.
+    /// @dev Uses the same share math as liquidatePosition, so once we need more than our destination's idle funds,
+    ///  shares are capped at what it will let us redeem within maxLoss.
+    /// @param _amountNeeded Amount of want we would like to free up.
+    /// @return _liquidatedAmount Amount of want we would free.
+    /// @return _loss Dust-sized loss we would accept.
+    /// @return _sharesBurned Destination vault shares we would redeem.
+    function previewLiquidate(uint256 _amountNeeded)
+        external
+        view
+        virtual
+        returns (
+            uint256 _liquidatedAmount,
+            uint256 _loss,
+            uint256 _sharesBurned
+        )
+    {
+        uint256 balance = balanceOfWant();
+        if (balance >= _amountNeeded) {
+            return (_amountNeeded, 0, 0);
+        }
+
+        unchecked {
+            _sharesBurned = _sharesToWithdraw(yVault, _amountNeeded - balance);
+        }
+
+        uint256 looseWant = balance + yVault.previewRedeem(_sharesBurned);
+        (_liquidatedAmount, _loss) = _liquidationResult(
+            _amountNeeded,
+            looseWant
+        );
+    }
+
     /// @notice Balance of underlying we will gain on our next harvest
-    function claimableProfits() external view returns (uint256 profits) {
+    function claimableProfits() public view returns (uint256 profits) {
         uint256 assets = estimatedTotalAssets();
         uint256 debt = delegatedAssets();
 
@@ -189,6 +252,12 @@ contract StrategyRouterV3 is BaseStrategy {
             }
             _debtPayment = _debtOutstanding;
 
+            // want our destination can't take goes back to our vault instead of sitting idle. our vault only takes
+            // up to what it's asking back from us, the rest waits for room to open up
+            if (capacityAware) {
+                _debtPayment = Math.max(_debtPayment, _excessWant(_profit));
+            }
+
             uint256 toFree = _profit + _debtPayment;
 
             // freed is math.min(wantBalance, toFree)
@@ -213,6 +282,21 @@ contract StrategyRouterV3 is BaseStrategy {
         }
     }
 
+    // loose want past what our destination will take, after paying out our profit
+    function _excessWant(uint256 _profit)
+        internal
+        view
+        returns (uint256 _excess)
+    {
+        uint256 looseWant = balanceOfWant();
+        uint256 room = availableDepositLimit() + _profit;
+        if (looseWant > room) {
+            unchecked {
+                _excess = looseWant - room;
+            }
+        }
+    }
+
     function adjustPosition(uint256 _debtOutstanding)
         internal
         virtual
@@ -222,8 +306,7 @@ contract StrategyRouterV3 is BaseStrategy {
             return;
         }
 
-        uint256 toDeploy =
-            Math.min(balanceOfWant(), yVault.maxDeposit(address(this)));
+        uint256 toDeploy = Math.min(balanceOfWant(), availableDepositLimit());
 
         if (toDeploy > dustThreshold) {
             yVault.deposit(toDeploy, address(this));
@@ -249,13 +332,19 @@ contract StrategyRouterV3 is BaseStrategy {
         // withdraw the remainder we need
         _withdrawFromYVault(toWithdraw);
 
-        uint256 looseWant = balanceOfWant();
+        return _liquidationResult(_amountNeeded, balanceOfWant());
+    }
 
+    function _liquidationResult(uint256 _amountNeeded, uint256 _looseWant)
+        internal
+        view
+        returns (uint256 _liquidatedAmount, uint256 _loss)
+    {
         // because of slippage, dust-sized losses are acceptable
         // however, we don't want to take losses for funds stuck in a strategy in the destination vault
-        if (_amountNeeded > looseWant) {
-            uint256 diff = _amountNeeded - looseWant;
-            _liquidatedAmount = looseWant;
+        if (_amountNeeded > _looseWant) {
+            uint256 diff = _amountNeeded - _looseWant;
+            _liquidatedAmount = _looseWant;
             if (diff < dustThreshold) {
                 _loss = diff;
             }
@@ -271,13 +360,35 @@ contract StrategyRouterV3 is BaseStrategy {
         _withdrawFromYVault(_amount);
     }
 
+    event ExitedInKind(
+        address indexed receiver,
+        uint256 shares,
+        uint256 value
+    );
+
+    /// @notice Exit our position by sending our destination vault shares to a receiver instead of redeeming them.
+    /// @dev Only governance may call this, and only in emergency exit. Useful when the destination vault is impaired and
+    ///  redeeming would be slow or lossy. ExitedInKind records the shares sent out and their value in want, so the
+    ///  loss our next harvest writes off our debt can be reconciled against them.
+    /// @param _receiver Address to send our destination vault shares to.
+    function exitInKind(address _receiver) external virtual onlyGovernance {
+        require(emergencyExit, "!emergencyExit");
+        require(_receiver != address(0), "!receiver");
+        uint256 vaultTokenBalance = balanceOfVault();
+        uint256 value = valueOfInvestment();
+        if (vaultTokenBalance > 0) {
+            IERC20(address(yVault)).safeTransfer(_receiver, vaultTokenBalance);
+        }
+
+        emit ExitedInKind(_receiver, vaultTokenBalance, value);
+    }
+
     function _withdrawFromYVault(uint256 _amount) internal {
         if (_amount == 0) {
             return;
         }
 
-        uint256 sharesToWithdraw =
-            Math.min(yVault.previewWithdraw(_amount), balanceOfVault());
+        uint256 sharesToWithdraw = _sharesToWithdraw(yVault, _amount);
 
         if (sharesToWithdraw == 0) {
             return;
@@ -286,14 +397,40 @@ contract StrategyRouterV3 is BaseStrategy {
         yVault.redeem(sharesToWithdraw, address(this), address(this), maxLoss);
     }
 
+    // shares of a V3 vault we'd redeem to get _amount of want back
+    function _sharesToWithdraw(IVault _destination, uint256 _amount)
+        internal
+        view
+        returns (uint256)
+    {
+        uint256 shares =
+            Math.min(
+                _destination.previewWithdraw(_amount),
+                _destination.balanceOf(address(this))
+            );
+
+        // past its idle funds our destination has to pull from its strategies, and redeeming more than it can get
+        // back within maxLoss reverts. maxRedeem walks its whole queue, so we only ask when we need to
+        if (_amount > _destination.totalIdle()) {
+            shares = Math.min(
+                shares,
+                _destination.maxRedeem(address(this), maxLoss)
+            );
+        }
+        return shares;
+    }
+
     function liquidateAllPositions()
         internal
         virtual
         override
         returns (uint256 _amountFreed)
     {
-        // withdraw as much as we can from vault tokens
+        // withdraw as much as we can from vault tokens, one chunk at a time if we have a chunk size
         uint256 vaultTokenBalance = balanceOfVault();
+        if (exitChunkSize > 0) {
+            vaultTokenBalance = Math.min(vaultTokenBalance, exitChunkSize);
+        }
         if (vaultTokenBalance > 0) {
             yVault.redeem(
                 vaultTokenBalance,
@@ -322,7 +459,7 @@ contract StrategyRouterV3 is BaseStrategy {
     {}
 
     /// @notice Convert our keeper's eth cost into want
-    /// @dev We don't use this since we don't factor call cost into our harvestTrigger.
+    /// @dev Uses the rate cached at our last refresh, so this is zero until we have one.
     /// @param _amtInWei Amount of ether spent.
     /// @return Value of ether in want.
     function ethToWant(uint256 _amtInWei)
@@ -331,7 +468,121 @@ contract StrategyRouterV3 is BaseStrategy {
         virtual
         override
         returns (uint256)
-    {}
+    {
+        return (_amtInWei * wantPerEth) / 1e18;
+    }
+
+    // a bad oracle read shouldn't ever block a harvest, we just keep our old price
+    function _updateWantPerEth() internal {
+        // nothing to ask until we've set an oracle
+        if (address(oracle).code.length == 0) {
+            return;
+        }
+        try oracle.getPriceUsdcRecommended(address(want)) returns (
+            uint256 wantPrice
+        ) {
+            if (wantPrice == 0) {
+                return;
+            }
+            try oracle.getPriceUsdcRecommended(weth) returns (
+                uint256 ethPrice
+            ) {
+                // oracle returns prices as 6 decimals, so both cancel out and we scale to want's decimals
+                wantPerEth =
+                    (ethPrice * (10**uint256(yVault.decimals()))) /
+                    wantPrice;
+            } catch {}
+        } catch {}
+    }
+
+    /* ========== KEEP3RS ========== */
+
+    /**
+     * @notice
+     *  Provide a signal to the keeper that harvest() should be called.
+     *
+     *  Builds on BaseStrategy's trigger. If we are capacity aware, we don't
+     *  harvest for credit our destination vault couldn't take. If we have a
+     *  profit factor, we also harvest once our profit covers our keeper's call
+     *  cost that many times over, priced with our cached rate so we never call
+     *  an oracle here.
+     *
+     * @param callCostinEth The keeper's estimated gas cost to call harvest() (in wei).
+     * @return True if harvest() should be called, false otherwise.
+     */
+    function harvestTrigger(uint256 callCostinEth)
+        public
+        view
+        virtual
+        override
+        returns (bool)
+    {
+        if (super.harvestTrigger(callCostinEth)) {
+            // the base trigger also fires for credit, only harvest that if there's somewhere to put it
+            if (
+                !capacityAware ||
+                forceHarvestTriggerOnce ||
+                availableDepositLimit() > dustThreshold
+            ) {
+                return true;
+            }
+
+            StrategyParams memory params = vault.strategies(address(this));
+            if (block.timestamp - params.lastReport >= maxReportDelay) {
+                return true;
+            }
+        } else if (!isActive() || !isBaseFeeAcceptable()) {
+            return false;
+        }
+
+        return _profitCoversCallCost(callCostinEth);
+    }
+
+    // harvest once our profit is worth enough more than it costs our keeper to claim it. a free call isn't a signal
+    function _profitCoversCallCost(uint256 callCostinEth)
+        internal
+        view
+        returns (bool)
+    {
+        if (callCostinEth == 0 || profitFactor == 0 || wantPerEth == 0) {
+            return false;
+        }
+        return claimableProfits() > profitFactor * ethToWant(callCostinEth);
+    }
+
+    /**
+     * @notice
+     *  Provide a signal to the keeper that tend() should be called.
+     *
+     *  Only used when we are capacity aware. If want is sitting idle because our
+     *  destination vault was full and it now has room again, deploy it. We only
+     *  re-check capacity: tend() just deposits, so we fire once the want our
+     *  destination will take is above creditThreshold, the same bar harvestTrigger
+     *  uses for credit, and call cost is left to the keeper's base fee check.
+     *
+     * @param callCostinEth Unused, kept to match BaseStrategy's signature.
+     * @return True if tend() should be called, false otherwise.
+     */
+    function tendTrigger(uint256 callCostinEth)
+        public
+        view
+        virtual
+        override
+        returns (bool)
+    {
+        if (!capacityAware || emergencyExit) {
+            return false;
+        }
+
+        // check if the base fee gas price is higher than we allow. if it is, block tends.
+        if (!isBaseFeeAcceptable()) {
+            return false;
+        }
+
+        return
+            Math.min(balanceOfWant(), availableDepositLimit()) >
+            creditThreshold;
+    }
 
     /* ========== SETTERS ========== */
     // These functions are useful for setting parameters of the strategy that may need to be adjusted.
@@ -353,4 +604,49 @@ contract StrategyRouterV3 is BaseStrategy {
         require(_dustThreshold < 1e6, "Your size is too much size");
         dustThreshold = _dustThreshold;
     }
+
+    /// @notice Limit how many destination vault shares each emergency exit harvest redeems.
+    /// @dev With a chunk size set, an emergency exit winds down over several harvests instead of redeeming our whole
+    ///  position at once, bounding each transaction's gas and maxLoss. Like any emergency harvest that can't free
+    ///  everything, the first one reports what's still in our destination as a loss, and every later chunk comes back
+    ///  as profit. Progress is simply our remaining share balance, so harvests resume where they left off.
+    /// @param _exitChunkSize Max shares of our destination vault to redeem per emergency harvest, zero for no limit.
+    function setExitChunkSize(uint256 _exitChunkSize)
+        external
+        onlyEmergencyAuthorized
+    {
+        exitChunkSize = _exitChunkSize;
+    }
+
+    /// @notice Set how many times over our profit must cover our keeper's call cost before we harvest on it.
+    /// @param _profitFactor Multiple of call cost, zero to never harvest on profit alone.
+    function setProfitFactor(uint256 _profitFactor) external onlyVaultManagers {
+        profitFactor = _profitFactor;
+    }
+
+    /// @notice Refresh our cached want/ETH rate.
+    /// @dev Keepers call this on their own schedule, so our harvests never pay for oracle calls.
+    function updateWantPerEth() external onlyKeepers {
+        _updateWantPerEth();
+    }
+
+    /// @notice Set the oracle we refresh wantPerEth from.
+    /// @dev On mainnet, yearn's lens oracle is 0x83d95e0D5f402511dB06817Aff3f9eA88224B030 and WETH is
+    ///  0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2. Set a zero oracle to stop refreshing and keep our last rate.
+    /// @param _oracle Oracle pricing tokens in USDC with getPriceUsdcRecommended().
+    /// @param _weth WETH's address on this chain.
+    function setOracle(address _oracle, address _weth)
+        external
+        onlyVaultManagers
+    {
+        oracle = IOracle(_oracle);
+        weth = _weth;
+    }
+
+    /// @notice Set whether our keeper triggers account for our destination vault's remaining deposit capacity.
+    /// @param _capacityAware True to skip harvesting credit we couldn't deploy, to pay back idle want our destination
+    ///  won't take, and to tend idle want once room opens up.
+    function setCapacityAware(bool _capacityAware) external onlyVaultManagers {
+        capacityAware = _capacityAware;
+    }
 }
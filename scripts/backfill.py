@@ -0,0 +1,230 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from brownie import Contract, chain, interface, web3
+import click
+from scripts.tvl import view
+from scripts.uint256 import Uint256Array
+
+# per-block history of a router since it was deployed, one append-only file per column so we can stop and pick up
+# where we left off, and load any one series straight into numpy
+COLUMNS = (
+    "block",
+    "estimatedTotalAssets",
+    "valueOfInvestment",
+    "pricePerShare",
+    "totalDebt",
+)
+BLOCK_BYTES = 8
+VALUE_BYTES = 32
+
+ROUTER_ABI = [
+    view("estimatedTotalAssets"),
+    view("valueOfInvestment"),
+    view("vault", output="address"),
+    view("yVault", output="address"),
+]
+DESTINATION_ABI = [view("pricePerShare")]
+
+# Multicall3 lives at the same address on mainnet and every chain we'd run on. we batch with its tryAggregate
+# ourselves, since brownie's multicall keeps its address and contract on one object every thread shares
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL_ABI = [
+    {
+        "name": "tryAggregate",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [
+            {"name": "requireSuccess", "type": "bool"},
+            {
+                "name": "calls",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "callData", "type": "bytes"},
+                ],
+            },
+        ],
+        "outputs": [
+            {
+                "name": "returnData",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"},
+                ],
+            }
+        ],
+    }
+]
+
+
+class ColumnStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def file(self, column):
+        return self.path / f"{column}.bin"
+
+    @staticmethod
+    def width(column):
+        return BLOCK_BYTES if column == "block" else VALUE_BYTES
+
+    # rows every column has in full. anything past that is from a write we didn't finish, so trim it off
+    def repair(self):
+        rows = min(
+            os.path.getsize(self.file(x)) // self.width(x)
+            if self.file(x).exists()
+            else 0
+            for x in COLUMNS
+        )
+        for column in COLUMNS:
+            if self.file(column).exists():
+                os.truncate(self.file(column), rows * self.width(column))
+        return rows
+
+    def last_block(self):
+        rows = self.repair()
+        if rows == 0:
+            return None
+        with open(self.file("block"), "rb") as f:
+            f.seek((rows - 1) * BLOCK_BYTES)
+            return int.from_bytes(f.read(BLOCK_BYTES), "little")
+
+    # write our block column last, so a row only counts once everything else for it is on disk
+    def append(self, rows):
+        if not rows:
+            return
+        for column in COLUMNS[1:] + COLUMNS[:1]:
+            index = COLUMNS.index(column)
+            width = self.width(column)
+            with open(self.file(column), "ab") as f:
+                f.write(b"".join(row[index].to_bytes(width, "little") for row in rows))
+                f.flush()
+                os.fsync(f.fileno())
+
+    # blocks as a uint64 array, everything else as our uint256 arrays
+    def load(self):
+        rows = self.repair()
+        data = {}
+        for column in COLUMNS:
+            raw = self.file(column).read_bytes() if rows else b""
+            if column == "block":
+                data[column] = np.frombuffer(raw, dtype="<u8")
+            else:
+                limbs = np.frombuffer(raw, dtype="<u4").reshape(rows, 8)
+                data[column] = Uint256Array(limbs.T)
+        return data
+
+
+# first block our contract has code at, needs an archive node
+def deployment_block(address, end=None):
+    (low, high) = (0, end or chain.height)
+    while low < high:
+        middle = (low + high) // 2
+        if len(web3.eth.get_code(address, block_identifier=middle)) > 0:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+# one tryAggregate per block. nothing here is shared between threads, so any number of workers can run this at once
+def fetch_chunk(router, origin, destination, start, end, multicall_address=None):
+    aggregator = Contract.from_abi(
+        "Multicall3", multicall_address or MULTICALL3, MULTICALL_ABI
+    )
+    methods = (
+        router.estimatedTotalAssets,
+        router.valueOfInvestment,
+        destination.pricePerShare,
+        origin.strategies,
+    )
+    calls = [
+        (router.address, router.estimatedTotalAssets.encode_input()),
+        (router.address, router.valueOfInvestment.encode_input()),
+        (destination.address, destination.pricePerShare.encode_input()),
+        (origin.address, origin.strategies.encode_input(router.address)),
+    ]
+
+    rows = []
+    for block in range(start, end + 1):
+        results = aggregator.tryAggregate(False, calls, block_identifier=block)
+        # None for anything that reverted, like a view an older router doesn't have, or that came back empty because
+        # there was no code there yet
+        (assets, investment, share_price, params) = (
+            method.decode_output(data) if success and len(data) > 0 else None
+            for method, (success, data) in zip(methods, results)
+        )
+        total_debt = params["totalDebt"] if params else 0
+        rows.append(
+            (
+                block,
+                int(assets or 0),
+                int(investment or 0),
+                int(share_price or 0),
+                int(total_debt),
+            )
+        )
+    return rows
+
+
+# fetch chunks of blocks on a pool of workers, writing each chunk once everything before it is written. only a couple
+# of chunks per worker are in flight at once, so a long range doesn't queue up all of its chunks and results
+def backfill(
+    router_address,
+    path,
+    start=None,
+    end=None,
+    chunk_size=250,
+    workers=8,
+    multicall_address=None,
+):
+    store = ColumnStore(path)
+    router = Contract.from_abi("Router", router_address, ROUTER_ABI)
+    origin = interface.IVaultFactory045(router.vault())
+    destination = Contract.from_abi("Destination", router.yVault(), DESTINATION_ABI)
+
+    end = end or chain.height
+    start = start or deployment_block(router.address, end)
+    last = store.last_block()
+    if last is not None:
+        start = max(start, last + 1)
+    if start > end:
+        return store
+
+    chunks = (
+        (x, min(x + chunk_size - 1, end)) for x in range(start, end + 1, chunk_size)
+    )
+    pending = deque()
+    with ThreadPoolExecutor(workers) as executor:
+        for x, y in chunks:
+            future = executor.submit(
+                fetch_chunk, router, origin, destination, x, y, multicall_address
+            )
+            pending.append((x, y, future))
+            if len(pending) >= 2 * workers:
+                write_next(store, pending)
+        while pending:
+            write_next(store, pending)
+    return store
+
+
+def write_next(store, pending):
+    (x, y, future) = pending.popleft()
+    store.append(future.result())
+    print(f"Wrote blocks {x} to {y}")
+
+
+def main():
+    router = click.prompt("Router strategy address", type=str)
+    path = click.prompt("Directory to write to", type=str, default=f"backfill/{router}")
+    start = click.prompt("First block, 0 for deployment", type=int, default=0)
+    end = click.prompt("Last block", type=int, default=chain.height)
+    workers = click.prompt("Workers", type=int, default=8)
+    store = backfill(router, path, start or None, end, workers=workers)
+    print("Have data through block", store.last_block())
@@ -0,0 +1,50 @@
+from brownie import accounts, Contract, chain
+import click
+
+
+def main():
+    keeper = accounts.load(click.prompt("Keeper account to harvest with", type=str))
+    strategy = Contract(click.prompt("Router strategy address", type=str))
+    vault = Contract(strategy.vault())
+
+    print("Strategy:", strategy.name(), strategy.address)
+    print("Vault:", vault.name(), vault.address)
+
+    # set our chunk size and start the emergency exit if it isn't running yet; our keeper must be emergency authorized
+    if strategy.exitChunkSize() == 0:
+        chunk_size = click.prompt(
+            "Max destination vault shares to redeem per harvest", type=int
+        )
+        strategy.setExitChunkSize(chunk_size, {"from": keeper})
+    if not strategy.emergencyExit():
+        strategy.setEmergencyExit({"from": keeper})
+    print("Chunk size:", strategy.exitChunkSize())
+
+    # harvest until we have nothing left in the destination vault and the vault has all of its debt back. the first
+    # harvest books whatever is still in our destination as a loss, and each later chunk comes back as profit
+    while strategy.balanceOfVault() > 0 or vault.strategies(strategy)["totalDebt"] > 0:
+        shares_before = strategy.balanceOfVault()
+        debt_before = vault.strategies(strategy)["totalDebt"]
+
+        tx = strategy.harvest({"from": keeper})
+
+        shares_after = strategy.balanceOfVault()
+        debt_after = vault.strategies(strategy)["totalDebt"]
+        print(
+            "Harvested in block",
+            tx.block_number,
+            "| Shares remaining:",
+            shares_after,
+            "| Debt remaining:",
+            debt_after,
+            "| Gas used:",
+            tx.gas_used,
+        )
+
+        # don't spin forever if the destination vault won't give us anything back
+        if shares_after == shares_before and debt_after == debt_before:
+            print("No progress on this harvest, try again later or adjust maxLoss.")
+            break
+
+    if strategy.balanceOfVault() == 0:
+        print("Position fully unwound at block", chain.height)
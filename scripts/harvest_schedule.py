@@ -0,0 +1,209 @@
+import math
+
+import numpy as np
+from brownie import Contract, chain
+import click
+from scripts.tvl import view
+from scripts.backfill import ColumnStore
+
+# how often each router should harvest. profit builds up in the destination whether we harvest or not, so what a
+# late harvest costs us is the profit our origin vault hasn't reported yet: anyone leaving before the next harvest
+# leaves it behind, anyone arriving gets a share of it. if a fraction `churn` of the vault changes hands per second,
+# an interval of T seconds misprices assets * rate * churn * T^2 / 2 of profit. add the gas for one harvest, cost,
+# and our cost per second is
+#   cost / T + assets * rate * churn * T / 2
+# which is smallest at T = sqrt(2 * cost / (assets * rate * churn)).
+
+SECONDS_PER_YEAR = 31_536_000
+DAY = 86_400
+
+ROUTER_ABI = [
+    view("delegatedAssets"),
+    view("yVault", output="address"),
+    view("want", output="address"),
+    view("maxReportDelay"),
+    view("wantPerEth"),
+    view("wantPriceInUsdc"),
+    view("yearnOracle", output="address"),
+    {
+        "name": "harvest",
+        "type": "function",
+        "stateMutability": "nonpayable",
+        "inputs": [],
+        "outputs": [],
+    },
+]
+DESTINATION_ABI = [view("pricePerShare")]
+TOKEN_ABI = [view("decimals")]
+ORACLE_ABI = [view("getPriceUsdcRecommended", ["address"])]
+
+
+########## PROFIT ##########
+
+
+# fit log(share price) against time, the slope is our continuously compounded rate per second
+def fit_accrual_rate(timestamps, prices):
+    (timestamps, prices) = (np.asarray(timestamps, float), np.asarray(prices, float))
+    keep = prices > 0
+    if keep.sum() < 2:
+        raise ValueError("Need at least two share prices to fit a rate")
+    (slope, _) = np.polyfit(timestamps[keep], np.log(prices[keep]), 1)
+    return max(slope, 0.0)
+
+
+def share_price_history(destination, start, end, step):
+    blocks = range(start, end + 1, step)
+    timestamps = [chain[x].timestamp for x in blocks]
+    prices = [destination.pricePerShare(block_identifier=x) for x in blocks]
+    return (timestamps, prices)
+
+
+# reuse a backfill if we have one. only the first and last timestamps are read, blocks in between are interpolated
+def history_from_backfill(path):
+    data = ColumnStore(path).load()
+    blocks = data["block"].astype(float)
+    if len(blocks) < 2:
+        raise ValueError("Backfill needs at least two blocks")
+    (first, last) = (int(blocks[0]), int(blocks[-1]))
+    (start, end) = (chain[first].timestamp, chain[last].timestamp)
+    timestamps = start + (blocks - first) * (end - start) / (last - first)
+    prices = [float(x) for x in data["pricePerShare"].to_ints()]
+    return (timestamps, prices)
+
+
+########## GAS ##########
+
+
+# gas for a harvest right now, from our local node. estimate_gas doesn't leave anything behind
+def measure_harvest_gas(strategy, keeper, samples=1):
+    return int(
+        np.median(
+            [strategy.harvest.estimate_gas({"from": keeper}) for _ in range(samples)]
+        )
+    )
+
+
+########## PRICES ##########
+
+
+# our V3 routers cache want per ETH, the same rate their ethToWant uses. None if this router doesn't have one yet
+def read_want_per_eth(router):
+    try:
+        return router.wantPerEth() or None
+    except Exception:
+        return None
+
+
+# our old routers take their thresholds in USDC. their cached price if it's set, otherwise what their oracle says.
+# None for our other routers
+def read_usdc_per_want(router):
+    try:
+        price = router.wantPriceInUsdc()
+    except Exception:
+        return None
+    if price == 0:
+        oracle = Contract.from_abi("Oracle", router.yearnOracle(), ORACLE_ABI)
+        price = oracle.getPriceUsdcRecommended(router.want())
+    # prices are 6 decimals per whole token, we want them per wei of want
+    decimals = Contract.from_abi("Token", router.want(), TOKEN_ABI).decimals()
+    return price / 10**decimals
+
+
+########## SCHEDULE ##########
+
+
+def optimal_delay(assets, rate, cost, churn, min_delay=DAY, max_delay=30 * DAY):
+    if assets <= 0 or rate <= 0 or churn <= 0:
+        return max_delay
+    delay = math.sqrt(2 * cost / (assets * rate * churn))
+    return int(min(max(delay, min_delay), max_delay))
+
+
+def recommend(
+    router,
+    keeper,
+    history,
+    gas_price,
+    want_per_eth,
+    churn_per_year=1.0,
+    min_delay=DAY,
+    max_delay=30 * DAY,
+    usdc_per_want=None,
+):
+    router = Contract.from_abi("Router", router, ROUTER_ABI)
+    assets = router.delegatedAssets()
+    rate = fit_accrual_rate(*history)
+    churn = churn_per_year / SECONDS_PER_YEAR
+
+    gas = measure_harvest_gas(router, keeper)
+    # want_per_eth is want (in wei) per 1e18 wei, same as ethToWant
+    cost = gas * gas_price * want_per_eth / 1e18
+    delay = optimal_delay(assets, rate, cost, churn, min_delay, max_delay)
+
+    profit_per_second = assets * rate
+    cost_per_second = cost / delay + assets * rate * churn * delay / 2
+    recommendation = {
+        "router": router.address,
+        "assets": assets,
+        "apr": rate * SECONDS_PER_YEAR,
+        "harvest_gas": gas,
+        "harvest_cost": int(cost),
+        "maxReportDelay": delay,
+        # never worth harvesting for less than the gas, and by the end of our delay we expect this much
+        "min_profit": int(cost),
+        "target_profit": int(profit_per_second * delay),
+        "net_apr": (profit_per_second - cost_per_second) * SECONDS_PER_YEAR / assets
+        if assets
+        else 0.0,
+    }
+    # our old routers take their thresholds in USDC (6 decimals)
+    if usdc_per_want is not None:
+        recommendation["harvestProfitMinInUsdc"] = int(cost * usdc_per_want)
+        recommendation["harvestProfitMaxInUsdc"] = int(
+            profit_per_second * delay * usdc_per_want
+        )
+    return recommendation
+
+
+def main():
+    routers = click.prompt("Router addresses, comma separated", type=str)
+    keeper = click.prompt("Keeper address", type=str)
+    days = click.prompt("Days of share price history", type=int, default=30)
+    gas_price = click.prompt("Gas price in gwei", type=float, default=20) * 1e9
+    churn = click.prompt("Times our vault turns over per year", type=float, default=1)
+    backfills = click.prompt(
+        "Backfill directory per router, comma separated (blank to read the chain)",
+        type=str,
+        default="",
+    )
+    backfills = [x.strip() for x in backfills.split(",") if x.strip()]
+
+    end = chain.height
+    start = max(end - days * DAY // 12, 0)
+    step = max((end - start) // 100, 1)
+    for i, address in enumerate([x.strip() for x in routers.split(",")]):
+        router = Contract.from_abi("Router", address, ROUTER_ABI)
+        if i < len(backfills):
+            history = history_from_backfill(backfills[i])
+        else:
+            destination = Contract.from_abi(
+                "Destination", router.yVault(), DESTINATION_ABI
+            )
+            history = share_price_history(destination, start, end, step)
+
+        want_per_eth = read_want_per_eth(router)
+        if want_per_eth is None:
+            want_per_eth = click.prompt(f"Want (wei) per ETH for {address}", type=int)
+        usdc_per_want = read_usdc_per_want(router)
+        recommendation = recommend(
+            address,
+            keeper,
+            history,
+            gas_price,
+            want_per_eth,
+            churn,
+            usdc_per_want=usdc_per_want,
+        )
+        print("Current maxReportDelay:", router.maxReportDelay())
+        for key, value in recommendation.items():
+            print(f"{key}: {value}")
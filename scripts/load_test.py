@@ -0,0 +1,298 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from brownie import accounts, Contract, chain, web3
+import click
+from scripts.withdraw_sim import free_funds
+
+# drive a local origin vault + router + destination vault with lots of simulated users at once. each kind of
+# operation arrives as a poisson process (rates per hour of chain time); every tick we warp the chain forward and
+# fire that tick's operations from a pool of senders. we hand out nonces ourselves, so senders never wait on each
+# other or ask the node, and sign with each user's local key.
+
+RATES = {"deposit": 120, "withdraw": 60, "donate": 2, "harvest": 1}
+GAS_LIMIT = 2_000_000
+TRANSFER = web3.keccak(text="Transfer(address,address,uint256)").hex()
+
+
+class NonceManager:
+    def __init__(self):
+        self.nonces = {}
+        self.lock = threading.Lock()
+
+    def next(self, address):
+        with self.lock:
+            if address not in self.nonces:
+                self.nonces[address] = web3.eth.get_transaction_count(
+                    address, "pending"
+                )
+            nonce = self.nonces[address]
+            self.nonces[address] += 1
+            return nonce
+
+    # after a send fails we don't know what the node saw, so ask it next time
+    def reset(self, address):
+        with self.lock:
+            self.nonces.pop(address, None)
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        vault,
+        strategy,
+        token,
+        keeper,
+        users,
+        size,
+        rates=RATES,
+        workers=8,
+        tick=600,
+    ):
+        self.vault = vault
+        self.strategy = strategy
+        self.token = token
+        self.keeper = keeper
+        self.users = list(users)
+        self.size = size
+        self.rates = rates
+        self.workers = workers
+        self.tick = tick
+        self.nonces = NonceManager()
+        self.gas_price = web3.eth.gas_price * 2
+        self.results = []
+        self.results_lock = threading.Lock()
+
+    ########## SCHEDULE ##########
+
+    # arrival times for each op, over this many seconds of chain time
+    def schedule(self, duration, seed=0):
+        rng = random.Random(seed)
+        events = []
+        for op, per_hour in self.rates.items():
+            if per_hour <= 0:
+                continue
+            t = rng.expovariate(per_hour / 3600)
+            while t < duration:
+                events.append((t, op))
+                t += rng.expovariate(per_hour / 3600)
+        return sorted(events)
+
+    ########## SENDING ##########
+
+    def send(self, account, to, data):
+        tx = {
+            "from": account.address,
+            "to": to,
+            "data": data,
+            "nonce": self.nonces.next(account.address),
+            "gas": GAS_LIMIT,
+            "gasPrice": self.gas_price,
+            "chainId": chain.id,
+            "value": 0,
+        }
+        try:
+            # local accounts we sign ourselves, anything the node unlocked it signs for us
+            if hasattr(account, "private_key"):
+                signed = web3.eth.account.sign_transaction(tx, account.private_key)
+                tx_hash = web3.eth.send_raw_transaction(signed.rawTransaction)
+            else:
+                tx_hash = web3.eth.send_transaction(tx)
+        except Exception:
+            self.nonces.reset(account.address)
+            raise
+        return web3.eth.wait_for_transaction_receipt(tx_hash)
+
+    # fund our users with gas money and want, and approve our vault
+    def setup(self, whale):
+        for user in self.users:
+            web3.provider.make_request(
+                "anvil_setBalance", [user.address, hex(10**20)]
+            )
+            self.token.transfer(user, self.size * 10, {"from": whale})
+        with ThreadPoolExecutor(self.workers) as executor:
+            list(
+                executor.map(
+                    lambda user: self.send(
+                        user,
+                        self.token.address,
+                        self.token.approve.encode_input(self.vault, 2**256 - 1),
+                    ),
+                    self.users,
+                )
+            )
+
+    ########## OPERATIONS ##########
+
+    # returns (account, to, calldata), or None if this user has nothing to do it with
+    def build(self, op, user, rng):
+        if op == "deposit":
+            amount = int(self.size * rng.uniform(0.1, 1))
+            if self.token.balanceOf(user) < amount:
+                return None
+            return (
+                user,
+                self.vault.address,
+                self.vault.deposit["uint256"].encode_input(amount),
+            )
+        if op == "withdraw":
+            shares = self.vault.balanceOf(user)
+            if shares == 0:
+                return None
+            shares = max(int(shares * rng.uniform(0.1, 1)), 1)
+            return (
+                user,
+                self.vault.address,
+                self.vault.withdraw["uint256"].encode_input(shares),
+            )
+        if op == "donate":
+            amount = int(self.size * rng.uniform(0.001, 0.01))
+            return (
+                user,
+                self.token.address,
+                self.token.transfer.encode_input(self.strategy, amount),
+            )
+        if op == "harvest":
+            return (
+                self.keeper,
+                self.strategy.address,
+                self.strategy.harvest.encode_input(),
+            )
+
+    def execute(self, op, account, to, data):
+        start = time.perf_counter()
+        try:
+            receipt = self.send(account, to, data)
+        except Exception as e:
+            self.record({"op": op, "status": 0, "error": str(e)})
+            return
+        result = {
+            "op": op,
+            "status": receipt.status,
+            "gas": receipt.gasUsed,
+            "block": receipt.blockNumber,
+            "latency": time.perf_counter() - start,
+        }
+        if receipt.status == 1 and op in ("deposit", "withdraw"):
+            result["loss"] = self.loss(op, account.address, receipt)
+        self.record(result)
+
+    def record(self, result):
+        with self.results_lock:
+            self.results.append(result)
+
+    # what our user lost against the share value going into their block, in want. we use the vault's own free funds
+    # math rather than pricePerShare, so anything left is rounding
+    def loss(self, op, user, receipt):
+        block = receipt.blockNumber
+        funds = free_funds(self.vault, block - 1, chain[block].timestamp)
+        supply = self.vault.totalSupply(block_identifier=block - 1)
+        want = transferred(receipt, self.token.address, user, incoming=op == "withdraw")
+        shares = transferred(
+            receipt, self.vault.address, user, incoming=op == "deposit"
+        )
+        value = shares * funds // supply if supply else shares
+        return want - value if op == "deposit" else value - want
+
+    ########## RUNNING ##########
+
+    def run(self, duration, seed=0):
+        rng = random.Random(seed)
+        events = self.schedule(duration, seed)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(self.workers) as executor:
+            for tick_start in range(0, int(duration), self.tick):
+                tick_events = [
+                    op for t, op in events if tick_start <= t < tick_start + self.tick
+                ]
+                chain.sleep(self.tick)
+
+                # one op per user per tick, so a user's ops never depend on each other
+                idle = list(self.users)
+                rng.shuffle(idle)
+                jobs = []
+                for op in tick_events:
+                    user = idle.pop() if op != "harvest" and idle else None
+                    if op != "harvest" and user is None:
+                        continue
+                    call = self.build(op, user, rng)
+                    if call is not None:
+                        jobs.append(executor.submit(self.execute, op, *call))
+                for job in jobs:
+                    job.result()
+        return self.report(time.perf_counter() - start)
+
+    def report(self, seconds):
+        report = {
+            "seconds": seconds,
+            "operations": len(self.results),
+            "throughput": len(self.results) / seconds if seconds else 0.0,
+            "ops": {},
+        }
+        for op in sorted({x["op"] for x in self.results}):
+            done = [x for x in self.results if x["op"] == op and x["status"] == 1]
+            gas = np.array([x["gas"] for x in done]) if done else np.zeros(1)
+            losses = [x["loss"] for x in done if "loss" in x]
+            report["ops"][op] = {
+                "ok": len(done),
+                "failed": sum(1 for x in self.results if x["op"] == op) - len(done),
+                "gas_mean": float(gas.mean()),
+                "gas_p50": float(np.percentile(gas, 50)),
+                "gas_p90": float(np.percentile(gas, 90)),
+                "gas_max": int(gas.max()),
+                "loss_total": sum(losses),
+                "loss_max": max(losses, default=0),
+                "loss_per_op": sum(losses) / len(losses) if losses else 0.0,
+            }
+        return report
+
+
+# amount of a token moved to (or from) someone in a receipt, from its Transfer logs
+def transferred(receipt, token, account, incoming):
+    position = 2 if incoming else 1
+    total = 0
+    for log in receipt.logs:
+        topics = [web3.toHex(x) for x in log["topics"]]
+        if (
+            log["address"].lower() == str(token).lower()
+            and topics[0] == TRANSFER
+            and topics[position][-40:] == account[2:].lower()
+        ):
+            total += int(web3.toHex(log["data"]), 16)
+    return total
+
+
+def main():
+    vault = Contract(click.prompt("Origin vault address", type=str))
+    strategy = Contract(click.prompt("Router strategy address", type=str))
+    token = Contract(vault.token())
+    whale = accounts.at(click.prompt("Want whale to fund users", type=str), force=True)
+    keeper = accounts.at(strategy.keeper(), force=True)
+
+    count = click.prompt("Users", type=int, default=50)
+    size = click.prompt("Typical deposit, in want", type=float, default=1_000)
+    hours = click.prompt("Hours of chain time", type=float, default=24)
+    workers = click.prompt("Concurrent senders", type=int, default=8)
+
+    users = [accounts.add() for _ in range(count)]
+    generator = LoadGenerator(
+        vault,
+        strategy,
+        token,
+        keeper,
+        users,
+        int(size * 10 ** token.decimals()),
+        workers=workers,
+    )
+    generator.setup(whale)
+    report = generator.run(hours * 3600)
+
+    print(
+        f"{report['operations']} operations in {report['seconds']:.1f}s, "
+        f"{report['throughput']:.1f} per second"
+    )
+    for op, stats in report["ops"].items():
+        print(op, stats)
@@ -0,0 +1,171 @@
+import time
+
+from brownie import Contract, chain, multicall, web3
+import click
+from scripts.tvl import view, router_destinations
+
+# watch our routers for a loss as soon as it happens, rather than waiting for prepareReturn to find it at harvest.
+# a router's gap (estimatedTotalAssets - delegatedAssets) only moves when one of these logs shows up:
+#   - anything from one of its destination vaults (deposits, withdrawals, reports, share transfers)
+#   - a want transfer in or out of the router (harvests, vault withdrawals, donations)
+#   - a report or migration for it on its origin vault
+# so each block we pull logs once for everything we watch, and only re-read routers that one of them touches.
+# destination profit unlocking moves share price without a log, but it only ever moves it up.
+
+ROUTER_ABI = [
+    view("estimatedTotalAssets"),
+    view("delegatedAssets"),
+    view("dustThreshold"),
+    view("want", output="address"),
+    view("vault", output="address"),
+]
+
+TRANSFER = web3.keccak(text="Transfer(address,address,uint256)").hex()
+
+# keep our topic filters to a size any node will take
+MAX_TOPICS = 500
+
+
+def topic(address):
+    return "0x" + address[2:].lower().rjust(64, "0")
+
+
+def chunks(values, size=MAX_TOPICS):
+    return [values[i : i + size] for i in range(0, len(values), size)]
+
+
+class LossMonitor:
+    def __init__(self, routers, multicall_address=None, alert=None):
+        self.multicall_address = multicall_address
+        self.alert = alert or print_alert
+        self.contracts = {}
+        # router => (origin, want, [destinations]), plus the reverse lookups we use to route logs
+        self.routers = {}
+        self.by_destination = {}
+        self.by_origin = {}
+        self.wants = set()
+        self.dust = {}
+        # router => latest assets - debt
+        self.gaps = {}
+        self.last_block = None
+        self.add(routers)
+
+    def add(self, routers, block=None):
+        block = block or chain.height
+        added = []
+        for address in routers:
+            address = web3.toChecksumAddress(str(address))
+            router = Contract.from_abi("Router", address, ROUTER_ABI)
+            (origin, want) = (router.vault(), router.want())
+            destinations = router_destinations(address, block)
+            try:
+                self.dust[address] = router.dustThreshold()
+            except Exception:
+                self.dust[address] = 0
+
+            self.contracts[address] = router
+            added.append(address)
+            self.routers[address] = (origin, want, destinations)
+            self.wants.add(want)
+            self.by_origin.setdefault(origin, set()).add(address)
+            for destination in destinations:
+                self.by_destination.setdefault(destination, set()).add(address)
+
+        # start from each new router's gap as of now, after that we only read what changes
+        self.refresh(added, block)
+        self.last_block = max(self.last_block or 0, block)
+
+    ########## FINDING CHANGES ##########
+
+    # one getLogs for our vaults, plus want transfers to or from any router (topics are OR'd within a position)
+    def changed(self, start, end):
+        dirty = set()
+        vaults = sorted(set(self.by_destination) | set(self.by_origin))
+        for log in self.logs(start, end, vaults):
+            address = web3.toChecksumAddress(log["address"])
+            dirty |= self.by_destination.get(address, set())
+            # origin vaults log plenty about other strategies, only take ones that name our router
+            topics = {web3.toHex(x) for x in log["topics"]}
+            for router in self.by_origin.get(address, ()):
+                if topic(router) in topics:
+                    dirty.add(router)
+
+        routers = [topic(x) for x in self.routers]
+        wants = sorted(self.wants)
+        for group in chunks(routers):
+            for topics in ([TRANSFER, group], [TRANSFER, None, group]):
+                for log in self.logs(start, end, wants, topics):
+                    for x in log["topics"][1:3]:
+                        address = web3.toChecksumAddress("0x" + web3.toHex(x)[-40:])
+                        if address in self.routers:
+                            dirty.add(address)
+        return dirty
+
+    def logs(self, start, end, addresses, topics=None):
+        if not addresses:
+            return []
+        query = {"fromBlock": start, "toBlock": end, "address": addresses}
+        if topics:
+            query["topics"] = topics
+        return web3.eth.get_logs(query)
+
+    ########## GAPS ##########
+
+    # one multicall for every router we need to re-read
+    def refresh(self, routers, block):
+        with multicall(address=self.multicall_address, block_identifier=block):
+            values = {
+                x: (
+                    self.contracts[x].estimatedTotalAssets(),
+                    self.contracts[x].delegatedAssets(),
+                )
+                for x in routers
+            }
+
+        alerts = []
+        for router, (assets, debt) in values.items():
+            # multicall hands back None for anything that reverted
+            if assets == None or debt == None:
+                continue
+            gap = int(assets) - int(debt)
+            previous = self.gaps.get(router)
+            self.gaps[router] = gap
+            # only alert when we're newly underwater (past dust) or sinking further
+            if gap < -self.dust[router] and (previous is None or gap < previous):
+                alerts.append((router, int(assets), int(debt), gap))
+
+        for router, assets, debt, gap in alerts:
+            self.alert(block, router, assets, debt, gap)
+        return alerts
+
+    # catch up on every block since we last looked, however many that is
+    def process(self, block=None):
+        block = block or chain.height
+        if block <= self.last_block:
+            return []
+        dirty = self.changed(self.last_block + 1, block)
+        self.last_block = block
+        if not dirty:
+            return []
+        return self.refresh(sorted(dirty), block)
+
+    # new block filter so we hear about every block as it lands
+    def watch(self, poll_interval=1):
+        blocks = web3.eth.filter("latest")
+        while True:
+            if blocks.get_new_entries():
+                self.process()
+            time.sleep(poll_interval)
+
+
+def print_alert(block, router, assets, debt, gap):
+    print(f"Block {block}: {router} is down {-gap} ({assets} assets vs {debt} debt)")
+
+
+def main():
+    routers = click.prompt("Router addresses, comma separated", type=str)
+    poll_interval = click.prompt("Seconds between polls", type=float, default=1)
+    monitor = LossMonitor([x.strip() for x in routers.split(",")])
+    for router, gap in monitor.gaps.items():
+        print("Watching", router, "gap", gap)
+    monitor.watch(poll_interval)
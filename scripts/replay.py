@@ -0,0 +1,140 @@
+import json
+from pathlib import Path
+
+import numpy as np
+from brownie import accounts, chain, web3
+from scripts.withdraw_sim import free_funds
+
+# replay real origin vault traffic against our local stack. events come from a file (one json object per line, as
+# exported from web3/brownie: event, blockNumber, logIndex, timestamp, args), so nothing here touches the network:
+#   Deposit(recipient, shares, amount)      recipient's local stand-in deposits the same (scaled) amount
+#   Withdraw(recipient, shares, amount)     withdraws the same fraction of their shares they did on chain
+#   StrategyReported(strategy, gain, ...)   realize that (scaled) gain in our destination, then harvest our router
+# amounts are scaled so the biggest deposit matches our test amount. we keep time between events, up to a day.
+# gains are realized with the trade_handler_action our tests hand us, along with their fixtures.
+
+MAX_SLEEP = 86400
+
+
+def load_events(path):
+    with open(path) as f:
+        events = [json.loads(x) for x in f if x.strip()]
+    return sorted(events, key=lambda x: (x["blockNumber"], x.get("logIndex", 0)))
+
+
+class Replayer:
+    def __init__(self, events, **fixtures):
+        self.__dict__.update(fixtures)
+        self.events = events
+        deposits = [int(x["args"]["amount"]) for x in events if x["event"] == "Deposit"]
+        self.scale = self.amount / max(deposits) if deposits else 1
+        # historical address => (local account, shares they held on chain)
+        self.users = {}
+        self.results = []
+        self.skipped = 0
+
+    def user(self, address):
+        if address not in self.users:
+            account = accounts.add()
+            web3.provider.make_request(
+                "anvil_setBalance", [account.address, hex(10**20)]
+            )
+            self.token.approve(self.vault, 2**256 - 1, {"from": account})
+            self.users[address] = [account, 0]
+        return self.users[address]
+
+    ########## EVENTS ##########
+
+    def Deposit(self, args):
+        (account, _) = user = self.user(args["recipient"])
+        amount = max(int(int(args["amount"]) * self.scale), 1)
+        self.token.transfer(account, amount, {"from": self.whale})
+        (funds, supply) = self.share_value()
+        before = self.vault.balanceOf(account)
+        tx = self.vault.deposit(amount, {"from": account})
+        shares = self.vault.balanceOf(account) - before
+        user[1] += int(args["shares"])
+        value = shares * funds // supply if supply else shares
+        self.record("deposit", tx, amount - value)
+
+    def Withdraw(self, args):
+        (account, historical) = user = self.user(args["recipient"])
+        local = self.vault.balanceOf(account)
+        # deposited before our export started, nothing to replay
+        if historical == 0 or local == 0:
+            self.skipped += 1
+            return
+        shares = min(local * int(args["shares"]) // historical, local)
+        user[1] -= min(int(args["shares"]), historical)
+        if shares == 0:
+            self.skipped += 1
+            return
+        (funds, supply) = self.share_value()
+        before = self.token.balanceOf(account)
+        tx = self.vault.withdraw(shares, {"from": account})
+        received = self.token.balanceOf(account) - before
+        self.record("withdraw", tx, shares * funds // supply - received)
+
+    def StrategyReported(self, args):
+        gain = int(int(args.get("gain", 0)) * self.scale)
+        if gain > 0:
+            self.trade_handler_action(
+                self.target,
+                self.token,
+                self.gov,
+                self.profit_whale,
+                gain,
+                self.use_v3,
+                self.destination_vault,
+            )
+        loss_before = self.vault.strategies(self.strategy)["totalLoss"]
+        tx = self.strategy.harvest({"from": self.gov})
+        loss = self.vault.strategies(self.strategy)["totalLoss"] - loss_before
+        self.record("harvest", tx, loss)
+
+    ########## RUNNING ##########
+
+    # what the vault thinks its shares are worth for a transaction in the next block
+    def share_value(self):
+        funds = free_funds(self.vault, chain.height, chain.time())
+        return (funds, self.vault.totalSupply())
+
+    def record(self, op, tx, loss):
+        self.results.append({"op": op, "gas": tx.gas_used, "loss": int(loss)})
+
+    def run(self):
+        last = None
+        for event in self.events:
+            if event.get("timestamp") and last:
+                gap = min(int(event["timestamp"]) - last, MAX_SLEEP)
+                if gap > 0:
+                    chain.sleep(gap)
+            last = event.get("timestamp") or last
+            handler = getattr(self, event["event"], None)
+            if handler is None:
+                self.skipped += 1
+                continue
+            handler(event["args"])
+        return self.report()
+
+    def report(self):
+        report = {"skipped": self.skipped, "ops": {}}
+        for op in sorted({x["op"] for x in self.results}):
+            rows = [x for x in self.results if x["op"] == op]
+            gas = np.array([x["gas"] for x in rows])
+            losses = [x["loss"] for x in rows]
+            report["ops"][op] = {
+                "count": len(rows),
+                "gas_mean": float(gas.mean()),
+                "gas_p90": float(np.percentile(gas, 90)),
+                "gas_total": int(gas.sum()),
+                "loss_total": sum(losses),
+                "loss_max": max(losses),
+                "lossy": sum(1 for x in losses if x > 0),
+            }
+        return report
+
+    def write(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2))
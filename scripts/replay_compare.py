@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "tests"))
+from compat_matrix import BASE_PORT, VARIANTS
+
+# replay the same events against every router version side by side, and compare gas and rounding losses
+#   python scripts/replay_compare.py [events.jsonl] [variants...]
+
+REPORTS = ROOT / "reports" / "replay"
+
+
+def run_variant(variant, port, events):
+    report_path = REPORTS / f"{variant}.json"
+    report_path.unlink(missing_ok=True)
+    env = dict(
+        os.environ,
+        ROUTER_VARIANT=variant,
+        ROUTER_RPC_PORT=str(port),
+        ROUTER_REPLAY_EVENTS=str(events),
+        ROUTER_REPLAY_REPORT=str(report_path),
+    )
+    process = subprocess.run(
+        ["brownie", "test", str(ROOT / "tests" / "test_replay.py"), "-s"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if not report_path.exists():
+        output = (process.stdout + process.stderr).strip().splitlines()
+        print(f"{variant} crashed: {output[-1] if output else process.returncode}")
+        return None
+    return json.loads(report_path.read_text())
+
+
+def table(reports):
+    lines = ["variant, op, count, gas mean, gas p90, loss total, loss max, lossy"]
+    for variant, report in reports.items():
+        if report is None:
+            lines.append(f"{variant}, crashed")
+            continue
+        for op, stats in report["ops"].items():
+            lines.append(
+                f"{variant}, {op}, {stats['count']}, {stats['gas_mean']:.0f}, "
+                f"{stats['gas_p90']:.0f}, {stats['loss_total']}, {stats['loss_max']}, "
+                f"{stats['lossy']}"
+            )
+    return "\n".join(lines)
+
+
+def main(args):
+    events = Path(args[0]).resolve() if args else ROOT / "data" / "replay_sample.jsonl"
+    variants = args[1:] or list(VARIANTS)
+    with ThreadPoolExecutor(len(variants)) as executor:
+        futures = {
+            variant: executor.submit(
+                run_variant, variant, BASE_PORT + list(VARIANTS).index(variant), events
+            )
+            for variant in variants
+        }
+        reports = {variant: future.result() for variant, future in futures.items()}
+    print(table(reports))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
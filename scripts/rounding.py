@@ -0,0 +1,229 @@
+import random
+
+import numpy as np
+from brownie import Contract, chain
+import click
+from scripts.tvl import view
+from scripts.uint256 import Uint256Array
+from scripts.withdraw_sim import free_funds
+
+# how much a router can come up short on a deposit => withdraw round trip through its destination, just from
+# rounding. the router deposits `amount` on top of any shares it already holds, and gets amount * supply / funds
+# shares, rounded down. when our vault wants that amount back, the router works out shares to redeem (never more than
+# it has) and the destination pays those out rounded down again. rounding shares up only helps while we hold more
+# than we're redeeming; on a full exit every router is short by the same couple of wei. anything short of `amount` is
+# counted as a loss only if it's under dustThreshold, so dustThreshold should sit just above the worst rounding we can
+# see, and no higher.
+#
+# V2 routers use ShareValueHelper (shares rounded up, value rounded down), V3 routers previewWithdraw and
+# previewRedeem, which round the same way. our old V2 routers rounded shares down too, and "pps" is what going through
+# pricePerShare would do, which is why the helper exists.
+
+ROUTERS = {
+    "v2": {"round_up": True, "pps": False},
+    "v3": {"round_up": True, "pps": False},
+    "v2-old": {"round_up": False, "pps": False},
+    "pps": {"round_up": True, "pps": True},
+}
+
+DECIMALS = (6, 8, 18)
+PRICE_RANGES = ((1.0, 1.01), (1.01, 2.0), (2.0, 100.0))
+# in whole tokens
+SIZES = (0.01, 1, 1_000, 1_000_000)
+
+# setDustThreshold won't take anything bigger
+MAX_DUST = 10**6
+
+ROUTER_ABI = [
+    view("yVault", output="address"),
+    view("dustThreshold"),
+    view("shareValueHelper", output="address"),
+]
+DESTINATION_ABI = [
+    view("totalSupply"),
+    view("totalAssets"),
+    view("decimals"),
+    view("asset", output="address"),
+    view("lockedProfit"),
+    view("lockedProfitDegradation"),
+    view("lastReport"),
+]
+
+
+########## ROUND TRIPS ##########
+
+
+# every row is its own destination (supply, funds), amount, and destination shares we already held. returns the shares
+# our deposit got, what came back, how far short that is, and how far the value of our new shares (what
+# valueOfInvestment would count for them) is below what we put in
+def round_trip(router, decimals, supply, funds, amounts, held=0):
+    rounding = ROUTERS[router]
+    (supply, funds, amounts) = (
+        Uint256Array.from_ints(supply),
+        Uint256Array.from_ints(funds),
+        Uint256Array.from_ints(amounts),
+    )
+    held = Uint256Array.from_ints(held if isinstance(held, list) else [held])
+
+    # deposit, then the destination holds our want and our shares
+    shares = amounts.mul_div(supply, funds)
+    (supply, funds) = (supply + shares, funds + amounts)
+
+    if rounding["pps"]:
+        unit = 10**decimals
+        price = funds.mul_div(unit, supply)
+        to_redeem = amounts.mul_div(unit, price, round_up=rounding["round_up"])
+        value = shares.mul_div(price, unit)
+    else:
+        to_redeem = amounts.mul_div(supply, funds, round_up=rounding["round_up"])
+        value = shares.mul_div(funds, supply)
+    to_redeem = to_redeem.minimum(shares + held)
+
+    # the destination itself always pays out exactly, rounded down
+    received = to_redeem.mul_div(funds, supply)
+    short = received < amounts
+    return {
+        "shares": shares,
+        "received": received,
+        "shortfall": (amounts - received).where(short, 0),
+        "report_loss": (amounts - value).where(value < amounts, 0),
+        # a destination won't mint zero shares, so these never happen
+        "valid": shares != 0,
+    }
+
+
+# random destinations with share prices in [low, high), and amounts around size (in whole tokens). half of our rows
+# are a full exit, the other half leave a position behind
+def sample(decimals, price_range, size, samples, rng):
+    unit = 10**decimals
+    (supply, funds, amounts, held) = ([], [], [], [])
+    for i in range(samples):
+        price = rng.uniform(*price_range)
+        total = rng.randrange(10**3, 10**9) * unit + rng.randrange(unit)
+        supply.append(total)
+        funds.append(total * int(price * 10**12) // 10**12 + rng.randrange(unit))
+        base = max(int(size * unit), 1)
+        amounts.append(base + rng.randrange(max(base // 100, 1)))
+        held.append(0 if i % 2 == 0 else rng.randrange(1, 10) * base)
+    return (supply, funds, amounts, held)
+
+
+def summarize(result):
+    valid = result["valid"]
+    shortfall = np.array(result["shortfall"].to_floats())[valid]
+    report_loss = np.array(result["report_loss"].to_floats())[valid]
+    if len(shortfall) == 0:
+        return None
+    worst = int(shortfall.max())
+    return {
+        "samples": len(shortfall),
+        "worst": worst,
+        "expected": float(shortfall.mean()),
+        "lossy": float((shortfall > 0).mean()),
+        "report_worst": int(report_loss.max()),
+        "report_expected": float(report_loss.mean()),
+        "dust_threshold": dust_threshold(worst),
+    }
+
+
+# _liquidationResult takes a loss when diff < dustThreshold, so one more than our worst case covers all of it
+def dust_threshold(worst):
+    return min(worst + 1, MAX_DUST - 1)
+
+
+########## SWEEPS ##########
+
+
+def analyze(
+    decimals=DECIMALS,
+    price_ranges=PRICE_RANGES,
+    sizes=SIZES,
+    routers=tuple(ROUTERS),
+    samples=500,
+    seed=0,
+):
+    rng = random.Random(seed)
+    rows = []
+    for d in decimals:
+        for price_range in price_ranges:
+            for size in sizes:
+                (supply, funds, amounts, held) = sample(
+                    d, price_range, size, samples, rng
+                )
+                for router in routers:
+                    stats = summarize(
+                        round_trip(router, d, supply, funds, amounts, held)
+                    )
+                    if stats is None:
+                        continue
+                    rows.append(
+                        {
+                            "router": router,
+                            "decimals": d,
+                            "prices": price_range,
+                            "size": size,
+                            **stats,
+                        }
+                    )
+    return rows
+
+
+# worst rounding for one destination as it is now, plus some drift in its share price before our next round trip
+def recommend(
+    router,
+    decimals,
+    supply,
+    funds,
+    sizes=SIZES,
+    drift=0.01,
+    samples=500,
+    seed=0,
+):
+    rng = random.Random(seed)
+    unit = 10**decimals
+    (supplies, fundses, amounts, held) = ([], [], [], [])
+    for size in sizes:
+        base = max(int(size * unit), 1)
+        for i in range(samples):
+            grown = int(funds * (1 + rng.uniform(0, drift))) + rng.randrange(unit)
+            supplies.append(supply)
+            fundses.append(grown)
+            amounts.append(base + rng.randrange(max(base // 100, 1)))
+            held.append(0 if i % 2 == 0 else rng.randrange(1, 10) * base)
+    return summarize(round_trip(router, decimals, supplies, fundses, amounts, held))
+
+
+def router_version(router, destination):
+    try:
+        router.shareValueHelper()
+        return "v2-old"
+    except Exception:
+        pass
+    try:
+        destination.asset()
+        return "v3"
+    except Exception:
+        return "v2"
+
+
+def main():
+    routers = click.prompt("Router addresses, comma separated", type=str)
+    for address in [x.strip() for x in routers.split(",")]:
+        router = Contract.from_abi("Router", address, ROUTER_ABI)
+        destination = Contract.from_abi("Destination", router.yVault(), DESTINATION_ABI)
+        version = router_version(router, destination)
+        decimals = destination.decimals()
+        stats = recommend(
+            version,
+            decimals,
+            destination.totalSupply(),
+            free_funds(destination, chain.height),
+        )
+        print(f"{address} ({version}, {decimals} decimals)")
+        print("Current dustThreshold:", router.dustThreshold())
+        # only if the destination would mint us zero shares for every amount we tried
+        if stats is None:
+            print("No valid round trips, try bigger sizes")
+            continue
+        for key, value in stats.items():
+            print(f"{key}: {value}")
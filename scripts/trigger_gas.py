@@ -0,0 +1,35 @@
+from brownie import accounts, Contract, chain
+import click
+
+# gas for a keeper's harvestTrigger eth_call on one of our old routers, asking the lens oracle vs using our cached
+# price. meant for a fork, since we briefly set maxPriceAge to zero to force the oracle path.
+
+
+def measure(strategy, call_cost=0):
+    return strategy.harvestTrigger.estimate_gas(call_cost)
+
+
+def compare(strategy, management):
+    max_price_age = strategy.maxPriceAge()
+
+    # with no max age our price is always stale, so the trigger asks the oracle
+    strategy.setMaxPriceAge(0, {"from": management})
+    chain.mine(1)
+    live = measure(strategy)
+
+    # put our max age back and refresh, after that the trigger reads our price from storage
+    strategy.setMaxPriceAge(max_price_age, {"from": management})
+    strategy.updateWantPrice({"from": management})
+    cached = measure(strategy)
+    return (live, cached)
+
+
+def main():
+    strategy = Contract(click.prompt("Old router strategy address", type=str))
+    management = accounts.at(Contract(strategy.vault()).management(), force=True)
+
+    (live, cached) = compare(strategy, management)
+    print("Strategy:", strategy.name(), strategy.address)
+    print("harvestTrigger with the lens oracle:", live)
+    print("harvestTrigger with our cached price:", cached)
+    print(f"Saved {live - cached} gas ({100 * (live - cached) / live:.1f}%)")
@@ -0,0 +1,195 @@
+from brownie import Contract, ZERO_ADDRESS, chain, multicall, web3
+import click
+
+# deduplicated TVL across a set of vaults. our routers deposit an origin vault's funds into a destination vault, so
+# those funds show up in both vaults' totalAssets. delegatedAssets() is exactly that overlap, so we subtract it for
+# every router whose destination we also count.
+
+
+def view(name, inputs=(), output="uint256"):
+    return {
+        "name": name,
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [{"name": "", "type": x} for x in inputs],
+        "outputs": [{"name": "", "type": output}],
+    }
+
+
+# just the bits of vaults and routers we need, so we don't depend on verified sources for every address
+VAULT_ABI = [
+    view("totalAssets"),
+    view("totalDebt"),
+    view("token", output="address"),
+    view("asset", output="address"),
+    view("withdrawalQueue", ["uint256"], "address"),
+]
+ROUTER_ABI = [
+    view("delegatedAssets"),
+    view("yVault", output="address"),
+    view("getDestinations", output="address[]"),
+]
+
+# V2 vaults cap their withdrawal queue at 20 strategies
+MAX_STRATEGIES = 20
+
+
+class PortfolioTVL:
+    def __init__(self, origin_vaults, multicall_address=None):
+        self.origin_vaults = [web3.toChecksumAddress(str(x)) for x in origin_vaults]
+        self.multicall_address = multicall_address
+        self.vaults = {}
+        self.tokens = {}
+        # router => (origin vault, [destination vaults])
+        self.routers = {}
+        self.router_contracts = {}
+        # the block our graph is from, and every vault's and router's debt when we last read them
+        self.discovered = None
+        self.debts = None
+        # block => {token: tvl}, so repeat queries are free
+        self.cache = {}
+
+    ########## DISCOVERY ##########
+
+    def vault(self, address):
+        if address not in self.vaults:
+            self.vaults[address] = Contract.from_abi("Vault", address, VAULT_ABI)
+        return self.vaults[address]
+
+    # walk every vault's queue for routers, following each router on to its destinations (which may have routers
+    # of their own). a destination shared by several routers is only added to our graph once. each call starts over,
+    # so routers that have left a queue since our last discovery are dropped
+    def discover(self, block=None):
+        block = block or chain.height
+        self.vaults = {}
+        self.routers = {}
+        self.router_contracts = {}
+        self.discovered = block
+        queue = list(self.origin_vaults)
+        seen = set()
+        while queue:
+            address = queue.pop()
+            if address in seen:
+                continue
+            seen.add(address)
+            vault = self.vault(address)
+            self.tokens[address] = want(vault, block)
+
+            for strategy in strategies(vault, block):
+                destinations = router_destinations(strategy, block)
+                if not destinations:
+                    continue
+                self.routers[strategy] = (address, destinations)
+                self.router_contracts[strategy] = Contract.from_abi(
+                    "Router", strategy, ROUTER_ABI
+                )
+                queue.extend(destinations)
+        return self.graph()
+
+    def graph(self):
+        return {
+            router: {"origin": origin, "destinations": destinations}
+            for router, (origin, destinations) in self.routers.items()
+        }
+
+    ########## TVL ##########
+
+    # one multicall per block: every vault's totalAssets and totalDebt once, plus each router's delegatedAssets
+    def read(self, block):
+        with multicall(address=self.multicall_address, block_identifier=block):
+            assets = {x: vault.totalAssets() for x, vault in self.vaults.items()}
+            debts = {x: vault.totalDebt() for x, vault in self.vaults.items()}
+            delegated = {
+                x: router.delegatedAssets()
+                for x, router in self.router_contracts.items()
+            }
+
+        # multicall hands back None for anything that reverted, like a router that wasn't deployed yet
+        return [
+            {x: int(y or 0) for x, y in values.items()}
+            for values in (assets, debts, delegated)
+        ]
+
+    def tvl_at(self, block):
+        if block in self.cache:
+            return self.cache[block]
+        if not self.vaults:
+            self.discover(block)
+
+        assets, debts, delegated = self.read(block)
+        # a router can't be funded, migrated or removed without some vault's or router's debt changing, so that's
+        # when we walk our queues again. quiet blocks keep our graph and cost one multicall
+        if block != self.discovered and (
+            self.debts is None or (debts, delegated) != self.debts
+        ):
+            self.discover(block)
+            assets, debts, delegated = self.read(block)
+        self.debts = (debts, delegated)
+
+        tvl = {}
+        for address, total in assets.items():
+            token = self.tokens[address]
+            tvl[token] = tvl.get(token, 0) + total
+        for router, (origin, destinations) in self.routers.items():
+            # only an overlap if we're counting where the router sends its funds
+            if any(x in self.vaults for x in destinations):
+                token = self.tokens[origin]
+                tvl[token] -= delegated[router]
+
+        self.cache[block] = tvl
+        return tvl
+
+    def tvl_range(self, start, end, step=1):
+        for block in range(start, end + 1, step):
+            yield (block, self.tvl_at(block))
+
+
+# V2 vaults call it token, V3 and 4626 vaults call it asset
+def want(vault, block):
+    try:
+        return vault.token(block_identifier=block)
+    except Exception:
+        return vault.asset(block_identifier=block)
+
+
+def strategies(vault, block):
+    found = []
+    for i in range(MAX_STRATEGIES):
+        try:
+            strategy = vault.withdrawalQueue(i, block_identifier=block)
+        except Exception:
+            # V3 vaults don't have a withdrawal queue, their strategies aren't routers
+            break
+        if strategy == ZERO_ADDRESS:
+            break
+        found.append(strategy)
+    return found
+
+
+# our routers expose yVault(), our multi router getDestinations() on top, so ask for every leg first. anything else
+# isn't a router
+def router_destinations(strategy, block):
+    router = Contract.from_abi("Router", strategy, ROUTER_ABI)
+    try:
+        return list(router.getDestinations(block_identifier=block))
+    except Exception:
+        pass
+    try:
+        return [router.yVault(block_identifier=block)]
+    except Exception:
+        return []
+
+
+def main():
+    vaults = click.prompt("Origin vault addresses, comma separated", type=str)
+    start = click.prompt("First block", type=int, default=chain.height)
+    end = click.prompt("Last block", type=int, default=start)
+    step = click.prompt("Blocks between samples", type=int, default=1)
+
+    portfolio = PortfolioTVL([x.strip() for x in vaults.split(",")])
+    for router, info in portfolio.discover(start).items():
+        print("Router:", router, info["origin"], "=>", ", ".join(info["destinations"]))
+
+    for block, tvl in portfolio.tvl_range(start, end, step):
+        for token, amount in tvl.items():
+            print(block, token, amount)
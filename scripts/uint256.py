@@ -0,0 +1,427 @@
+import numpy as np
+
+# vectorized uint256 math for modeling our contracts off-chain over big batches of positions, without falling back
+# to python ints. each value is 8 little-endian 32-bit limbs held in uint64, so limb products and carries never
+# overflow. limbs are stored limb-major, shape (8, n), so each limb is one contiguous array.
+#
+# +, -, * wrap mod 2**256 like solidity's unchecked blocks. checked_add/checked_sub/checked_mul revert (raise
+# OverflowError) like default solidity 0.8 math, and dividing by zero always raises, like solidity's panic.
+
+LIMBS = 8
+BITS = 32
+MASK = np.uint64(2**BITS - 1)
+SHIFT = np.uint64(BITS)
+BASE = np.uint64(2**BITS)
+MAX_UINT256 = 2**256 - 1
+
+
+class Uint256Array:
+    def __init__(self, limbs):
+        # keep each limb contiguous, every loop below walks one limb at a time
+        limbs = np.ascontiguousarray(limbs, dtype=np.uint64)
+        assert limbs.ndim == 2 and limbs.shape[0] == LIMBS
+        self.limbs = limbs
+
+    ########## CONVERSIONS ##########
+
+    @classmethod
+    def from_ints(cls, values):
+        values = [int(x) for x in values]
+        if any(x < 0 or x > MAX_UINT256 for x in values):
+            raise ValueError("Values must fit in a uint256")
+        raw = b"".join(x.to_bytes(32, "little") for x in values)
+        limbs = np.frombuffer(raw, dtype="<u4").reshape(len(values), LIMBS)
+        return cls(limbs.T)
+
+    @classmethod
+    def zeros(cls, length):
+        return cls(np.zeros((LIMBS, length), dtype=np.uint64))
+
+    def to_ints(self):
+        raw = self.limbs.T.astype("<u4").tobytes()
+        return [
+            int.from_bytes(raw[i * 32 : (i + 1) * 32], "little")
+            for i in range(len(self))
+        ]
+
+    # nearest float64, for anything that only needs a rough size (gas models, plots)
+    def to_floats(self):
+        out = np.zeros(len(self))
+        for i in reversed(range(_width(self.limbs))):
+            out = out * float(BASE) + self.limbs[i]
+        return out
+
+    def __len__(self):
+        return self.limbs.shape[1]
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return Uint256Array(self.limbs[:, [index]]).to_ints()[0]
+        return Uint256Array(self.limbs[:, index])
+
+    def __repr__(self):
+        return f"Uint256Array({self.to_ints()})"
+
+    # line up a python int, a list, or another array with our length
+    def _coerce(self, *others):
+        arrays = [self] + [_as_array(x) for x in others]
+        length = max(len(x) for x in arrays)
+        return tuple(_broadcast(x.limbs, length) for x in arrays)
+
+    ########## WRAPPING ARITHMETIC ##########
+
+    def __add__(self, other):
+        (a, b) = self._coerce(other)
+        return Uint256Array(_add(a, b)[0])
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        (a, b) = self._coerce(other)
+        return Uint256Array(_sub(a, b)[0])
+
+    def __rsub__(self, other):
+        (a, b) = self._coerce(other)
+        return Uint256Array(_sub(b, a)[0])
+
+    def __mul__(self, other):
+        (a, b) = self._coerce(other)
+        return Uint256Array(_mul(a, b, LIMBS))
+
+    __rmul__ = __mul__
+
+    def __divmod__(self, other):
+        (a, b) = self._coerce(other)
+        (quotient, remainder) = _divmod(a, b)
+        return (Uint256Array(quotient[:LIMBS]), Uint256Array(remainder))
+
+    def __floordiv__(self, other):
+        return divmod(self, other)[0]
+
+    def __mod__(self, other):
+        return divmod(self, other)[1]
+
+    # OpenZeppelin's Math.ceilDiv: a / b, plus one if there's anything left over
+    def ceildiv(self, other):
+        (a, b) = self._coerce(other)
+        (quotient, remainder) = _divmod(a, b)
+        (quotient, _) = _add(quotient, _from_bools(_nonzero(remainder), LIMBS))
+        return Uint256Array(quotient)
+
+    # OpenZeppelin's Math.mulDiv: x * y / denominator with a full 512-bit product, reverts if the result won't fit
+    def mul_div(self, y, denominator, round_up=False):
+        (x, y, denominator) = self._coerce(y, denominator)
+        (quotient, remainder) = _divmod(_mul(x, y), denominator)
+        if round_up:
+            (quotient, _) = _add(
+                quotient, _from_bools(_nonzero(remainder), quotient.shape[0])
+            )
+        if _nonzero(quotient[LIMBS:]).any():
+            raise OverflowError("Math: mulDiv overflow")
+        return Uint256Array(quotient[:LIMBS])
+
+    ########## CHECKED ARITHMETIC ##########
+
+    def checked_add(self, other):
+        (a, b) = self._coerce(other)
+        (result, carry) = _add(a, b)
+        if carry.any():
+            raise OverflowError("Arithmetic overflow")
+        return Uint256Array(result)
+
+    def checked_sub(self, other):
+        (a, b) = self._coerce(other)
+        (result, borrow) = _sub(a, b)
+        if borrow.any():
+            raise OverflowError("Arithmetic underflow")
+        return Uint256Array(result)
+
+    def checked_mul(self, other):
+        (a, b) = self._coerce(other)
+        product = _mul(a, b)
+        if _nonzero(product[LIMBS:]).any():
+            raise OverflowError("Arithmetic overflow")
+        return Uint256Array(product[:LIMBS])
+
+    ########## COMPARISONS ##########
+
+    def _compare(self, other):
+        (a, b) = self._coerce(other)
+        return _compare(a, b)
+
+    def __lt__(self, other):
+        return self._compare(other)[0]
+
+    def __gt__(self, other):
+        return self._compare(other)[1]
+
+    def __le__(self, other):
+        return ~self._compare(other)[1]
+
+    def __ge__(self, other):
+        return ~self._compare(other)[0]
+
+    def __eq__(self, other):
+        (less, greater) = self._compare(other)
+        return ~(less | greater)
+
+    def __ne__(self, other):
+        (less, greater) = self._compare(other)
+        return less | greater
+
+    __hash__ = None
+
+    ########## SELECTION ##########
+
+    # like numpy's where: our value where condition is true, other's where it isn't
+    def where(self, condition, other):
+        (a, b) = self._coerce(other)
+        return Uint256Array(np.where(np.asarray(condition, dtype=bool), a, b))
+
+    def minimum(self, other):
+        return self.where(self <= other, other)
+
+    def maximum(self, other):
+        return self.where(self >= other, other)
+
+
+########## LIMB HELPERS ##########
+# everything below works on raw limb arrays of shape (limbs, n), any number of limbs
+
+
+def _as_array(value):
+    if isinstance(value, Uint256Array):
+        return value
+    if isinstance(value, (int, np.integer)):
+        value = [value]
+    return Uint256Array.from_ints(value)
+
+
+def _broadcast(limbs, length):
+    if limbs.shape[1] == length:
+        return limbs
+    if limbs.shape[1] != 1:
+        raise ValueError("Arrays must be the same length, or one of them length 1")
+    return np.repeat(limbs, length, axis=1)
+
+
+def _nonzero(limbs):
+    return (limbs != 0).any(axis=0)
+
+
+def _from_bools(flags, size):
+    limbs = np.zeros((size, len(flags)), dtype=np.uint64)
+    limbs[0] = flags
+    return limbs
+
+
+# returns our sum and the carry out of the top limb. limbs above our widest value are zero, so we skip them
+def _add(a, b):
+    width = max(_width(a), _width(b))
+    out = np.zeros_like(a)
+    carry = np.zeros(a.shape[1], dtype=np.uint64)
+    for i in range(width):
+        row = out[i]
+        np.add(a[i], b[i], out=row)
+        row += carry
+        np.right_shift(row, SHIFT, out=carry)
+        row &= MASK
+    if width < a.shape[0]:
+        out[width] = carry
+        carry[:] = 0
+    return (out, carry.astype(bool))
+
+
+# returns our difference and the borrow out of the top limb
+def _sub(a, b):
+    width = max(_width(a), _width(b))
+    out = np.zeros_like(a)
+    borrow = np.zeros(a.shape[1], dtype=np.uint64)
+    for i in range(width):
+        row = out[i]
+        # goes negative (and so wraps to the top of uint64) exactly when we need to borrow
+        np.subtract(a[i], b[i], out=row)
+        row -= borrow
+        np.right_shift(row, SHIFT, out=borrow)
+        borrow &= np.uint64(1)
+        row &= MASK
+    # anything that wrapped is all ones above our widest value
+    out[width:] = borrow * MASK
+    return (out, borrow.astype(bool))
+
+
+# product of our values, as many limbs wide as both inputs put together unless we only want the low limbs.
+# skips limbs that are zero in every value, which is most of them for realistic token amounts
+def _mul(a, b, size=None):
+    size = size or a.shape[0] + b.shape[0]
+    columns = np.zeros((size + 1, a.shape[1]), dtype=np.uint64)
+    product = np.empty(a.shape[1], dtype=np.uint64)
+    half = np.empty(a.shape[1], dtype=np.uint64)
+    (width_a, width_b) = (min(_width(a), size), _width(b))
+    for i in range(width_a):
+        for j in range(min(width_b, size - i)):
+            np.multiply(a[i], b[j], out=product)
+            columns[i + j] += np.bitwise_and(product, MASK, out=half)
+            columns[i + j + 1] += np.right_shift(product, SHIFT, out=half)
+    for i in range(min(width_a + width_b, size)):
+        columns[i + 1] += columns[i] >> SHIFT
+        columns[i] &= MASK
+    return columns[:size]
+
+
+# how many of our low limbs are nonzero in at least one value
+def _width(limbs):
+    used = np.flatnonzero(limbs.any(axis=1))
+    return int(used[-1]) + 1 if len(used) else 1
+
+
+# returns (a < b, a > b)
+def _compare(a, b):
+    less = np.zeros(a.shape[1], dtype=bool)
+    greater = np.zeros(a.shape[1], dtype=bool)
+    undecided = np.ones(a.shape[1], dtype=bool)
+    for i in reversed(range(max(_width(a), _width(b)))):
+        less |= undecided & (a[i] < b[i])
+        greater |= undecided & (a[i] > b[i])
+        undecided &= a[i] == b[i]
+    return (less, greater)
+
+
+# how many bits each value uses
+def _bit_length(limbs):
+    bits = np.zeros(limbs.shape[1], dtype=np.int64)
+    for i in range(_width(limbs)):
+        # frexp gives us the exponent exactly, every uint32 fits in a float64
+        limb_bits = np.frexp(limbs[i].astype(np.float64))[1]
+        np.copyto(bits, limb_bits + i * BITS, where=limbs[i] != 0)
+    return bits
+
+
+# shift each value left by its own number of bits (under a limb), into a result this many limbs wide
+def _shift_left(limbs, shifts, size):
+    shifted = limbs << shifts
+    out = np.zeros((size, limbs.shape[1]), dtype=np.uint64)
+    width = min(limbs.shape[0], size)
+    out[:width] = shifted[:width] & MASK
+    # spill each limb's high bits into the next limb up
+    out[1 : width + 1] |= shifted[: size - 1] >> SHIFT
+    return out
+
+
+def _shift_right(limbs, shifts):
+    out = limbs >> shifts
+    # pull each limb's low bits down from the next limb up
+    out[:-1] |= (limbs[1:] << (SHIFT - shifts)) & MASK
+    return out
+
+
+# long division (Knuth's algorithm D) on every value at once. returns a quotient as wide as our numerator and a
+# remainder as wide as our denominator. Knuth needs every denominator to use the same number of limbs, so we
+# divide each group of those separately, usually there's only one
+def _divmod(numerator, denominator):
+    denominator_bits = _bit_length(denominator)
+    if (denominator_bits == 0).any():
+        raise ZeroDivisionError("Division or modulo by zero")
+
+    denominator_limbs = -(-denominator_bits // BITS)
+    if denominator_limbs.min() == denominator_limbs.max():
+        return _divmod_limbs(
+            numerator, denominator, denominator_bits, int(denominator_limbs[0])
+        )
+
+    quotient = np.zeros(numerator.shape, dtype=np.uint64)
+    remainder = np.zeros(denominator.shape, dtype=np.uint64)
+    for size in np.unique(denominator_limbs):
+        rows = np.flatnonzero(denominator_limbs == size)
+        (quotient[:, rows], remainder[:, rows]) = _divmod_limbs(
+            numerator[:, rows], denominator[:, rows], denominator_bits[rows], int(size)
+        )
+    return (quotient, remainder)
+
+
+# divide by denominators that all use exactly n limbs
+def _divmod_limbs(numerator, denominator, denominator_bits, n):
+    length = numerator.shape[1]
+    quotient = np.zeros(numerator.shape, dtype=np.uint64)
+    remainder = np.zeros(denominator.shape, dtype=np.uint64)
+
+    # single limb denominators are plain uint64 math, one limb at a time from the top
+    if n == 1:
+        carry = np.zeros(length, dtype=np.uint64)
+        for j in reversed(range(_width(numerator))):
+            top = (carry << SHIFT) | numerator[j]
+            quotient[j] = top // denominator[0]
+            carry = top - quotient[j] * denominator[0]
+        remainder[0] = carry
+        return (quotient, remainder)
+
+    # only do as many rounds as we have quotient limbs
+    numerator_bits = _bit_length(numerator)
+    m = max(1, -(-int(numerator_bits.max()) // BITS))
+    rounds = min(m, -(-max(int((numerator_bits - denominator_bits).max()), 0) // BITS))
+
+    # normalize so every denominator's top bit is set, which keeps each quotient digit guess within 2 of the truth
+    shifts = ((n * BITS - denominator_bits) % BITS).astype(np.uint64)
+    v = _shift_left(denominator[:n], shifts, n)
+    u = _shift_left(numerator[:m], shifts, max(m, rounds + n) + 1)
+
+    top = np.empty(length, dtype=np.uint64)
+    guess = np.empty(length, dtype=np.uint64)
+    estimate = np.empty(length, dtype=np.uint64)
+    product = np.empty(length, dtype=np.uint64)
+    carry = np.empty(length, dtype=np.uint64)
+    borrow = np.empty(length, dtype=np.uint64)
+    for j in reversed(range(rounds + 1)):
+        # guess this digit from our top two limbs over the denominator's top limb, then correct it
+        np.left_shift(u[j + n], SHIFT, out=top)
+        top |= u[j + n - 1]
+        np.floor_divide(top, v[n - 1], out=guess)
+        np.minimum(guess, BASE - np.uint64(1), out=guess)
+        np.multiply(guess, v[n - 1], out=estimate)
+        np.subtract(top, estimate, out=estimate)
+        for _ in range(2):
+            too_big = (estimate < BASE) & (
+                guess * v[n - 2] > ((estimate << SHIFT) | u[j + n - 2])
+            )
+            if not too_big.any():
+                break
+            guess -= too_big
+            estimate += np.where(too_big, v[n - 1], np.uint64(0))
+
+        # subtract guess * denominator from this window of our numerator
+        carry.fill(0)
+        borrow.fill(0)
+        for i in range(n + 1):
+            row = u[i + j]
+            if i < n:
+                np.multiply(guess, v[i], out=product)
+                product += carry
+                np.right_shift(product, SHIFT, out=carry)
+                product &= MASK
+            else:
+                product[:] = carry
+            # goes negative (and so wraps to the top of uint64) exactly when we need to borrow
+            row -= product
+            row -= borrow
+            np.right_shift(row, SHIFT, out=borrow)
+            borrow &= np.uint64(1)
+            row &= MASK
+        negative = borrow.astype(bool)
+
+        # we still guessed one too high for some values, add the denominator back for those
+        if negative.any():
+            guess -= negative
+            carry.fill(0)
+            for i in range(n):
+                row = u[i + j]
+                row += np.where(negative, v[i], np.uint64(0))
+                row += carry
+                np.right_shift(row, SHIFT, out=carry)
+                row &= MASK
+            u[j + n] = (u[j + n] + carry) & MASK
+
+        if j < quotient.shape[0]:
+            quotient[j] = guess
+
+    remainder[:n] = _shift_right(u[:n], shifts)
+    return (quotient, remainder)
@@ -0,0 +1,384 @@
+import json
+
+import numpy as np
+from brownie import Contract, chain, web3
+import click
+from scripts.tvl import view, strategies, router_destinations
+from scripts.uint256 import Uint256Array
+
+# what a withdrawal from one of our origin V2 vaults would do, for a whole grid of sizes at once. we follow the
+# vault's withdraw(): idle funds first, then each strategy in the withdrawal queue for whatever is still missing.
+# routers run liquidatePosition against their destination's share price, taking losses only under dustThreshold;
+# other strategies are assumed to pay out up to their estimatedTotalAssets. a destination whose own strategies
+# would lose money can be given a loss in bps, and its withdrawal reverts past our router's maxLoss, as on chain.
+# our current V3 routers don't revert there: once they need more than their destination's idle funds, they only
+# redeem what it can pay back within maxLoss.
+#
+# everything runs off a snapshot (plain ints, so it can be saved as json), so we can sweep as many sizes as we like
+# without touching a node.
+
+# rough gas per step, swap in your own from calibrate_gas() on a fork
+GAS = {
+    "vault": 90_000,
+    "strategy": 60_000,
+    "destination": 80_000,
+    "destination_strategy": 70_000,
+}
+
+MAX_BPS = 10_000
+DEGRADATION_COEFFICIENT = 10**18
+
+VAULT_ABI = [
+    view("totalSupply"),
+    view("totalAssets"),
+    view("totalIdle"),
+    view("lockedProfit"),
+    view("lockedProfitDegradation"),
+    view("lastReport"),
+    view("token", output="address"),
+    view("asset", output="address"),
+    view("withdrawalQueue", ["uint256"], "address"),
+    view("get_default_queue", output="address[]"),
+    view("balanceOf", ["address"]),
+]
+STRATEGY_ABI = [
+    view("estimatedTotalAssets"),
+    view("dustThreshold"),
+    view("maxLoss"),
+]
+TOKEN_ABI = [view("balanceOf", ["address"])]
+
+# only our current routers have this, and only those on V3 destinations cap what they redeem
+PREVIEW_LIQUIDATE = dict(
+    view("previewLiquidate", ["uint256"]),
+    outputs=[{"name": "", "type": "uint256"} for _ in range(3)],
+)
+
+# V2 strategies() returns these, we only need totalDebt
+STRATEGY_PARAMS = {
+    "name": "strategies",
+    "type": "function",
+    "stateMutability": "view",
+    "inputs": [{"name": "", "type": "address"}],
+    "outputs": [{"name": "", "type": "uint256"} for _ in range(9)],
+}
+V3_STRATEGY_PARAMS = {
+    "name": "strategies",
+    "type": "function",
+    "stateMutability": "view",
+    "inputs": [{"name": "", "type": "address"}],
+    "outputs": [{"name": "", "type": "uint256"} for _ in range(4)],
+}
+
+
+########## SNAPSHOTS ##########
+
+
+# V2 vaults lock profit and release it over time, V3 vaults handle that in totalSupply. pass a timestamp to see
+# what a transaction in the next block would see
+def free_funds(vault, block, timestamp=None):
+    total_assets = vault.totalAssets(block_identifier=block)
+    try:
+        locked = vault.lockedProfit(block_identifier=block)
+        degradation = vault.lockedProfitDegradation(block_identifier=block)
+        last_report = vault.lastReport(block_identifier=block)
+    except Exception:
+        return total_assets
+    ratio = ((timestamp or chain[block].timestamp) - last_report) * degradation
+    if ratio >= DEGRADATION_COEFFICIENT:
+        return total_assets
+    return total_assets - (locked - ratio * locked // DEGRADATION_COEFFICIENT)
+
+
+# destination vault's idle funds, and the debt of each strategy in its queue (in order)
+def destination_snapshot(address, block):
+    vault = Contract.from_abi("Vault", address, VAULT_ABI + [STRATEGY_PARAMS])
+    token = vault_token(vault, block)
+    queue = strategies(vault, block)
+    if queue:
+        debts = [vault.strategies(x, block_identifier=block)[6] for x in queue]
+    else:
+        # V3 vaults keep a default queue and call it current_debt
+        vault = Contract.from_abi("Vault", address, VAULT_ABI + [V3_STRATEGY_PARAMS])
+        try:
+            queue = list(vault.get_default_queue(block_identifier=block))
+        except Exception:
+            queue = []
+        debts = [vault.strategies(x, block_identifier=block)[2] for x in queue]
+    return {
+        "address": address,
+        "v3": not strategies(vault, block),
+        "total_supply": vault.totalSupply(block_identifier=block),
+        "free_funds": free_funds(vault, block),
+        "idle": Contract.from_abi("Token", token, TOKEN_ABI).balanceOf(
+            address, block_identifier=block
+        ),
+        "strategy_debts": [int(x) for x in debts],
+    }
+
+
+def vault_token(vault, block):
+    try:
+        return vault.token(block_identifier=block)
+    except Exception:
+        return vault.asset(block_identifier=block)
+
+
+def snapshot(vault_address, block=None):
+    block = block or chain.height
+    vault = Contract.from_abi("Vault", vault_address, VAULT_ABI + [STRATEGY_PARAMS])
+    token = Contract.from_abi("Token", vault_token(vault, block), TOKEN_ABI)
+    state = {
+        "block": block,
+        "address": vault.address,
+        "total_supply": vault.totalSupply(block_identifier=block),
+        "free_funds": free_funds(vault, block),
+        "idle": token.balanceOf(vault, block_identifier=block),
+        "queue": [],
+    }
+
+    for address in strategies(vault, block):
+        strategy = Contract.from_abi("Strategy", address, STRATEGY_ABI)
+        entry = {
+            "address": address,
+            "total_debt": vault.strategies(address, block_identifier=block)[6],
+            "assets": strategy.estimatedTotalAssets(block_identifier=block),
+        }
+        destinations = router_destinations(address, block)
+        # the simulator follows single-destination routers, the multi router is treated like any other strategy
+        if len(destinations) == 1:
+            destination = destinations[0]
+            shares = Contract.from_abi("Vault", destination, VAULT_ABI)
+            entry["router"] = {
+                "loose": token.balanceOf(address, block_identifier=block),
+                "shares": shares.balanceOf(address, block_identifier=block),
+                "dust_threshold": strategy.dustThreshold(block_identifier=block),
+                "max_loss": strategy.maxLoss(block_identifier=block),
+                "destination": destination_snapshot(destination, block),
+                "destination_loss_bps": 0,
+            }
+            entry["router"]["caps_redeem"] = entry["router"]["destination"][
+                "v3"
+            ] and has_preview_liquidate(address, block)
+        state["queue"].append(entry)
+    return json.loads(json.dumps(state, default=int))
+
+
+def has_preview_liquidate(address, block):
+    router = Contract.from_abi("Router", address, [PREVIEW_LIQUIDATE])
+    try:
+        router.previewLiquidate(0, block_identifier=block)
+        return True
+    except Exception:
+        return False
+
+
+########## SIMULATION ##########
+
+
+def full(length, value):
+    return Uint256Array.from_ints([value]) + Uint256Array.zeros(length)
+
+
+# liquidatePosition for a router, for every amount at once. returns (freed, loss, reverted, redeeming, how many
+# destination strategies we'd pull from)
+def simulate_router(router, needed):
+    destination = router["destination"]
+    (supply, funds) = (destination["total_supply"], destination["free_funds"])
+    balance = router["loose"]
+    covered = needed <= balance
+
+    # shares we'd redeem, rounded up so we aren't short, but never more than we have
+    to_withdraw = (needed - balance).where(~covered, 0)
+    if supply and funds:
+        shares = to_withdraw.mul_div(supply, funds, round_up=True)
+        shares = shares.minimum(router["shares"])
+        received = shares.mul_div(funds, supply)
+    else:
+        (shares, received) = (to_withdraw, to_withdraw)
+
+    # our V3 routers ask maxRedeem once idle funds won't do. a V3 destination stops at the first strategy that would
+    # lose more than our maxLoss, so that's as far as we redeem, and nothing reverts
+    lossy = router["destination_loss_bps"] > router["max_loss"]
+    capped = router.get("caps_redeem") and supply and funds
+    if capped:
+        available = destination["idle"]
+        if not lossy:
+            available += sum(destination["strategy_debts"])
+        illiquid = to_withdraw > destination["idle"]
+        shares = shares.where(~illiquid, shares.minimum(available * supply // funds))
+        received = shares.mul_div(funds, supply)
+    redeeming = ~covered & (shares != 0)
+
+    # any loss in the destination's own strategies, and its maxLoss check against our router's setting
+    destination_loss = received.mul_div(router["destination_loss_bps"], MAX_BPS)
+    reverted = redeeming & (
+        destination_loss > received.mul_div(router["max_loss"], MAX_BPS)
+    )
+    if capped:
+        if lossy:
+            destination_loss = Uint256Array.zeros(len(needed))
+        reverted = np.zeros(len(needed), dtype=bool)
+    received = received - destination_loss
+
+    # same as _liquidationResult, dust-sized shortfalls are a loss, anything more just comes back short
+    loose = received + balance
+    short = needed > loose
+    diff = (needed - loose).where(short, 0)
+    freed = loose.where(short, needed)
+    loss = diff.where(short & (diff < router["dust_threshold"]), 0)
+    freed = freed.where(~covered, needed)
+    loss = loss.where(~covered, 0)
+
+    # destination pays from idle first, then walks its queue
+    from_strategies = np.maximum(received.to_floats() - destination["idle"], 0)
+    debts = np.cumsum([0] + destination["strategy_debts"])
+    touched = np.minimum(
+        np.searchsorted(debts, from_strategies, side="left"),
+        len(destination["strategy_debts"]),
+    )
+    return (freed, loss, reverted, redeeming, redeeming * touched)
+
+
+# the vault's withdraw() for each amount of want a user asks for, max_loss in bps like the vault's own argument
+def simulate(state, amounts, max_loss=1, gas=GAS):
+    amounts = Uint256Array.from_ints(amounts)
+    length = len(amounts)
+    (supply, funds) = (state["total_supply"], state["free_funds"])
+
+    # shares our user would burn for this much, and what the vault says those are worth
+    if supply and funds:
+        shares = amounts.mul_div(supply, funds, round_up=True)
+        value = shares.mul_div(funds, supply)
+    else:
+        (shares, value) = (amounts, amounts)
+    vault_balance = full(length, state["idle"])
+    total_loss = Uint256Array.zeros(length)
+    reverted = np.zeros(length, dtype=bool)
+    gas_used = np.full(length, gas["vault"], dtype=np.int64)
+
+    steps = {}
+    for strategy in state["queue"]:
+        missing = value > vault_balance
+        needed = (value - vault_balance).where(missing, 0)
+        needed = needed.minimum(strategy["total_debt"])
+        touched = needed != 0
+
+        redeeming = np.zeros(length, dtype=bool)
+        destination_strategies = np.zeros(length, dtype=np.int64)
+        if "router" in strategy:
+            (
+                freed,
+                loss,
+                router_reverted,
+                redeeming,
+                destination_strategies,
+            ) = simulate_router(strategy["router"], needed)
+            reverted |= touched & router_reverted
+            redeeming &= touched
+            destination_strategies *= touched
+        else:
+            freed = needed.minimum(strategy["assets"])
+            loss = Uint256Array.zeros(length)
+        freed = freed.where(touched, 0)
+        loss = loss.where(touched, 0)
+
+        vault_balance = vault_balance + freed
+        value = value - loss
+        total_loss = total_loss + loss
+        gas_used += (
+            touched * gas["strategy"]
+            + redeeming * gas["destination"]
+            + destination_strategies * gas["destination_strategy"]
+        )
+        steps[strategy["address"]] = {
+            "touched": touched,
+            "freed": freed,
+            "loss": loss,
+            "redeeming": redeeming,
+            "destination_strategies": destination_strategies,
+        }
+
+    # anything we couldn't free just doesn't get paid out, and the user only burns shares for what they got
+    short = value > vault_balance
+    value = value.where(~short, vault_balance)
+    if supply and funds:
+        shares = shares.where(~short, (value + total_loss).mul_div(supply, funds))
+
+    # the vault's own maxLoss check
+    reverted |= total_loss > (value + total_loss).mul_div(max_loss, MAX_BPS)
+    return {
+        "amount": amounts,
+        "received": value,
+        "shares": shares,
+        "loss": total_loss,
+        "reverted": reverted,
+        "gas": gas_used,
+        "strategies": steps,
+    }
+
+
+########## GAS ##########
+
+
+# fit our gas constants to real withdrawals on a fork. each sample is reverted, so the vault is left as we found it
+def calibrate_gas(vault, user, amounts, max_loss=1):
+    state = snapshot(vault.address)
+    result = simulate(state, amounts, max_loss)
+    steps = result["strategies"].values()
+    rows = np.stack(
+        [
+            np.ones(len(amounts)),
+            sum(x["touched"] for x in steps),
+            sum(x["redeeming"] for x in steps),
+            sum(x["destination_strategies"] for x in steps),
+        ],
+        axis=1,
+    )
+
+    # snapshot the node directly, brownie's chain.snapshot() would replace the one fn_isolation reverts to
+    gas_used = []
+    for shares in result["shares"].to_ints():
+        snapshot_id = web3.provider.make_request("evm_snapshot", [])["result"]
+        try:
+            tx = vault.withdraw(shares, user, max_loss, {"from": user})
+            gas_used.append(tx.gas_used)
+        finally:
+            web3.provider.make_request("evm_revert", [snapshot_id])
+
+    (fit, *_) = np.linalg.lstsq(rows.astype(float), np.array(gas_used, float))
+    return dict(zip(GAS, (int(max(x, 0)) for x in fit)))
+
+
+def depth_curve(state, amounts, max_loss=1, gas=GAS):
+    result = simulate(state, amounts, max_loss, gas)
+    return list(
+        zip(
+            result["amount"].to_ints(),
+            result["received"].to_ints(),
+            result["loss"].to_ints(),
+            result["reverted"].tolist(),
+            result["gas"].tolist(),
+        )
+    )
+
+
+def main():
+    vault = web3.toChecksumAddress(click.prompt("Origin vault address", type=str))
+    path = click.prompt("Snapshot file (blank to read the chain)", default="")
+    if path:
+        with open(path) as f:
+            state = json.load(f)
+    else:
+        state = snapshot(vault)
+        with open(f"withdraw_snapshot_{vault}_{state['block']}.json", "w") as f:
+            json.dump(state, f)
+
+    max_loss = click.prompt("Max loss in bps", type=int, default=1)
+    points = click.prompt("Points on our curve", type=int, default=50)
+    total = state["idle"] + sum(x["total_debt"] for x in state["queue"])
+    amounts = [total * (i + 1) // points for i in range(points)]
+
+    print("amount, received, loss, reverted, gas")
+    for row in depth_curve(state, amounts, max_loss):
+        print(*row, sep=", ")
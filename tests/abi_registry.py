@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+from brownie import Contract
+
+PROJECT = Path(__file__).parent.parent
+
+# addresses our fixtures look up, and the interface or compiled contract whose abi fits them
+KNOWN_ADDRESSES = {
+    # DAI yVault 0.4.3, our origin vault for V2 => V3
+    "0xdA816459F1AB5631232FE5e97a05BBBb94970c95": "IVaultFactory045",
+    # curve GUSD-3CRV yVault, our origin vault for V2 => V2
+    "0x2a38B9B0201Ca39B17B460eD2f11e4929559071E": "IVaultFactory045",
+    # newer curve GUSD-3CRV yVault, our destination for V2 => V2
+    "0x63bD3Bbb6c5cb6E457C3f3cbb2D8aa2536E319F1": "IVaultFactory045",
+    # V3 DAI vault, our destination for V2 => V3
+    "0x028eC7330ff87667b6dfb0D94b954c820195336c": "IVault",
+    # V3 DAI strategy in our destination vault
+    "0xAeDF7d5F3112552E110e5f9D08c9997Adce0b78d": "ITokenizedStrategy",
+    # strategy on a different vault, used to check migrations
+    "0x307Dd52c310e8a5253CBF1FfE5149487d18866eE": "ICurveStrategy045",
+}
+known_addresses = {k.lower(): v for k, v in KNOWN_ADDRESSES.items()}
+
+# interface or contract name => abi, so we only read each file once
+abis = {}
+
+
+# interfaces/ holds raw abis, brownie's build artifacts hold them under "abi"
+def load_abi(name):
+    if name in abis:
+        return abis[name]
+
+    for path in (
+        PROJECT / "interfaces" / f"{name}.json",
+        PROJECT / "build" / "interfaces" / f"{name}.json",
+        PROJECT / "build" / "contracts" / f"{name}.json",
+    ):
+        if path.exists():
+            data = json.loads(path.read_text())
+            abis[name] = data["abi"] if isinstance(data, dict) else data
+            return abis[name]
+
+    raise ValueError(f"No abi found for {name}, have we compiled yet?")
+
+
+# use our local abis for addresses we know, so we never need the block explorer for them
+def resolve_contract(address):
+    name = known_addresses.get(str(address).lower())
+    if name is None:
+        # fall back to brownie's deployments db, or the block explorer if we've never seen it
+        return Contract(address)
+    return Contract.from_abi(name, address, load_abi(name))
@@ -0,0 +1,161 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# run every test file against every router version we care about, and rebuild the table in tests/README.md
+#   python tests/compat_matrix.py [test files...]
+
+# same order as the README table: V2 new, v3 new, v3 old, v2 old
+VARIANTS = {
+    "v2-new": "new V2",
+    "v3-new": "new V3",
+    "v3-old": "old V3",
+    "v2-old": "old V2",
+}
+
+# each variant gets its own port, so its local chain doesn't collide with the others
+BASE_PORT = 8600
+
+TESTS = Path(__file__).parent
+README = TESTS / "README.md"
+REPORTS = TESTS.parent / "reports" / "matrix"
+
+
+# registered from conftest when the runner starts us, writes each test's outcome and why it failed
+class MatrixReport:
+    def __init__(self, output_path):
+        self.output_path = Path(output_path)
+        self.results = {}
+
+    def pytest_runtest_logreport(self, report):
+        if report.passed and report.when != "call":
+            return
+        if (
+            report.nodeid in self.results
+            and self.results[report.nodeid]["outcome"] != "passed"
+        ):
+            return
+        reason = None
+        if report.failed:
+            crash = getattr(report.longrepr, "reprcrash", None)
+            reason = crash.message if crash else str(report.longrepr)
+            reason = (
+                reason.strip().splitlines()[0][:120] if reason.strip() else "failed"
+            )
+        self.results[report.nodeid] = {"outcome": report.outcome, "reason": reason}
+
+    def pytest_sessionfinish(self, session):
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.output_path.write_text(json.dumps(self.results, indent=2))
+
+
+# point our network's local node at another port, so several sessions can run side by side
+def use_port(port):
+    from brownie._config import CONFIG
+
+    network = CONFIG.argv.get("network") or CONFIG.settings["networks"]["default"]
+    settings = CONFIG.networks[network]
+    settings["host"] = "http://127.0.0.1"
+    settings.setdefault("cmd_settings", {})["port"] = port
+
+
+def run_file(variant, port, test_file):
+    report_path = REPORTS / variant / f"{test_file.stem}.json"
+    report_path.unlink(missing_ok=True)
+    env = dict(
+        os.environ,
+        ROUTER_VARIANT=variant,
+        ROUTER_RPC_PORT=str(port),
+        ROUTER_MATRIX_REPORT=str(report_path),
+    )
+    process = subprocess.run(
+        ["brownie", "test", str(test_file)],
+        cwd=TESTS.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    if not report_path.exists():
+        output = (process.stdout + process.stderr).strip().splitlines()
+        return "failed", f"crashed: {output[-1] if output else process.returncode}"
+
+    results = json.loads(report_path.read_text())
+    outcomes = [x["outcome"] for x in results.values()]
+    failures = [x["reason"] for x in results.values() if x["outcome"] == "failed"]
+    if failures:
+        return "failed", failures[0]
+    if outcomes and all(x == "skipped" for x in outcomes):
+        return "skipped", None
+    return "passed", None
+
+
+# run our test files one after another on this variant's chain, a fresh node for each file
+def run_variant(variant, port, test_files):
+    results = {}
+    for test_file in test_files:
+        results[test_file.name] = run_file(variant, port, test_file)
+        outcome, reason = results[test_file.name]
+        print(f"{variant} {test_file.name}: {reason or outcome}")
+    return results
+
+
+MARKS = {"passed": "✅", "failed": "🚫", "skipped": "➖"}
+
+
+def table(test_files, results):
+    lines = ["# V2 new, v3 new, v3 old, v2 old"]
+    for test_file in test_files:
+        outcomes = [results[x][test_file.name] for x in VARIANTS]
+        marks = [MARKS[outcome] for outcome, _ in outcomes]
+        line = f"brownie test tests/{test_file.name} -s # {marks[0]}{marks[1]} {marks[2]}{marks[3]}"
+        reasons = [
+            f"{name} fails on {reason}"
+            for name, (outcome, reason) in zip(VARIANTS.values(), outcomes)
+            if outcome == "failed"
+        ]
+        if reasons:
+            line += " # " + "; ".join(reasons)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+TABLE = re.compile(r"# V2 new, v3 new, v3 old, v2 old\n.*?(?=\n```)", re.DOTALL)
+
+
+# the test files our README table already covers, in its order
+def readme_files():
+    block = TABLE.search(README.read_text()).group(0)
+    return [TESTS / x for x in re.findall(r"brownie test tests/(\S+)", block)]
+
+
+def update_readme(new_table):
+    README.write_text(TABLE.sub(lambda _: new_table, README.read_text(), count=1))
+
+
+def main(paths):
+    if paths:
+        test_files = [Path(x).resolve() for x in paths]
+    else:
+        test_files = readme_files()
+
+    with ThreadPoolExecutor(len(VARIANTS)) as executor:
+        futures = {
+            variant: executor.submit(run_variant, variant, BASE_PORT + i, test_files)
+            for i, variant in enumerate(VARIANTS)
+        }
+        results = {variant: future.result() for variant, future in futures.items()}
+
+    new_table = table(test_files, results)
+    print(new_table)
+    if not paths:
+        update_readme(new_table)
+        print(f"Updated {README}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,6 +1,14 @@
+import os
 import pytest
 from brownie import config, ZERO_ADDRESS, chain, interface, accounts, Contract
 import requests
+from utils import fund_account, harvest_strategy
+from rpc_stats import RpcStats
+from rpc_cassette import RpcCassette
+from node_supervisor import NodeSupervisor
+from tx_history import BoundedHistory
+from compat_matrix import MatrixReport, use_port
+from abi_registry import resolve_contract
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -14,6 +22,45 @@ use_tenderly = False
 # use this to set what chain we use. 1 for ETH, 250 for fantom, 10 optimism, 42161 arbitrum
 chain_used = 1
 
+# set this to count and time every json-rpc call per test, printing a ranked report at the end of the session
+track_rpc_calls = False
+
+# set this to "record" to save every json-rpc call of a session (and our node's fork fetches) to a cassette, or to
+# "replay" to re-run the same selection of tests offline against that cassette, without a node at all
+rpc_cassette_mode = None
+rpc_cassette_path = "cassettes/session.json.gz"
+
+# set this to True to dump our node's state every few minutes, and restart it from the last dump (re-running the
+# test it died in) if it crashes. lets long selections run in one session on anvil instead of in split files
+supervise_node = False
+
+# set this to True to only keep our most recent receipts in brownie's history (dropping their traces unless a test
+# fails), and to relaunch our node from a state dump every so often so it sheds everything it's built up. needs anvil
+bounded_history = False
+
+# set by tests/compat_matrix.py, which runs each router version on its own port and collects our results
+router_variant = os.environ.get("ROUTER_VARIANT")
+
+
+def pytest_configure(config):
+    if track_rpc_calls:
+        config.pluginmanager.register(RpcStats("reports/rpc_stats.json"), "rpc_stats")
+    if rpc_cassette_mode:
+        config.pluginmanager.register(
+            RpcCassette(rpc_cassette_mode, rpc_cassette_path), "rpc_cassette"
+        )
+    node = NodeSupervisor("reports/node_state.json.gz")
+    if supervise_node:
+        config.pluginmanager.register(node, "node_supervisor")
+    if bounded_history:
+        config.pluginmanager.register(BoundedHistory(node), "bounded_history")
+    if os.environ.get("ROUTER_RPC_PORT"):
+        use_port(int(os.environ["ROUTER_RPC_PORT"]))
+    if os.environ.get("ROUTER_MATRIX_REPORT"):
+        config.pluginmanager.register(
+            MatrixReport(os.environ["ROUTER_MATRIX_REPORT"]), "matrix_report"
+        )
+
 
 ################################################## TENDERLY DEBUGGING ##################################################
 
@@ -48,21 +95,11 @@ def token(use_v3):
 
 
 @pytest.fixture(scope="session")
-def whale(amount, token, use_v3):
+def whale(amount, token):
     # Totally in it for the tech
-    # Update this with a large holder of your want token (the largest EOA holder of LP)
-    if use_v3:
-        whale = accounts.at(
-            "0xD1668fB5F690C59Ab4B0CAbAd0f8C1617895052B", force=True
-        )  # 0xD1668fB5F690C59Ab4B0CAbAd0f8C1617895052B, EOA, 47M DAI
-    else:
-        whale = accounts.at(
-            "0xB41742195962ca2D9886690AC2854aBf7B826090", force=True
-        )  # 0xB41742195962ca2D9886690AC2854aBf7B826090, EOA, 737k tokens
-    if token.balanceOf(whale) < 2 * amount:
-        raise ValueError(
-            "Our whale needs more funds. Find another whale or reduce your amount variable."
-        )
+    # we write our whale's balance straight into the token's storage, so we never depend on a real holder's balance
+    whale = accounts[1]
+    fund_account(token, whale, 10 * amount)
     yield whale
 
 
@@ -73,20 +110,10 @@ def amount(token):
 
 
 @pytest.fixture(scope="session")
-def profit_whale(profit_amount, token, use_v3):
+def profit_whale(profit_amount, token):
     # ideally not the same whale as the main whale, or else they will lose money
-    if use_v3:
-        profit_whale = accounts.at(
-            "0x837c20D568Dfcd35E74E5CC0B8030f9Cebe10A28", force=True
-        )  # 0x837c20D568Dfcd35E74E5CC0B8030f9Cebe10A28, eoa, 34M DAI
-    else:
-        profit_whale = accounts.at(
-            "0xdE86EA8867E63a4133E255a3E2FF912dfeA6D658", force=True
-        )  # 0xdE86EA8867E63a4133E255a3E2FF912dfeA6D658, eoa, 230k tokens
-    if token.balanceOf(profit_whale) < 5 * profit_amount:
-        raise ValueError(
-            "Our profit whale needs more funds. Find another whale or reduce your profit_amount variable."
-        )
+    profit_whale = accounts[2]
+    fund_account(token, profit_whale, 1_000 * profit_amount)
     yield profit_whale
 
 
@@ -291,7 +318,7 @@ def target(destination_strategy):
 # this should be a strategy from a different vault to check during migration
 @pytest.fixture(scope="session")
 def other_strategy():
-    yield Contract("0x307Dd52c310e8a5253CBF1FfE5149487d18866eE")
+    yield resolve_contract("0x307Dd52c310e8a5253CBF1FfE5149487d18866eE")
 
 
 @pytest.fixture
@@ -357,13 +384,19 @@ def strategy(
 # use this for whether we want to test the old version of the strategy
 @pytest.fixture(scope="session")
 def use_old():
-    yield False
+    if router_variant:
+        yield router_variant.endswith("old")
+    else:
+        yield False
 
 
 # use this if we're doing a V2 or V3 router
 @pytest.fixture(scope="session")
 def use_v3():
-    yield True
+    if router_variant:
+        yield router_variant.startswith("v3")
+    else:
+        yield True
 
 
 # flag to denote if we're migrating from existing strategies and thus will likely have profit on our first harvest
@@ -388,7 +421,7 @@ def is_router():
 def destination_vault(use_v3):
     # destination vault of the route.
     if use_v3:
-        yield Contract("0x028eC7330ff87667b6dfb0D94b954c820195336c")
+        yield resolve_contract("0x028eC7330ff87667b6dfb0D94b954c820195336c")
     else:
         yield interface.IVaultFactory045("0x63bD3Bbb6c5cb6E457C3f3cbb2D8aa2536E319F1")
 
@@ -397,6 +430,42 @@ def destination_vault(use_v3):
 def destination_strategy(destination_vault, use_v3):
     # destination curve strategy of the route
     if use_v3:
-        yield Contract("0xAeDF7d5F3112552E110e5f9D08c9997Adce0b78d")
+        yield resolve_contract("0xAeDF7d5F3112552E110e5f9D08c9997Adce0b78d")
     else:
         yield interface.ICurveStrategy045(destination_vault.withdrawalQueue(1))
+
+
+# our whale's deposit harvested into our destination, the starting point for testing our scripts against a router.
+# only our new routers have every view our scripts read
+@pytest.fixture
+def funded_router(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    profit_whale,
+    profit_amount,
+    target,
+    use_v3,
+    destination_vault,
+    use_old,
+):
+    if use_old:
+        pytest.skip("our scripts only read our new routers")
+
+    ## deposit to the vault after approving
+    token.approve(vault, 2**256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    harvest_strategy(
+        use_v3,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        target,
+        destination_vault,
+    )
+    yield strategy
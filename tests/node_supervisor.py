@@ -0,0 +1,127 @@
+import gzip
+import time
+from pathlib import Path
+
+import pytest
+from brownie import chain, web3
+from brownie._config import CONFIG
+from brownie.network import rpc
+
+# what a test fails with when our node goes away under it. only these get a rerun, a failure on a healthy node is real
+NODE_ERRORS = [
+    "ConnectionError",
+    "Connection refused",
+    "RemoteDisconnected",
+    "Max retries exceeded",
+]
+
+
+# keep our local node alive for long sessions: dump its state every so often, and if it dies mid-test, bring it
+# back from the last dump and let pytest-rerunfailures run that test again. state dumps need anvil.
+class NodeSupervisor:
+    def __init__(self, dump_path, dump_interval=300, max_retries=2):
+        self.dump_path = Path(dump_path)
+        self.dump_interval = dump_interval
+        self.max_retries = max_retries
+        self.last_dump = 0
+        self.dumped_module = None
+        self.state = None
+        self.can_dump = True
+        self.restarts = []
+
+    def healthy(self):
+        try:
+            return rpc.is_active() and web3.isConnected() and web3.eth.block_number > 0
+        except Exception:
+            return False
+
+    # a rerun starts from our last dump, so every module gets a fresh one as soon as its module fixtures are set up
+    def maybe_dump(self, module):
+        if (
+            module != self.dumped_module
+            or time.time() - self.last_dump >= self.dump_interval
+        ):
+            if self.dump():
+                self.dumped_module = module
+
+    def dump(self):
+        if not self.can_dump:
+            return False
+
+        response = web3.provider.make_request("anvil_dumpState", [])
+        if "error" in response:
+            print("\nOur node can't dump its state, we can restart it but not resume.")
+            self.can_dump = False
+            return False
+
+        self.state = response["result"]
+        self.last_dump = time.time()
+        self.dump_path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.dump_path, "wt") as f:
+            f.write(self.state)
+        return True
+
+    def restart(self, nodeid):
+        print(f"\nOur node died during {nodeid}, restarting it")
+        self.relaunch()
+        self.restarts.append(nodeid)
+
+    # a fresh node loaded from a dump only holds our current state, none of the history behind it
+    def compact(self):
+        if not self.dump():
+            return False
+        self.relaunch()
+        return True
+
+    # start a new node on the same port and load our last dump into it. we never disconnect brownie, so every
+    # contract object our fixtures handed out is still there, pointing at the same addresses in the loaded state
+    def relaunch(self):
+        rpc.kill(False)
+        network = CONFIG.active_network
+        rpc.launch(network["cmd"], **network.get("cmd_settings", {}))
+
+        if self.state is None and self.dump_path.exists():
+            with gzip.open(self.dump_path, "rt") as f:
+                self.state = f.read()
+        if self.state is not None:
+            web3.provider.make_request("anvil_loadState", [self.state])
+            # brownie keeps its own clock, catch it up with the blocks we just loaded
+            ahead = web3.eth.get_block("latest").timestamp - chain.time()
+            if ahead > 0:
+                chain.sleep(ahead)
+
+        # the old node's snapshots went with it. fn_isolation takes a new one when our next test starts, but
+        # module_isolation resets to one it took before this module's fixtures, so point it at what we just loaded
+        chain._reset_id = rpc.snapshot()
+
+    ########## HOOKS ##########
+
+    def pytest_configure(self, config):
+        if not config.pluginmanager.hasplugin("rerunfailures"):
+            raise pytest.UsageError(
+                "supervise_node needs pytest-rerunfailures to rerun tests"
+            )
+        config.option.reruns = max(config.option.reruns or 0, self.max_retries)
+        config.option.only_rerun = (config.option.only_rerun or []) + NODE_ERRORS
+
+    # runs before any of a (re)run's fixtures, so they're set up on a live node
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        if not self.healthy():
+            self.restart(item.nodeid)
+
+    # fn_isolation snapshots the state every test of a module starts from, after session and module fixtures but
+    # before any function fixtures. that's the state a rerun of this module should start from too
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        if fixturedef.argname == "fn_isolation" and self.healthy():
+            self.maybe_dump(request.node.nodeid.split("::")[0])
+        yield
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.restarts:
+            return
+        terminalreporter.section("node supervisor")
+        terminalreporter.write_line(f"Restarted our node {len(self.restarts)} times:")
+        for nodeid in self.restarts:
+            terminalreporter.write_line(f"  {nodeid}")
@@ -0,0 +1,250 @@
+import gzip
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pytest
+import requests
+from web3 import HTTPProvider
+from brownie._config import CONFIG
+
+# polling these again during replay is harmless, so we can answer repeats without losing our place
+REPEATABLE_METHODS = (
+    "eth_getTransactionReceipt",
+    "eth_getTransactionByHash",
+    "eth_chainId",
+    "net_version",
+    "web3_clientVersion",
+)
+
+# these move the chain's clock by an amount brownie works out from chain.time(), which is wall clock time plus an
+# offset, so their params are different every run. we match them on method alone
+TIME_METHODS = (
+    "evm_increaseTime",
+    "evm_setNextBlockTimestamp",
+    "anvil_setNextBlockTimestamp",
+    "evm_mine",
+)
+
+
+# record every json-rpc request and response of a session to a cassette, or serve one back without a node
+class RpcCassette:
+    def __init__(self, mode, path):
+        assert mode in ("record", "replay")
+        self.mode = mode
+        self.path = Path(path)
+        self.current = "<session>"
+        self.lock = threading.Lock()
+        self.tests = {}
+        self.fork = []
+        self.positions = {}
+        self.mismatches = {}
+        self.server = None
+        self.make_request = None
+        self.fork_settings = None
+
+    def pytest_configure(self, config):
+        network = CONFIG.argv.get("network") or CONFIG.settings["networks"]["default"]
+        network_config = CONFIG.networks[network]
+        if self.mode == "record":
+            self.wrap_provider()
+            self.start_fork_proxy(network_config)
+        else:
+            self.load()
+            self.start_stub(network_config)
+
+    ########## RECORDING ##########
+
+    # patch the provider class rather than an instance, so we also catch brownie connecting to our node
+    def wrap_provider(self):
+        make_request = self.make_request = HTTPProvider.make_request
+        cassette = self
+
+        def recorded_request(provider, method, params):
+            response = make_request(provider, method, params)
+            entry = {k: v for k, v in response.items() if k not in ("id", "jsonrpc")}
+            with cassette.lock:
+                cassette.tests.setdefault(cassette.current, []).append(
+                    [method, to_json(params), to_json(entry)]
+                )
+            return response
+
+        HTTPProvider.make_request = recorded_request
+
+    # point our node's fork url at a local proxy, so we also capture everything it fetches upstream
+    def start_fork_proxy(self, network_config):
+        cmd_settings = network_config.get("cmd_settings", {})
+        fork = cmd_settings.get("fork")
+        if not fork:
+            return
+
+        # brownie lets us fork by network id, like "mainnet"
+        if fork in CONFIG.networks:
+            fork = CONFIG.networks[fork]["host"]
+        upstream = os.path.expandvars(fork)
+        cassette = self
+
+        class ForkProxy(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                response = requests.post(
+                    upstream,
+                    data=body,
+                    headers={"Content-Type": "application/json"},
+                    timeout=600,
+                )
+                with cassette.lock:
+                    cassette.fork.append(
+                        [json.loads(body), json.loads(response.content)]
+                    )
+                self.send_response(response.status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response.content)))
+                self.end_headers()
+                self.wfile.write(response.content)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ForkProxy)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.fork_settings = (cmd_settings, cmd_settings["fork"])
+        cmd_settings["fork"] = f"http://127.0.0.1:{self.server.server_port}"
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        cassette = {"version": 1, "tests": self.tests, "fork": self.fork}
+        with gzip.open(self.path, "wt") as f:
+            json.dump(cassette, f)
+
+    ########## REPLAYING ##########
+
+    def load(self):
+        with gzip.open(self.path, "rt") as f:
+            cassette = json.load(f)
+        self.tests = cassette["tests"]
+
+    # stand in for our node where brownie expects to find it, brownie attaches to whatever is listening there
+    def start_stub(self, network_config):
+        host = urlparse(network_config["host"])
+        port = network_config.get("cmd_settings", {}).get("port", host.port or 8545)
+        cassette = self
+
+        class Stub(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = json.loads(
+                    self.rfile.read(int(self.headers["Content-Length"]))
+                )
+                if isinstance(request, list):
+                    response = [cassette.replay(r) for r in request]
+                else:
+                    response = cassette.replay(request)
+                content = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host.hostname, port), Stub)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def replay(self, request):
+        method = request["method"]
+        params = to_json(request.get("params", []))
+        key = call_key(method, params)
+        with self.lock:
+            recorded = self.tests.get(self.current, [])
+            position = self.positions.get(self.current, 0)
+
+            if position < len(recorded) and call_key(*recorded[position][:2]) == key:
+                self.positions[self.current] = position + 1
+                return self.response(request, recorded[position][2])
+
+            # connecting to a node and polling it don't happen in a fixed order, so there any matching call will do
+            if self.current == "<session>" or method in REPEATABLE_METHODS:
+                for entry in recorded[position:] + recorded[:position][::-1]:
+                    if call_key(*entry[:2]) == key:
+                        return self.response(request, entry[2])
+
+            # only keep the first divergence per test, everything after it is noise
+            expected = recorded[position][:2] if position < len(recorded) else None
+            self.mismatches.setdefault(
+                self.current,
+                {"position": position, "expected": expected, "got": [method, params]},
+            )
+            return self.response(
+                request,
+                {
+                    "error": {
+                        "code": -32000,
+                        "message": f"cassette mismatch at call {position} of {self.current}",
+                    }
+                },
+            )
+
+    @staticmethod
+    def response(request, entry):
+        return {"jsonrpc": "2.0", "id": request.get("id"), **entry}
+
+    ########## HOOKS ##########
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item):
+        self.current = item.nodeid
+        yield
+        self.current = "<session>"
+
+    def pytest_sessionfinish(self, session):
+        if self.mode == "record":
+            self.save()
+
+    # put back everything we patched, so nothing else in this process keeps talking through us
+    def pytest_unconfigure(self, config):
+        if self.make_request is not None:
+            HTTPProvider.make_request = self.make_request
+            self.make_request = None
+        if self.fork_settings is not None:
+            cmd_settings, fork = self.fork_settings
+            cmd_settings["fork"] = fork
+            self.fork_settings = None
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def pytest_terminal_summary(self, terminalreporter):
+        terminalreporter.section("rpc cassette")
+        if self.mode == "record":
+            calls = sum(len(x) for x in self.tests.values())
+            terminalreporter.write_line(
+                f"Recorded {calls} calls and {len(self.fork)} fork fetches to {self.path}"
+            )
+            return
+
+        if not self.mismatches:
+            terminalreporter.write_line(f"Replayed {self.path} with no mismatches")
+        for test, mismatch in self.mismatches.items():
+            terminalreporter.write_line(
+                f"{test} diverged at call {mismatch['position']}"
+            )
+            terminalreporter.write_line(f"  expected: {mismatch['expected']}")
+            terminalreporter.write_line(f"  got:      {mismatch['got']}")
+
+
+# normalize anything web3 hands us (HexBytes, AttributeDicts, tuples) into plain json
+def to_json(value):
+    return json.loads(json.dumps(value, default=str))
+
+
+# what we match a call on when replaying
+def call_key(method, params):
+    if method in TIME_METHODS:
+        return [method, None]
+    return [method, params]
@@ -0,0 +1,184 @@
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+from brownie import web3
+from brownie.network.state import _contract_map
+
+# json-rpc methods that carry a contract call we can decode
+CALL_METHODS = ("eth_call", "eth_estimateGas", "eth_sendTransaction")
+
+# methods where the node is doing the actual work of mining, not just answering questions
+MINING_METHODS = (
+    "eth_sendTransaction",
+    "eth_sendRawTransaction",
+    "evm_mine",
+    "evm_increaseTime",
+    "evm_snapshot",
+    "evm_revert",
+)
+
+
+# count and time every json-rpc request per test, so we know which tests are slow from chatter vs mining
+class RpcStats:
+    def __init__(self, output_path, top=20):
+        self.output_path = Path(output_path)
+        self.top = top
+        self.current = "<session>"
+        self.tests = defaultdict(self._empty)
+        self.durations = {}
+
+    @staticmethod
+    def _empty():
+        return {
+            "calls": 0,
+            "rpc_time": 0.0,
+            "mining_time": 0.0,
+            "methods": defaultdict(lambda: [0, 0.0]),
+            "functions": defaultdict(lambda: [0, 0.0]),
+        }
+
+    # wrap whatever provider we're on, the tenderly fixture may swap it out under us. brownie's own evm_* calls go
+    # straight to provider.make_request, everything else goes through web3's middleware chain, which the provider
+    # caches with whatever make_request it had when the chain was built. so we wrap make_request itself, then drop
+    # that cache, and both paths come through us exactly once
+    def wrap_provider(self):
+        provider = web3.provider
+        if provider is None or getattr(provider, "_rpc_stats", None) is self:
+            return
+
+        make_request = provider.make_request
+
+        def counted_request(method, params):
+            start = time.perf_counter()
+            try:
+                return make_request(method, params)
+            finally:
+                self.record(method, params, time.perf_counter() - start)
+
+        provider.make_request = counted_request
+        provider._rpc_stats = self
+        provider._rpc_stats_unwrapped = make_request
+        provider._request_func_cache = (None, None)
+
+    def unwrap_provider(self):
+        provider = web3.provider
+        if provider is None or getattr(provider, "_rpc_stats", None) is not self:
+            return
+        provider.make_request = provider._rpc_stats_unwrapped
+        del provider._rpc_stats
+        del provider._rpc_stats_unwrapped
+        provider._request_func_cache = (None, None)
+
+    def record(self, method, params, elapsed):
+        stats = self.tests[self.current]
+        stats["calls"] += 1
+        stats["rpc_time"] += elapsed
+        if method in MINING_METHODS:
+            stats["mining_time"] += elapsed
+
+        entry = stats["methods"][method]
+        entry[0] += 1
+        entry[1] += elapsed
+
+        if method in CALL_METHODS and params:
+            entry = stats["functions"][self.label(params[0])]
+            entry[0] += 1
+            entry[1] += elapsed
+
+    # turn a call's target and selector into something like "StrategyRouterV3.harvest"
+    @staticmethod
+    def label(tx):
+        to = tx.get("to")
+        data = tx.get("data") or tx.get("input") or "0x"
+        if not to:
+            return "<deployment>"
+
+        # only look at contracts we already know about, fetching anything new here would skew our numbers
+        contract = _contract_map.get(web3.toChecksumAddress(to))
+        selector = data[:10]
+        if contract is None:
+            return f"{to}.{selector}"
+        try:
+            name = contract.get_method(data)
+        except Exception:
+            name = None
+        return f"{contract._name}.{name or selector}"
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item):
+        self.wrap_provider()
+        self.current = item.nodeid
+        start = time.perf_counter()
+        yield
+        self.durations[item.nodeid] = time.perf_counter() - start
+        self.current = "<session>"
+
+    def pytest_sessionfinish(self, session):
+        report = self.build_report()
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.output_path.write_text(json.dumps(report, indent=2))
+
+    def build_report(self):
+        tests = []
+        methods = defaultdict(lambda: [0, 0.0])
+        functions = defaultdict(lambda: [0, 0.0])
+        for nodeid, stats in self.tests.items():
+            tests.append(
+                {
+                    "test": nodeid,
+                    "duration": self.durations.get(nodeid, 0.0),
+                    "calls": stats["calls"],
+                    "rpc_time": stats["rpc_time"],
+                    "mining_time": stats["mining_time"],
+                    "methods": {k: v for k, v in stats["methods"].items()},
+                    "functions": {k: v for k, v in stats["functions"].items()},
+                }
+            )
+            for key, (count, elapsed) in stats["methods"].items():
+                methods[key][0] += count
+                methods[key][1] += elapsed
+            for key, (count, elapsed) in stats["functions"].items():
+                functions[key][0] += count
+                functions[key][1] += elapsed
+
+        tests.sort(key=lambda x: x["rpc_time"], reverse=True)
+        return {
+            "tests": tests,
+            "methods": ranked(methods),
+            "functions": ranked(functions),
+        }
+
+    def pytest_terminal_summary(self, terminalreporter):
+        report = self.build_report()
+        write = terminalreporter.write_line
+        terminalreporter.section("rpc calls")
+
+        write("Slowest tests by time spent waiting on the node:")
+        for test in report["tests"][: self.top]:
+            chatter = test["rpc_time"] - test["mining_time"]
+            write(
+                f"  {test['rpc_time']:8.2f}s rpc ({chatter:7.2f}s calls, {test['mining_time']:7.2f}s mining)"
+                f" of {test['duration']:8.2f}s, {test['calls']:6d} calls  {test['test']}"
+            )
+
+        write("Most expensive json-rpc methods:")
+        for entry in report["methods"][: self.top]:
+            write(f"  {entry['time']:8.2f}s {entry['calls']:7d} calls  {entry['name']}")
+
+        write("Most expensive contract functions:")
+        for entry in report["functions"][: self.top]:
+            write(f"  {entry['time']:8.2f}s {entry['calls']:7d} calls  {entry['name']}")
+
+        write(f"Full report written to {self.output_path}")
+
+
+# sort totals by time spent, most expensive first
+def ranked(totals):
+    entries = [
+        {"name": name, "calls": count, "time": elapsed}
+        for name, (count, elapsed) in totals.items()
+    ]
+    return sorted(entries, key=lambda x: x["time"], reverse=True)
@@ -0,0 +1,191 @@
+import itertools
+
+import pytest
+from brownie import chain, web3, ZERO_ADDRESS
+from utils import harvest_strategy, check_status
+
+# plenty for any one of our setup calls, we skip gas estimation since it can't see the rest of the batch yet
+BATCH_GAS = 3_000_000
+
+# describe a test as a list of steps, run it, then check how our strategy's numbers moved since the checkpoint.
+# steps that only send transactions get queued up and mined together in a single block; anything that needs to
+# read the chain after its own transactions (harvests, checkpoints) mines whatever is queued first.
+#   ("deposit", fraction)     whale deposits this fraction of amount to the vault
+#   ("debt_ratio", fraction)  set our debtRatio to this fraction of where it is now
+#   ("donate", fraction)      whale sends this fraction of amount straight to our strategy
+#   ("withdraw", fraction)    whale withdraws this fraction of amount from the vault
+#   ("sleep", seconds)        warp forward before the next block
+#   ("no_health_check",)      turn off health check before a harvest that includes a donation
+#   ("harvest",)              harvest our strategy (and send profit to our destination first)
+#   ("checkpoint",)           record our strategy params, expectations are measured from here
+#
+# expectations, checked at the end:
+#   "debt_ratio": exact final debtRatio
+#   "loss": change in totalLoss since the checkpoint
+#   "gain_over_donation": totalGain grew by more than everything donated since the checkpoint
+#   "debt_paid": no debtOutstanding left
+SCENARIOS = {}
+
+
+def scenario(name, steps, expect):
+    SCENARIOS[name] = {"steps": steps, "expect": expect}
+
+
+# donate, withdraw less or more than the donation, then harvest, across the debtRatios we care about
+for (label, ratio), (withdraw_label, withdraw) in itertools.product(
+    (("full", 1), ("half", 0.5), ("zero", 0)),
+    (("under", 0.25), ("over", 0.525)),
+):
+    scenario(
+        f"{label}_debt_ratio_withdraw_{withdraw_label}_donation",
+        [
+            ("deposit", 1),
+            ("harvest",),
+            ("checkpoint",),
+        ]
+        + ([] if ratio == 1 else [("debt_ratio", ratio)])
+        + [
+            ("donate", 0.5),
+            ("withdraw", withdraw),
+            ("sleep", 86400),
+            ("no_health_check",),
+            ("harvest",),
+        ],
+        {
+            "debt_ratio": None if ratio == 1 else int(10_000 * ratio),
+            "loss": 0,
+            "gain_over_donation": True,
+            "debt_paid": True,
+        },
+    )
+
+
+# everything we need from our fixtures, so steps don't each need a long argument list
+class ScenarioRunner:
+    def __init__(self, **fixtures):
+        self.__dict__.update(fixtures)
+        self.pending = []
+        self.start = None
+        self.donated = 0
+        self.blocks_mined = 0
+
+    ########## BATCHED STEPS ##########
+
+    def deposit(self, fraction):
+        self.queue(self.token.approve, self.vault, 2**256 - 1, sender=self.whale)
+        self.queue(self.vault.deposit, int(self.amount * fraction), sender=self.whale)
+
+    # reads the debtRatio we have now, so only one of these per batch
+    def debt_ratio(self, fraction):
+        current = self.vault.strategies(self.strategy)["debtRatio"]
+        self.queue(
+            self.vault.updateStrategyDebtRatio,
+            self.strategy,
+            int(current * fraction),
+            sender=self.gov,
+        )
+
+    def donate(self, fraction):
+        donation = int(self.amount * fraction)
+        self.donated += donation
+        self.queue(self.token.transfer, self.strategy, donation, sender=self.whale)
+
+    # share price doesn't move until our next harvest, so it's safe to read it before the batch is mined
+    def withdraw(self, fraction):
+        to_withdraw = int(self.amount * fraction)
+        if self.vault_address != ZERO_ADDRESS:
+            # convert since our PPS isn't 1 (live vault!)
+            to_withdraw = to_withdraw * 10**18 // self.vault.pricePerShare()
+        self.queue(self.vault.withdraw, to_withdraw, sender=self.whale)
+
+    def sleep(self, seconds):
+        chain.sleep(seconds)
+
+    def no_health_check(self):
+        self.queue(self.strategy.setDoHealthCheck, False, sender=self.gov)
+
+    ########## STEPS THAT READ THE CHAIN ##########
+
+    def harvest(self):
+        self.mine_batch()
+        harvest_strategy(
+            self.use_v3,
+            self.strategy,
+            self.token,
+            self.gov,
+            self.profit_whale,
+            self.profit_amount,
+            self.target,
+            self.destination_vault,
+        )
+
+    def checkpoint(self):
+        self.mine_batch()
+        self.start = check_status(self.strategy, self.vault)
+        self.donated = 0
+
+    ########## RUNNING ##########
+
+    def queue(self, function, *args, sender):
+        self.pending.append((function, args, sender))
+
+    # send everything queued with automine off, so it all lands in one block
+    def mine_batch(self):
+        if not self.pending:
+            return
+        web3.provider.make_request("evm_setAutomine", [False])
+        try:
+            txs = [
+                function(
+                    *args,
+                    {"from": sender, "gas_limit": BATCH_GAS, "required_confs": 0},
+                )
+                for function, args, sender in self.pending
+            ]
+            chain.mine(1)
+        finally:
+            web3.provider.make_request("evm_setAutomine", [True])
+        self.pending = []
+        self.blocks_mined += 1
+
+        for tx in txs:
+            tx.wait(1)
+            assert tx.status == 1, f"{tx.fn_name} reverted in our batch"
+
+    def run(self, steps):
+        for step in steps:
+            (kind, *args) = step
+            getattr(self, kind)(*args)
+        self.mine_batch()
+
+    def check(self, expect):
+        print("\nAfter scenario")
+        params = check_status(self.strategy, self.vault)
+        start = self.start
+
+        if expect.get("debt_ratio") is not None:
+            assert params["debtRatio"] == expect["debt_ratio"]
+
+        if "loss" in expect:
+            loss = params["totalLoss"] - start["totalLoss"]
+            if self.is_slippery:
+                assert pytest.approx(loss, abs=self.RELATIVE_APPROX) == expect["loss"]
+            else:
+                assert loss == expect["loss"]
+
+        if expect.get("gain_over_donation"):
+            gain = params["totalGain"] - start["totalGain"]
+            if self.no_profit:
+                assert pytest.approx(gain, rel=self.RELATIVE_APPROX) == self.donated
+            else:
+                assert gain > self.donated
+
+        if expect.get("debt_paid"):
+            assert self.vault.debtOutstanding(self.strategy) == 0
+
+        # the vault's view of what we should hold matches what we actually hold
+        assert pytest.approx(
+            self.strategy.estimatedTotalAssets()
+            + self.vault.creditAvailable(self.strategy),
+            rel=self.RELATIVE_APPROX,
+        ) == int(self.vault.totalAssets() * params["debtRatio"] / 10_000)
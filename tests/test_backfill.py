@@ -0,0 +1,50 @@
+import os
+from brownie import chain
+from scripts.backfill import backfill, deployment_block, ColumnStore
+
+
+# fill in our router's history, cut it off partway through a write, and make sure we pick up where we left off
+def test_backfill(
+    vault,
+    funded_router,
+    destination_vault,
+    tmp_path,
+):
+    strategy = funded_router
+    chain.mine(5)
+
+    deployed = strategy.tx.block_number
+    assert deployment_block(strategy.address) == deployed
+
+    # stop short of the end, then tear our last row so it looks like we died mid-write
+    end = chain.height
+    backfill(strategy.address, tmp_path, deployed, end - 3, chunk_size=4, workers=3)
+    store = ColumnStore(tmp_path)
+    assert store.last_block() == end - 3
+    file = store.file("totalDebt")
+    os.truncate(file, os.path.getsize(file) - 5)
+    assert store.last_block() == end - 4
+
+    # second run only fetches what we're missing
+    backfill(strategy.address, tmp_path, deployed, end, chunk_size=4, workers=3)
+    data = store.load()
+    blocks = [int(x) for x in data["block"]]
+    assert blocks == list(range(deployed, end + 1))
+
+    # and every row matches asking the chain directly
+    for i in (0, len(blocks) // 2, len(blocks) - 1):
+        block = blocks[i]
+        assert data["estimatedTotalAssets"][i] == strategy.estimatedTotalAssets(
+            block_identifier=block
+        )
+        assert data["valueOfInvestment"][i] == strategy.valueOfInvestment(
+            block_identifier=block
+        )
+        assert data["pricePerShare"][i] == destination_vault.pricePerShare(
+            block_identifier=block
+        )
+        assert (
+            data["totalDebt"][i]
+            == vault.strategies(strategy, block_identifier=block)["totalDebt"]
+        )
+    assert data["totalDebt"].to_ints()[-1] > 0
@@ -0,0 +1,107 @@
+import pytest
+from utils import harvest_strategy, check_status
+import brownie
+from brownie import chain
+
+
+# test that an emergency exit can wind down our position over several harvests, one chunk at a time
+def test_chunked_exit(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    sleep_time,
+    profit_whale,
+    profit_amount,
+    target,
+    use_v3,
+    destination_vault,
+    use_old,
+):
+    if use_old:
+        pytest.skip("older versions don't have chunked exits")
+
+    ## deposit to the vault after approving
+    token.approve(vault, 2**256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    (profit, loss, extra) = harvest_strategy(
+        use_v3,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        target,
+        destination_vault,
+    )
+
+    # simulate earnings, harvest
+    chain.sleep(sleep_time)
+    (profit, loss, extra) = harvest_strategy(
+        use_v3,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        target,
+        destination_vault,
+    )
+
+    # only emergency authorized addresses can do this, and setting it doesn't touch our debt
+    with brownie.reverts():
+        strategy.setExitChunkSize(1, {"from": whale})
+    debt_ratio = vault.strategies(strategy)["debtRatio"]
+    chunk_size = strategy.balanceOfVault() // 4 + 1
+    strategy.setExitChunkSize(chunk_size, {"from": gov})
+    assert vault.strategies(strategy)["debtRatio"] == debt_ratio
+
+    # regular withdrawals aren't chunked
+    shares_before = strategy.balanceOfVault()
+    vault.withdraw(vault.balanceOf(whale) // 2, {"from": whale})
+    assert shares_before - strategy.balanceOfVault() > chunk_size
+
+    # start our emergency exit, should take about two more harvests. our first one books a big loss
+    strategy.setEmergencyExit({"from": gov})
+    strategy.setDoHealthCheck(False, {"from": gov})
+    print("\nAfter starting chunked exit")
+    strategy_params = check_status(strategy, vault)
+    starting_gain = strategy_params["totalGain"]
+    starting_loss = strategy_params["totalLoss"]
+
+    # each harvest should only redeem one chunk and hand everything it freed to the vault
+    for i in range(5):
+        shares_before = strategy.balanceOfVault()
+        if shares_before == 0:
+            break
+        (profit, loss, extra) = harvest_strategy(
+            use_v3,
+            strategy,
+            token,
+            gov,
+            profit_whale,
+            0,
+            target,
+            destination_vault,
+        )
+        assert 0 < shares_before - strategy.balanceOfVault() <= chunk_size
+
+    # check our current status
+    print("\nAfter chunked exit")
+    strategy_params = check_status(strategy, vault)
+
+    # we should be fully out, and whatever the first chunk booked as a loss should have come back as profit
+    assert strategy.balanceOfVault() == 0
+    assert strategy_params["totalDebt"] == 0
+    booked = strategy_params["totalLoss"] - starting_loss
+    returned = strategy_params["totalGain"] - starting_gain
+    assert booked > 0
+    assert returned + strategy.dustThreshold() >= booked
+
+    # and our whale can still get out
+    chain.sleep(86400 * 5)
+    chain.mine(1)
+    vault.withdraw({"from": whale})
+    assert vault.balanceOf(whale) == 0
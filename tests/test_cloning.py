@@ -34,7 +34,7 @@ def test_cloning(
 
     # skip this test if we don't clone
     if not is_clonable:
-        return
+        pytest.skip("not clonable")
 
     ## deposit to the vault after approving like normal
     starting_whale = token.balanceOf(whale)
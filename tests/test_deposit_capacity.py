@@ -0,0 +1,92 @@
+import pytest
+from utils import harvest_strategy, check_status
+import brownie
+from brownie import chain, accounts, ZERO_ADDRESS
+
+
+# test that our triggers respect our V3 destination vault's deposit limit
+def test_deposit_capacity(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    profit_whale,
+    profit_amount,
+    target,
+    use_v3,
+    destination_vault,
+    use_old,
+):
+    if not use_v3 or use_old:
+        pytest.skip("only the new V3 router clamps to the destination's deposit limit")
+
+    ## deposit to the vault after approving
+    token.approve(vault, 2**256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+
+    # only management can turn this on
+    with brownie.reverts():
+        strategy.setCapacityAware(True, {"from": whale})
+    strategy.setCapacityAware(True, {"from": gov})
+
+    # fill up our destination vault so it won't take any more deposits
+    role_manager = accounts.at(destination_vault.role_manager(), force=True)
+    destination_vault.set_role(role_manager, 2**14 - 1, {"from": role_manager})
+    if destination_vault.deposit_limit_module() != ZERO_ADDRESS:
+        destination_vault.set_deposit_limit_module(ZERO_ADDRESS, {"from": role_manager})
+    destination_vault.set_deposit_limit(
+        destination_vault.totalAssets(), {"from": role_manager}
+    )
+    assert strategy.availableDepositLimit() == 0
+
+    # we have credit, but nowhere to put it
+    strategy.setCreditThreshold(1, {"from": gov})
+    assert vault.creditAvailable(strategy) > 1
+    tx = strategy.harvestTrigger(0, {"from": gov})
+    print("\nShould we harvest? Should be false.", tx)
+    assert tx == False
+
+    # without capacity awareness we would harvest for nothing
+    strategy.setCapacityAware(False, {"from": gov})
+    tx = strategy.harvestTrigger(0, {"from": gov})
+    print("\nShould we harvest? Should be true.", tx)
+    assert tx == True
+    strategy.setCapacityAware(True, {"from": gov})
+
+    # harvest anyway, our credit should sit idle in the strategy
+    strategy.harvest({"from": gov})
+    assert strategy.balanceOfWant() > strategy.dustThreshold()
+
+    # once our vault asks for some of it back, our next harvest pays it from our idle want
+    idle = strategy.balanceOfWant()
+    shares = strategy.balanceOfVault()
+    debt_ratio = vault.strategies(strategy)["debtRatio"]
+    vault.updateStrategyDebtRatio(strategy, debt_ratio - 1, {"from": gov})
+    outstanding = vault.debtOutstanding(strategy)
+    assert outstanding > 0
+    strategy.harvest({"from": gov})
+    assert vault.debtOutstanding(strategy) == 0
+    assert strategy.balanceOfWant() <= idle - min(idle, outstanding)
+    if outstanding <= idle:
+        assert strategy.balanceOfVault() == shares
+    vault.updateStrategyDebtRatio(strategy, debt_ratio, {"from": gov})
+
+    # still no room, so no reason to tend
+    tx = strategy.tendTrigger(0, {"from": gov})
+    print("\nShould we tend? Should be false.", tx)
+    assert tx == False
+
+    # open our destination back up, and we should tend our idle want in
+    destination_vault.set_deposit_limit(2**256 - 1, {"from": role_manager})
+    tx = strategy.tendTrigger(0, {"from": gov})
+    print("\nShould we tend? Should be true.", tx)
+    assert tx == True
+
+    strategy.tend({"from": gov})
+    assert strategy.balanceOfWant() <= strategy.dustThreshold()
+    tx = strategy.tendTrigger(0, {"from": gov})
+    print("\nShould we tend? Should be false.", tx)
+    assert tx == False
+    strategy.setCreditThreshold(1e24, {"from": gov})
@@ -0,0 +1,99 @@
+import pytest
+from utils import harvest_strategy, check_status
+import brownie
+from brownie import chain
+
+
+# test sending our destination vault shares out in kind and writing them off our debt
+def test_exit_in_kind(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    sleep_time,
+    profit_whale,
+    profit_amount,
+    target,
+    use_v3,
+    destination_vault,
+    use_old,
+    management,
+):
+    # older versions don't have this
+    if use_old:
+        pytest.skip("older versions don't have exitInKind")
+
+    ## deposit to the vault after approving
+    token.approve(vault, 2**256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    (profit, loss, extra) = harvest_strategy(
+        use_v3,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        target,
+        destination_vault,
+    )
+
+    # simulate earnings, harvest
+    chain.sleep(sleep_time)
+    (profit, loss, extra) = harvest_strategy(
+        use_v3,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        target,
+        destination_vault,
+    )
+
+    # check our current status
+    print("\nBefore exit in kind")
+    strategy_params = check_status(strategy, vault)
+    starting_debt = strategy_params["totalDebt"]
+    starting_loss = strategy_params["totalLoss"]
+
+    # only governance can do this, only in emergency exit, and we need somewhere to send the shares
+    with brownie.reverts():
+        strategy.exitInKind(gov, {"from": gov})
+    strategy.setEmergencyExit({"from": gov})
+    with brownie.reverts():
+        strategy.exitInKind(gov, {"from": management})
+    with brownie.reverts():
+        strategy.exitInKind(brownie.ZERO_ADDRESS, {"from": gov})
+
+    # send our shares out in one transfer
+    shares = strategy.balanceOfVault()
+    value = strategy.valueOfInvestment()
+    receiver_before = destination_vault.balanceOf(gov)
+    tx = strategy.exitInKind(gov, {"from": gov})
+    assert destination_vault.balanceOf(gov) - receiver_before == shares
+    assert strategy.balanceOfVault() == 0
+    assert vault.strategies(strategy)["debtRatio"] == 0
+    assert tx.events["ExitedInKind"]["shares"] == shares
+    assert tx.events["ExitedInKind"]["value"] == value
+
+    # our next harvest should write the shares we sent out off our debt
+    (profit, loss, extra) = harvest_strategy(
+        use_v3,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        0,
+        target,
+        destination_vault,
+    )
+
+    # check our current status
+    print("\nAfter exit in kind")
+    strategy_params = check_status(strategy, vault)
+
+    assert strategy_params["totalDebt"] <= strategy.dustThreshold()
+    assert strategy_params["totalLoss"] - starting_loss == loss
+    assert 0 < loss <= starting_debt
@@ -0,0 +1,99 @@
+import math
+import pytest
+from utils import harvest_strategy
+from brownie import Contract
+from scripts.harvest_schedule import (
+    fit_accrual_rate,
+    optimal_delay,
+    read_usdc_per_want,
+    read_want_per_eth,
+    recommend,
+    ROUTER_ABI,
+    SECONDS_PER_YEAR,
+    DAY,
+)
+
+
+# a steady 5% a year should come back out of our fit, and our delay should sit at the bottom of its cost curve
+def test_harvest_schedule_math():
+    timestamps = [i * DAY for i in range(60)]
+    prices = [int(1e18 * 1.05 ** (x / SECONDS_PER_YEAR)) for x in timestamps]
+    rate = fit_accrual_rate(timestamps, prices)
+    assert pytest.approx(rate * SECONDS_PER_YEAR, rel=1e-6) == math.log(1.05)
+
+    (assets, cost, churn) = (1_000_000e18, 50e18, 2 / SECONDS_PER_YEAR)
+    delay = optimal_delay(assets, rate, cost, churn, 0, 10**9)
+
+    def cost_per_second(t):
+        return cost / t + assets * rate * churn * t / 2
+
+    assert cost_per_second(delay) <= cost_per_second(delay * 0.9)
+    assert cost_per_second(delay) <= cost_per_second(delay * 1.1)
+
+    # bigger harvests cost more per harvest so we wait longer, and nothing to earn means the max
+    assert optimal_delay(assets, rate, cost * 4, churn, 0, 10**9) > delay
+    assert optimal_delay(assets, 0, cost, churn, 0, 123) == 123
+    assert optimal_delay(1, rate, cost, churn, DAY, 30 * DAY) == 30 * DAY
+
+    with pytest.raises(ValueError):
+        fit_accrual_rate([0], [1e18])
+
+
+# recommend against our router on the fork, with its harvest gas measured locally
+def test_harvest_schedule_recommend(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    profit_whale,
+    profit_amount,
+    target,
+    use_v3,
+    use_old,
+    destination_vault,
+    keeper,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2**256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    harvest_strategy(
+        use_v3,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        target,
+        destination_vault,
+    )
+
+    history = ([0, SECONDS_PER_YEAR], [10**18, 105 * 10**16])
+    result = recommend(
+        strategy.address,
+        keeper,
+        history,
+        gas_price=20e9,
+        want_per_eth=10**18,
+        usdc_per_want=1e-12,
+    )
+    assert result["assets"] == vault.strategies(strategy)["totalDebt"]
+    assert pytest.approx(result["apr"]) == math.log(1.05)
+    assert result["harvest_gas"] > 0
+    assert DAY <= result["maxReportDelay"] <= 30 * DAY
+    assert result["min_profit"] == result["harvest_cost"]
+    assert result["target_profit"] > 0
+    assert result["net_apr"] < result["apr"]
+    assert result["harvestProfitMaxInUsdc"] >= result["harvestProfitMinInUsdc"]
+
+    # our old V2 routers price their thresholds in USDC, our V3 routers cache want per ETH once it's refreshed
+    router = Contract.from_abi("Router", strategy.address, ROUTER_ABI)
+    if use_old and not use_v3:
+        assert read_usdc_per_want(router) > 0
+        assert read_want_per_eth(router) is None
+    else:
+        assert read_usdc_per_want(router) is None
+    if use_v3 and not use_old:
+        strategy.updateWantPerEth({"from": gov})
+        assert read_want_per_eth(router) == (strategy.wantPerEth() or None)
@@ -0,0 +1,58 @@
+import pytest
+from brownie import accounts
+from scripts.load_test import LoadGenerator, NonceManager
+
+
+# a short burst of concurrent users, every op should land and nobody should lose more than rounding
+def test_load_generator(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    use_old,
+):
+    # our old routers round differently, we only promise rounding-sized losses for the new ones
+    if use_old:
+        pytest.skip("load test is for our new routers")
+
+    users = [accounts.add() for _ in range(6)]
+    generator = LoadGenerator(
+        vault,
+        strategy,
+        token,
+        gov,
+        users,
+        amount // 100,
+        rates={"deposit": 60, "withdraw": 30, "donate": 2, "harvest": 2},
+        workers=4,
+        tick=600,
+    )
+    generator.setup(whale)
+    assert all(token.allowance(x, vault) == 2**256 - 1 for x in users)
+
+    # same schedule for the same seed
+    assert generator.schedule(7200, 1) == generator.schedule(7200, 1)
+
+    report = generator.run(7200, seed=1)
+    print(report)
+    assert report["operations"] > 0
+    assert report["ops"]["deposit"]["ok"] > 0
+    for op, stats in report["ops"].items():
+        # our nonces never collide, so nothing fails
+        assert stats["failed"] == 0, op
+        assert stats["gas_p50"] <= stats["gas_max"]
+
+    # rounding only, a few wei per op at most
+    for op in ("deposit", "withdraw"):
+        if op in report["ops"]:
+            assert abs(report["ops"][op]["loss_max"]) <= 10
+
+    # our nonce manager picks up where the node is, then counts locally
+    nonces = NonceManager()
+    start = nonces.next(users[0].address)
+    assert start == users[0].nonce
+    assert nonces.next(users[0].address) == start + 1
+    nonces.reset(users[0].address)
+    assert nonces.next(users[0].address) == start
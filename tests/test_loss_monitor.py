@@ -0,0 +1,48 @@
+from brownie import accounts, chain
+from scripts.loss_monitor import LossMonitor
+
+
+# quiet blocks shouldn't re-read our router, and losing destination shares should alert in the very next block
+def test_loss_monitor(
+    gov,
+    token,
+    whale,
+    funded_router,
+    amount,
+    destination_vault,
+):
+    strategy = funded_router
+
+    alerts = []
+    monitor = LossMonitor([strategy.address], alert=lambda *x: alerts.append(x))
+    assert monitor.routers[strategy.address][2] == [destination_vault.address]
+    assert monitor.gaps[strategy.address] >= -strategy.dustThreshold()
+    assert alerts == []
+
+    # nothing touching our router, nothing to re-read
+    chain.mine(3)
+    assert monitor.changed(monitor.last_block + 1, chain.height) == set()
+    assert monitor.process() == []
+
+    # someone else depositing to our destination marks us dirty, but isn't a loss
+    token.approve(destination_vault, 2**256 - 1, {"from": whale})
+    destination_vault.deposit(amount // 10, {"from": whale})
+    assert monitor.changed(chain.height, chain.height) == {strategy.address}
+    assert monitor.process() == []
+
+    # lose a tenth of our destination shares
+    strategy_account = accounts.at(strategy, force=True)
+    lost = destination_vault.balanceOf(strategy) // 10
+    destination_vault.transfer(gov, lost, {"from": strategy_account})
+    block = chain.height
+    monitor.process()
+    assert len(alerts) == 1
+    (alert_block, router, assets, debt, gap) = alerts[0]
+    assert (alert_block, router) == (block, strategy.address)
+    assert gap == strategy.estimatedTotalAssets() - strategy.delegatedAssets() < 0
+
+    # the same gap again doesn't alert twice
+    destination_vault.deposit(amount // 10, {"from": whale})
+    assert monitor.changed(chain.height, chain.height) == {strategy.address}
+    monitor.process()
+    assert len(alerts) == 1
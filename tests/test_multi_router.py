@@ -0,0 +1,224 @@
+import pytest
+from utils import check_status
+import brownie
+from brownie import accounts, config, chain, ZERO_ADDRESS, StrategyRouterMulti
+
+
+# test splitting our funds between our usual destination and a fresh V2 vault
+def test_multi_router(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    sleep_time,
+    use_v3,
+    destination_vault,
+    use_old,
+    pm,
+    rewards,
+    guardian,
+    management,
+    RELATIVE_APPROX,
+):
+    # the multi router builds on StrategyRouterV3, so its first leg is a V3 vault
+    if not use_v3 or use_old:
+        pytest.skip("multi router needs a V3 destination")
+
+    # deploy a second destination, a fresh V2 vault for our want
+    Vault = pm(config["dependencies"][0]).Vault
+    second_vault = guardian.deploy(Vault)
+    second_vault.initialize(token, gov, rewards, "", "", guardian)
+    second_vault.setDepositLimit(2**256 - 1, {"from": gov})
+    second_vault.setManagement(management, {"from": gov})
+
+    # deploy our multi router on our usual destination and add our second vault
+    multi = gov.deploy(
+        StrategyRouterMulti, vault, destination_vault, "StrategyRouterMulti"
+    )
+    assert multi.getDestinations() == [destination_vault.address]
+    assert multi.targetWeight(destination_vault) == 10_000
+    multi.addDestination(second_vault, False, {"from": gov})
+    assert multi.getDestinations() == [destination_vault.address, second_vault.address]
+
+    # can't add twice, or a vault with a different want
+    with brownie.reverts():
+        multi.addDestination(destination_vault, True, {"from": gov})
+    with brownie.reverts():
+        multi.addDestination(second_vault, False, {"from": gov})
+    with brownie.reverts():
+        multi.addDestination(vault, False, {"from": gov})
+
+    # weights need to add up to 100%
+    with brownie.reverts():
+        multi.setTargetWeights([5_000, 4_000], {"from": gov})
+    multi.setTargetWeights([5_000, 5_000], {"from": gov})
+
+    # migrate our existing router over, we should keep all of its assets in our first leg
+    assets_before = strategy.estimatedTotalAssets()
+    vault.migrateStrategy(strategy, multi, {"from": gov})
+    assert multi.estimatedTotalAssets() >= assets_before - RELATIVE_APPROX
+    assert multi.valueOfDestination(second_vault) == 0
+
+    ## deposit to the vault after approving, our credit should go to our empty leg
+    starting_whale = token.balanceOf(whale)
+    token.approve(vault, 2**256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    multi.harvest({"from": gov})
+    chain.sleep(1)
+    chain.mine(1)
+    assert multi.valueOfDestination(second_vault) > 0
+    assert multi.balanceOfWant() <= multi.dustThreshold()
+
+    # our total assets should be the sum of our legs
+    assert multi.valueOfInvestment() == multi.valueOfDestination(
+        destination_vault
+    ) + multi.valueOfDestination(second_vault)
+
+    # check our current status
+    print("\nAfter harvest")
+    strategy_params = check_status(multi, vault)
+
+    # our empty leg is filled up to its target and no further, the rest goes to our first leg
+    total = multi.estimatedTotalAssets()
+    assert multi.valueOfDestination(second_vault) <= total // 2
+
+    # withdrawals pull from our most liquid leg first, and only that one if it can cover them
+    legs = [destination_vault, second_vault]
+    liquidity = [multi.liquidityOfDestination(x) for x in legs]
+    (most_liquid, other) = legs if liquidity[0] >= liquidity[1] else legs[::-1]
+    values_before = {x: multi.valueOfDestination(x) for x in legs}
+    to_withdraw = max(liquidity) // 2
+    assert to_withdraw > 0
+    vault_account = accounts.at(vault, force=True)
+    vault_before = token.balanceOf(vault)
+    multi.withdraw(to_withdraw, {"from": vault_account})
+    assert token.balanceOf(vault) - vault_before == to_withdraw
+    assert multi.valueOfDestination(other) == values_before[other]
+    assert multi.valueOfDestination(most_liquid) < values_before[most_liquid]
+
+    # once our first leg is full, want past our targets goes to any leg with room instead of sitting idle
+    multi.setTargetWeights([10_000, 0], {"from": gov})
+    role_manager = accounts.at(destination_vault.role_manager(), force=True)
+    destination_vault.set_role(role_manager, 2**14 - 1, {"from": role_manager})
+    if destination_vault.deposit_limit_module() != ZERO_ADDRESS:
+        destination_vault.set_deposit_limit_module(ZERO_ADDRESS, {"from": role_manager})
+    destination_vault.set_deposit_limit(
+        destination_vault.totalAssets(), {"from": role_manager}
+    )
+    assert multi.depositLimitOfDestination(destination_vault) == 0
+    second_before = multi.valueOfDestination(second_vault)
+    vault.deposit(amount // 2, {"from": whale})
+    multi.harvest({"from": gov})
+    chain.sleep(1)
+    chain.mine(1)
+    assert multi.valueOfDestination(second_vault) > second_before
+    assert multi.balanceOfWant() <= multi.dustThreshold()
+    destination_vault.set_deposit_limit(2**256 - 1, {"from": role_manager})
+
+    # can't remove our first leg, or a destination we still target
+    with brownie.reverts():
+        multi.removeDestination(destination_vault, {"from": gov})
+    multi.setTargetWeights([5_000, 5_000], {"from": gov})
+    with brownie.reverts():
+        multi.removeDestination(second_vault, {"from": gov})
+
+    # remove our second leg, funds should come back to the strategy
+    multi.setTargetWeights([10_000, 0], {"from": gov})
+    multi.removeDestination(second_vault, {"from": gov})
+    assert multi.getDestinations() == [destination_vault.address]
+    assert second_vault.balanceOf(multi) == 0
+    assert multi.balanceOfWant() > 0
+
+    # emergency exit should pull everything from what's left
+    multi.setEmergencyExit({"from": gov})
+    multi.harvest({"from": gov})
+    assert multi.valueOfInvestment() == 0
+    assert vault.strategies(multi)["totalDebt"] == 0
+
+    # whale should get their funds back
+    vault.withdraw({"from": whale})
+    assert token.balanceOf(whale) >= starting_whale - RELATIVE_APPROX
+
+
+# our most liquid leg can only cover part of a withdrawal, the rest should come from the next one instead of reverting
+def test_multi_router_illiquid_leg(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    use_v3,
+    destination_vault,
+    target,
+    use_old,
+    pm,
+    rewards,
+    guardian,
+    management,
+    RELATIVE_APPROX,
+):
+    # the multi router builds on StrategyRouterV3, so its first leg is a V3 vault
+    if not use_v3 or use_old:
+        pytest.skip("multi router needs a V3 destination")
+
+    # a fresh V2 vault for our second, smaller leg
+    Vault = pm(config["dependencies"][0]).Vault
+    second_vault = guardian.deploy(Vault)
+    second_vault.initialize(token, gov, rewards, "", "", guardian)
+    second_vault.setDepositLimit(2**256 - 1, {"from": gov})
+    second_vault.setManagement(management, {"from": gov})
+
+    multi = gov.deploy(
+        StrategyRouterMulti, vault, destination_vault, "StrategyRouterMulti"
+    )
+    multi.addDestination(second_vault, False, {"from": gov})
+    multi.setTargetWeights([9_000, 1_000], {"from": gov})
+    vault.migrateStrategy(strategy, multi, {"from": gov})
+
+    token.approve(vault, 2**256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    multi.harvest({"from": gov})
+    chain.sleep(1)
+    chain.mine(1)
+
+    # our credit fills both legs to their targets
+    total = multi.estimatedTotalAssets()
+    second_value = multi.valueOfDestination(second_vault)
+    assert second_value == pytest.approx(total // 10, rel=RELATIVE_APPROX)
+    assert multi.balanceOfWant() <= multi.dustThreshold()
+
+    # move most of our destination's idle funds into its strategy, and stop it from pulling them back out. it's still
+    # our most liquid leg, but can't cover what we'll ask for
+    role_manager = accounts.at(destination_vault.role_manager(), force=True)
+    destination_vault.set_role(role_manager, 2**14 - 1, {"from": role_manager})
+    destination_vault.set_minimum_total_idle(0, {"from": role_manager})
+    destination_vault.update_max_debt_for_strategy(
+        target, 2**256 - 1, {"from": role_manager}
+    )
+    liquid = second_value * 3 // 2
+    current_debt = destination_vault.strategies(target)["current_debt"]
+    destination_vault.update_debt(
+        target,
+        current_debt + destination_vault.totalIdle() - liquid,
+        {"from": role_manager},
+    )
+    destination_vault.set_default_queue([], {"from": role_manager})
+    first_liquidity = multi.liquidityOfDestination(destination_vault)
+    assert second_value < first_liquidity <= liquid
+
+    # ask for more than our first leg can give, the rest comes from our second
+    to_withdraw = first_liquidity + second_value // 2
+    first_before = multi.valueOfDestination(destination_vault)
+    vault_account = accounts.at(vault, force=True)
+    vault_before = token.balanceOf(vault)
+    multi.withdraw(to_withdraw, {"from": vault_account})
+    assert token.balanceOf(vault) - vault_before == to_withdraw
+    assert first_before - multi.valueOfDestination(destination_vault) == pytest.approx(
+        first_liquidity, rel=RELATIVE_APPROX
+    )
+    assert second_value - multi.valueOfDestination(second_vault) == pytest.approx(
+        second_value // 2, rel=RELATIVE_APPROX
+    )
@@ -0,0 +1,61 @@
+import pytest
+from brownie import chain
+from brownie.network import rpc
+from node_supervisor import NodeSupervisor
+
+# how many times test_rerun_after_node_dies has started
+attempts = []
+
+
+# kill our node mid-test, then bring it back from a dump: our fixtures' contracts and balances should all still be there
+def test_relaunch_restores_state(request, token, vault, whale, strategy, amount):
+    # this restarts our node, so only run it when we're supervising it anyway
+    if request.config.pluginmanager.get_plugin("node_supervisor") is None:
+        pytest.skip("supervise_node is off")
+
+    # only anvil can dump its state. keep the state we started from, so we can put it back when we're done
+    supervisor = NodeSupervisor("reports/test_node_state.json.gz")
+    if not supervisor.dump():
+        pytest.skip("our node can't dump its state")
+    start = supervisor.state
+    start_shares = vault.balanceOf(whale)
+
+    token.approve(vault, 2**256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    shares = vault.balanceOf(whale) - start_shares
+    assets = strategy.estimatedTotalAssets()
+    assert supervisor.dump()
+
+    rpc.kill(False)
+    assert not supervisor.healthy()
+    supervisor.restart("test_relaunch_restores_state")
+    assert supervisor.healthy()
+
+    assert vault.balanceOf(whale) == start_shares + shares
+    assert strategy.estimatedTotalAssets() == assets
+    assert chain.time() >= chain[-1].timestamp
+
+    # and we can keep going on the new node
+    vault.withdraw(shares // 2, {"from": whale})
+    assert vault.balanceOf(whale) == start_shares + shares - shares // 2
+
+    # go back to where we started, and give fn_isolation a snapshot of it on this node to revert to
+    supervisor.state = start
+    supervisor.relaunch()
+    assert vault.balanceOf(whale) == start_shares
+    chain.snapshot()
+
+
+# with supervise_node on, a test our node dies in is rerun from the last dump instead of failing
+def test_rerun_after_node_dies(request, token, whale):
+    if request.config.pluginmanager.get_plugin("node_supervisor") is None:
+        pytest.skip("supervise_node is off")
+
+    attempts.append(token.balanceOf(whale))
+    if len(attempts) == 1:
+        rpc.kill(False)
+        # this goes to a dead node and fails with a connection error, which gets us a rerun
+        token.balanceOf(whale)
+
+    assert len(attempts) == 2
+    assert attempts[1] == attempts[0]
@@ -0,0 +1,150 @@
+import pytest
+from utils import harvest_strategy, check_status
+import brownie
+from brownie import chain, accounts
+
+
+# test that our liquidation quote matches what an actual withdrawal from the strategy returns
+def test_preview_liquidate(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    sleep_time,
+    profit_whale,
+    profit_amount,
+    target,
+    use_v3,
+    destination_vault,
+    use_old,
+):
+    # older versions don't have this view
+    if use_old:
+        pytest.skip("older versions don't have previewLiquidate")
+
+    ## deposit to the vault after approving
+    token.approve(vault, 2**256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    (profit, loss, extra) = harvest_strategy(
+        use_v3,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        target,
+        destination_vault,
+    )
+
+    # simulate earnings, harvest
+    chain.sleep(sleep_time)
+    (profit, loss, extra) = harvest_strategy(
+        use_v3,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        target,
+        destination_vault,
+    )
+
+    # check our current status
+    print("\nBefore preview")
+    strategy_params = check_status(strategy, vault)
+
+    # anything we already hold loose shouldn't touch the destination vault
+    token.transfer(strategy, 1000, {"from": whale})
+    (liquidated, preview_loss, shares) = strategy.previewLiquidate(500)
+    assert liquidated == 500
+    assert preview_loss == 0
+    assert shares == 0
+
+    # quote a partial withdrawal, then have our vault actually pull it and compare
+    to_withdraw = strategy.estimatedTotalAssets() // 3
+    (liquidated, preview_loss, shares) = strategy.previewLiquidate(to_withdraw)
+    print("Quoted:", liquidated, "Loss:", preview_loss, "Shares:", shares)
+    assert shares > 0
+
+    vault_account = accounts.at(vault, force=True)
+    vault_before = token.balanceOf(vault)
+    shares_before = strategy.balanceOfVault()
+    strategy.withdraw(to_withdraw, {"from": vault_account})
+    assert token.balanceOf(vault) - vault_before == liquidated
+    assert shares_before - strategy.balanceOfVault() == shares
+
+    # asking for more than we have should only quote what we actually hold
+    too_much = strategy.estimatedTotalAssets() * 2
+    (liquidated, preview_loss, shares) = strategy.previewLiquidate(too_much)
+    assert liquidated < too_much
+    assert preview_loss == 0
+    assert shares <= strategy.balanceOfVault()
+
+
+# with a destination that can only pay out part of what we ask for, our quote and the real withdrawal should both fill
+# partially instead of reverting
+def test_preview_liquidate_illiquid(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    profit_whale,
+    profit_amount,
+    target,
+    use_v3,
+    destination_vault,
+    use_old,
+):
+    # only V3 destinations tell us how much we can redeem
+    if not use_v3 or use_old:
+        pytest.skip("new V3 only")
+
+    ## deposit to the vault after approving
+    token.approve(vault, 2**256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    harvest_strategy(
+        use_v3,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        target,
+        destination_vault,
+    )
+    to_withdraw = strategy.estimatedTotalAssets() // 2
+
+    # move most of our destination's idle funds into its strategy, and stop it from pulling them back out
+    role_manager = accounts.at(destination_vault.role_manager(), force=True)
+    destination_vault.set_role(role_manager, 2**14 - 1, {"from": role_manager})
+    destination_vault.set_minimum_total_idle(0, {"from": role_manager})
+    destination_vault.update_max_debt_for_strategy(
+        target, 2**256 - 1, {"from": role_manager}
+    )
+    liquid = to_withdraw // 4
+    current_debt = destination_vault.strategies(target)["current_debt"]
+    destination_vault.update_debt(
+        target,
+        current_debt + destination_vault.totalIdle() - liquid,
+        {"from": role_manager},
+    )
+    destination_vault.set_default_queue([], {"from": role_manager})
+    assert destination_vault.totalIdle() == liquid
+
+    # we can only get part of it, and too much to call it dust
+    (liquidated, preview_loss, shares) = strategy.previewLiquidate(to_withdraw)
+    print("Quoted:", liquidated, "Loss:", preview_loss, "Shares:", shares)
+    assert shares == destination_vault.maxRedeem(strategy, strategy.maxLoss())
+    assert 0 < liquidated < to_withdraw
+    assert preview_loss == 0
+
+    vault_account = accounts.at(vault, force=True)
+    vault_before = token.balanceOf(vault)
+    shares_before = strategy.balanceOfVault()
+    strategy.withdraw(to_withdraw, {"from": vault_account})
+    assert token.balanceOf(vault) - vault_before == liquidated
+    assert shares_before - strategy.balanceOfVault() == shares
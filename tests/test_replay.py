@@ -0,0 +1,66 @@
+import os
+from pathlib import Path
+import pytest
+from scripts.replay import Replayer, load_events
+from utils import trade_handler_action
+
+# real traffic for our origin vault, exported to a file. point ROUTER_REPLAY_EVENTS at your own export, or use the
+# small sample we keep in data/
+EVENTS = os.environ.get(
+    "ROUTER_REPLAY_EVENTS",
+    str(Path(__file__).parent.parent / "data" / "replay_sample.jsonl"),
+)
+
+
+def test_replay(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    profit_whale,
+    target,
+    use_v3,
+    use_old,
+    destination_vault,
+):
+    events = load_events(EVENTS)
+    assert events == sorted(
+        events, key=lambda x: (x["blockNumber"], x.get("logIndex", 0))
+    )
+
+    replayer = Replayer(
+        events,
+        amount=amount,
+        token=token,
+        vault=vault,
+        whale=whale,
+        gov=gov,
+        strategy=strategy,
+        target=target,
+        profit_whale=profit_whale,
+        use_v3=use_v3,
+        destination_vault=destination_vault,
+        trade_handler_action=trade_handler_action,
+    )
+    report = replayer.run()
+    print(report)
+    if os.environ.get("ROUTER_REPLAY_REPORT"):
+        replayer.write(os.environ["ROUTER_REPLAY_REPORT"])
+
+    assert report["ops"]["deposit"]["count"] > 0
+    assert report["ops"]["withdraw"]["count"] > 0
+    assert report["ops"]["harvest"]["count"] > 0
+
+    # one local stand-in for every address in our export
+    assert len(replayer.users) == len(
+        {x["args"]["recipient"] for x in events if "recipient" in x["args"]}
+    )
+
+    # our old routers are here for comparison, only the new ones promise rounding-sized losses
+    if use_old:
+        pytest.skip("old routers are replayed for comparison only")
+    for op in ("deposit", "withdraw"):
+        assert report["ops"][op]["loss_max"] <= 10
+    assert report["ops"]["harvest"]["loss_total"] == 0
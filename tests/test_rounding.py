@@ -0,0 +1,60 @@
+import math
+import random
+from scripts.rounding import analyze, recommend, round_trip
+
+
+# the same round trip with python ints, one row at a time
+def reference(round_up, supply, funds, amount, held):
+    shares = amount * supply // funds
+    (supply, funds) = (supply + shares, funds + amount)
+    to_redeem = amount * supply // funds + (round_up and amount * supply % funds > 0)
+    return min(to_redeem, shares + held) * funds // supply
+
+
+def test_round_trip_matches_ints():
+    rng = random.Random(3)
+    rows = [
+        (
+            rng.randrange(1, 10**30),
+            rng.randrange(1, 10**30),
+            rng.randrange(1, 10**24),
+            rng.choice([0, rng.randrange(10**24)]),
+        )
+        for _ in range(500)
+    ]
+    (supply, funds, amounts, held) = (list(x) for x in zip(*rows))
+    for router, round_up in (("v2", True), ("v2-old", False)):
+        result = round_trip(router, 18, supply, funds, amounts, held)
+        expected = [reference(round_up, *x) for x in rows]
+        assert result["received"].to_ints() == expected
+        assert result["shortfall"].to_ints() == [
+            max(a - r, 0) for a, r in zip(amounts, expected)
+        ]
+
+
+def test_rounding_sweep():
+    rows = analyze(decimals=(6, 18), sizes=(1, 1_000_000), samples=200)
+    for row in rows:
+        # never more than a share's worth, plus a wei, short
+        assert row["worst"] <= math.ceil(row["prices"][1]) + 1
+        assert row["dust_threshold"] == row["worst"] + 1
+
+    # rounding shares up only ever leaves us better off
+    def find(router, decimals, prices, size):
+        return next(
+            x
+            for x in rows
+            if (x["router"], x["decimals"], x["prices"], x["size"])
+            == (router, decimals, prices, size)
+        )
+
+    key = (6, (1.0, 1.01), 1_000_000)
+    assert find("v2", *key)["expected"] < find("v2-old", *key)["expected"]
+    assert find("v3", *key)["worst"] <= find("v2-old", *key)["worst"]
+
+    # pricePerShare loses most of a token's last digits on a big position, the helper loses a wei or two
+    assert find("pps", *key)["report_worst"] > 1_000
+    assert find("v2", *key)["report_worst"] <= 2
+
+    # share price near 1, our default dustThreshold of 10 is plenty
+    assert recommend("v2", 6, 10**12, 10**12)["dust_threshold"] <= 10
@@ -0,0 +1,26 @@
+from brownie import chain
+from rpc_stats import RpcStats
+
+
+# calls through web3 and brownie's direct evm_* calls should both be counted, once each
+def test_rpc_stats_counts_calls(token, whale):
+    stats = RpcStats("reports/test_rpc_stats.json")
+    stats.wrap_provider()
+    try:
+        stats.current = "probe"
+        token.balanceOf(whale)
+        chain.sleep(1)
+    finally:
+        stats.unwrap_provider()
+
+    methods = stats.tests["probe"]["methods"]
+    assert methods["eth_call"][0] == 1
+    assert methods["evm_increaseTime"][0] == 1
+    assert any(
+        x.endswith(("balanceOf", "0x70a08231"))
+        for x in stats.tests["probe"]["functions"]
+    )
+
+    # once unwrapped we stop counting
+    token.balanceOf(whale)
+    assert methods["eth_call"][0] == 1
@@ -0,0 +1,47 @@
+import pytest
+from scenario import SCENARIOS, ScenarioRunner
+
+
+# our donation and withdrawal tests, written as data. setup transactions between harvests share a block
+@pytest.mark.parametrize("name", SCENARIOS)
+def test_scenario(
+    name,
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    is_slippery,
+    no_profit,
+    profit_whale,
+    profit_amount,
+    target,
+    RELATIVE_APPROX,
+    vault_address,
+    use_v3,
+    destination_vault,
+):
+    scenario = SCENARIOS[name]
+    runner = ScenarioRunner(
+        gov=gov,
+        token=token,
+        vault=vault,
+        whale=whale,
+        strategy=strategy,
+        amount=amount,
+        is_slippery=is_slippery,
+        no_profit=no_profit,
+        profit_whale=profit_whale,
+        profit_amount=profit_amount,
+        target=target,
+        RELATIVE_APPROX=RELATIVE_APPROX,
+        vault_address=vault_address,
+        use_v3=use_v3,
+        destination_vault=destination_vault,
+    )
+    runner.run(scenario["steps"])
+    runner.check(scenario["expect"])
+
+    # every batch of setup calls should have landed in a single block
+    print("Batched blocks mined:", runner.blocks_mined)
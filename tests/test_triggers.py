@@ -2,6 +2,11 @@ import brownie
 from brownie import chain, Contract, ZERO_ADDRESS, accounts
 import pytest
 from utils import harvest_strategy, check_status, trade_handler_action
+from scripts.trigger_gas import compare
+
+# yearn's lens oracle and WETH on mainnet, where we point our V3 router's price refreshes
+YEARN_ORACLE = "0x83d95e0D5f402511dB06817Aff3f9eA88224B030"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
 
 
 # test our harvest triggers
@@ -156,3 +161,178 @@ def test_triggers(
         )
     else:
         assert token.balanceOf(whale) > starting_whale
+
+
+# our V3 router can harvest on profit once it covers the keeper's call cost, priced with a rate our keeper caches
+def test_profit_factor_trigger(
+    gov,
+    keeper,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    sleep_time,
+    profit_whale,
+    profit_amount,
+    target,
+    use_v3,
+    use_old,
+    destination_vault,
+):
+    if not use_v3 or use_old:
+        pytest.skip("new V3 only")
+
+    ## deposit to the vault after approving
+    token.approve(vault, 2**256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.setMaxReportDelay(86400 * 21, {"from": gov})
+    strategy.setCreditThreshold(1e24, {"from": gov})
+
+    # no cached price yet, so call cost is free and profit alone never triggers
+    assert strategy.wantPerEth() == 0
+    assert strategy.ethToWant(1e18) == 0
+
+    # only management can change our factor
+    with brownie.reverts():
+        strategy.setProfitFactor(100, {"from": whale})
+    strategy.setProfitFactor(100, {"from": gov})
+
+    # our harvest doesn't touch the oracle, and neither does our keeper until we set one
+    (profit, loss, extra) = harvest_strategy(
+        use_v3,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        target,
+        destination_vault,
+    )
+    assert strategy.wantPerEth() == 0
+    strategy.updateWantPerEth({"from": keeper})
+    assert strategy.wantPerEth() == 0
+
+    # only our keepers and management can refresh our price, and only management can set our oracle
+    with brownie.reverts():
+        strategy.setOracle(YEARN_ORACLE, WETH, {"from": whale})
+    strategy.setOracle(YEARN_ORACLE, WETH, {"from": gov})
+    with brownie.reverts():
+        strategy.updateWantPerEth({"from": whale})
+    strategy.updateWantPerEth({"from": keeper})
+    rate = strategy.wantPerEth()
+    assert rate > 0
+    assert strategy.ethToWant(1e18) == rate
+
+    # generate some claimable profit
+    chain.sleep(sleep_time)
+    trade_handler_action(
+        target,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        use_v3,
+        destination_vault,
+    )
+    claimable = strategy.claimableProfits()
+    assert claimable > 0
+
+    # call cost just under and just over 1/100th of our profit, converted back to ETH
+    cheap = (claimable // 100 - 1) * 10**18 // rate
+    expensive = (claimable // 100 + 1) * 10**18 // rate + 1
+    tx = strategy.harvestTrigger(cheap, {"from": gov})
+    print("\nShould we harvest? Should be true.", tx)
+    assert tx == True
+    tx = strategy.harvestTrigger(expensive, {"from": gov})
+    print("\nShould we harvest? Should be false.", tx)
+    assert tx == False
+
+    # a keeper that doesn't tell us its cost doesn't get a profit trigger
+    tx = strategy.harvestTrigger(0, {"from": gov})
+    print("\nShould we harvest? Should be false.", tx)
+    assert tx == False
+
+    # turning it off falls back to our other triggers
+    strategy.setProfitFactor(0, {"from": gov})
+    tx = strategy.harvestTrigger(cheap, {"from": gov})
+    print("\nShould we harvest? Should be false.", tx)
+    assert tx == False
+
+
+# our old router caches its want price so keepers don't pay for the lens oracle on every trigger call
+def test_cached_usdc_price_trigger(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    profit_whale,
+    profit_amount,
+    target,
+    use_v3,
+    use_old,
+    destination_vault,
+):
+    if use_v3 or not use_old:
+        pytest.skip("old V2 only")
+
+    ## deposit to the vault after approving
+    token.approve(vault, 2**256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+
+    # nothing cached yet, so we ask the oracle
+    assert strategy.wantPriceUpdated() == 0
+    oracle = Contract.from_abi(
+        "Oracle",
+        strategy.yearnOracle(),
+        [
+            {
+                "name": "getPriceUsdcRecommended",
+                "type": "function",
+                "stateMutability": "view",
+                "inputs": [{"name": "", "type": "address"}],
+                "outputs": [{"name": "", "type": "uint256"}],
+            }
+        ],
+    )
+    assert oracle.getPriceUsdcRecommended(token) > 0
+
+    # our harvest caches the oracle's price
+    (profit, loss, extra) = harvest_strategy(
+        use_v3,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        target,
+        destination_vault,
+    )
+    assert strategy.wantPriceInUsdc() == oracle.getPriceUsdcRecommended(token)
+    # harvest_strategy mines one more block after our harvest
+    assert chain[-2].timestamp <= strategy.wantPriceUpdated() <= chain[-1].timestamp
+
+    # compare gas for our trigger's eth_call before and after caching
+    (live, cached) = compare(strategy, gov)
+    print("\nTrigger gas with oracle:", live, "with cache:", cached)
+    assert cached < live
+
+    # anyone can refresh it, only management can change how long it lasts
+    chain.sleep(strategy.maxPriceAge() + 1)
+    tx = strategy.updateWantPrice({"from": whale})
+    assert strategy.wantPriceUpdated() == chain[tx.block_number].timestamp
+    with brownie.reverts():
+        strategy.setMaxPriceAge(0, {"from": whale})
+    strategy.setMaxPriceAge(3600, {"from": gov})
+    assert strategy.maxPriceAge() == 3600
+
+    # a stale price isn't used, we go back to the oracle
+    chain.sleep(3601)
+    chain.mine(1)
+    assert strategy.claimableProfitInUsdc() == (
+        strategy.claimableProfits()
+        * oracle.getPriceUsdcRecommended(token)
+        // 10 ** destination_vault.decimals()
+    )
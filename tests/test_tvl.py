@@ -0,0 +1,53 @@
+from brownie import chain
+from scripts.tvl import PortfolioTVL
+
+
+# our router's funds sit in both our vault and its destination, make sure we only count them once
+def test_portfolio_tvl(
+    gov,
+    token,
+    vault,
+    funded_router,
+    destination_vault,
+    contract_name,
+    strategy_name,
+):
+    strategy = funded_router
+    block = chain.height
+
+    # we should find our router, and pull its destination into our graph even though we only gave our vault
+    portfolio = PortfolioTVL([vault.address])
+    graph = portfolio.discover(block)
+    assert graph[strategy.address]["origin"] == vault.address
+    assert graph[strategy.address]["destinations"] == [destination_vault.address]
+
+    # both vaults' total assets, less what our router delegated from one to the other
+    expected = (
+        vault.totalAssets(block_identifier=block)
+        + destination_vault.totalAssets(block_identifier=block)
+        - strategy.delegatedAssets(block_identifier=block)
+    )
+    assert strategy.delegatedAssets(block_identifier=block) > 0
+    tvl = portfolio.tvl_at(block)
+    assert tvl == {token.address: expected}
+
+    # same block again comes from our cache
+    assert portfolio.tvl_at(block) is tvl
+    assert [x for x, _ in portfolio.tvl_range(block - 2, block)] == [
+        block - 2,
+        block - 1,
+        block,
+    ]
+
+    # migrating moves our debt to a new router, we should follow it there instead of counting our funds twice
+    new_strategy = gov.deploy(contract_name, vault, destination_vault, strategy_name)
+    vault.migrateStrategy(strategy, new_strategy, {"from": gov})
+    block = chain.height
+    tvl = portfolio.tvl_at(block)
+    assert new_strategy.address in portfolio.routers
+    assert strategy.address not in portfolio.routers
+    assert tvl == {
+        token.address: vault.totalAssets(block_identifier=block)
+        + destination_vault.totalAssets(block_identifier=block)
+        - new_strategy.delegatedAssets(block_identifier=block)
+    }
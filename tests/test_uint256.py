@@ -0,0 +1,147 @@
+import random
+import itertools
+import pytest
+import numpy as np
+from scripts.uint256 import Uint256Array
+
+MODULUS = 2**256
+
+# values where limb carries, borrows and division corrections like to go wrong
+EDGES = sorted(
+    {0, 1, 2, 3, 10**6, 10**18, 10**24, MODULUS - 1, MODULUS - 2}
+    | {
+        2**k + d
+        for k in (31, 32, 33, 63, 64, 65, 96, 128, 160, 192, 224, 255)
+        for d in (-1, 0, 1)
+    }
+)
+
+
+# mix of bit widths, with extra all-ones and single-bit values
+def random_values(count, seed):
+    rng = random.Random(seed)
+    values = []
+    for _ in range(count):
+        bits = rng.choice([1, 8, 31, 32, 33, 63, 64, 65, 90, 128, 129, 200, 255, 256])
+        roll = rng.random()
+        if roll < 0.1:
+            values.append(2**bits - 1)
+        elif roll < 0.15:
+            values.append(2 ** (bits - 1))
+        else:
+            values.append(rng.getrandbits(bits))
+    return values
+
+
+def pairs():
+    edges = list(itertools.product(EDGES, EDGES))
+    randoms = list(zip(random_values(20_000, 1), random_values(20_000, 2)))
+    (a, b) = zip(*(edges + randoms))
+    return (list(a), list(b))
+
+
+# compare every op against python ints on every pair of edge values and a big batch of random ones
+def test_uint256_wrapping_math():
+    (a, b) = pairs()
+    (x, y) = (Uint256Array.from_ints(a), Uint256Array.from_ints(b))
+    assert x.to_ints() == a
+
+    assert (x + y).to_ints() == [(i + j) % MODULUS for i, j in zip(a, b)]
+    assert (x - y).to_ints() == [(i - j) % MODULUS for i, j in zip(a, b)]
+    assert (x * y).to_ints() == [(i * j) % MODULUS for i, j in zip(a, b)]
+
+    assert list(x < y) == [i < j for i, j in zip(a, b)]
+    assert list(x <= y) == [i <= j for i, j in zip(a, b)]
+    assert list(x > y) == [i > j for i, j in zip(a, b)]
+    assert list(x >= y) == [i >= j for i, j in zip(a, b)]
+    assert list(x == y) == [i == j for i, j in zip(a, b)]
+    assert list(x != y) == [i != j for i, j in zip(a, b)]
+
+
+def test_uint256_division():
+    (a, b) = pairs()
+    b = [j or 1 for j in b]
+    (x, y) = (Uint256Array.from_ints(a), Uint256Array.from_ints(b))
+
+    assert (x // y).to_ints() == [i // j for i, j in zip(a, b)]
+    assert (x % y).to_ints() == [i % j for i, j in zip(a, b)]
+    assert x.ceildiv(y).to_ints() == [-(-i // j) for i, j in zip(a, b)]
+
+    # and the other way around, so we get plenty of small numerators over big denominators
+    a = [i or 1 for i in a]
+    x = Uint256Array.from_ints(a)
+    assert (y // x).to_ints() == [j // i for i, j in zip(a, b)]
+    assert (y % x).to_ints() == [j % i for i, j in zip(a, b)]
+
+
+def test_uint256_mul_div():
+    (a, b) = pairs()
+    c = random_values(len(a), 3)
+    c = [k or 1 for k in c]
+
+    # only keep rows that fit, mulDiv reverts on the rest
+    rows = [i for i in range(len(a)) if -(-a[i] * b[i] // c[i]) < MODULUS]
+    (a, b, c) = ([a[i] for i in rows], [b[i] for i in rows], [c[i] for i in rows])
+    (x, y, z) = (Uint256Array.from_ints(v) for v in (a, b, c))
+
+    assert x.mul_div(y, z).to_ints() == [i * j // k for i, j, k in zip(a, b, c)]
+    assert x.mul_div(y, z, round_up=True).to_ints() == [
+        -(-i * j // k) for i, j, k in zip(a, b, c)
+    ]
+
+    with pytest.raises(OverflowError):
+        Uint256Array.from_ints([MODULUS - 1]).mul_div(2, 1)
+    with pytest.raises(OverflowError):
+        Uint256Array.from_ints([MODULUS - 1]).mul_div(MODULUS - 1, MODULUS - 2, True)
+
+
+# solidity 0.8 reverts on these unless we're in an unchecked block
+def test_uint256_checked_math():
+    x = Uint256Array.from_ints([MODULUS - 1, 5])
+    with pytest.raises(OverflowError):
+        x.checked_add(1)
+    with pytest.raises(OverflowError):
+        x.checked_sub(6)
+    with pytest.raises(OverflowError):
+        x.checked_mul(2)
+    with pytest.raises(ZeroDivisionError):
+        x // Uint256Array.from_ints([1, 0])
+
+    y = Uint256Array.from_ints([1, 5])
+    assert y.checked_add(1).to_ints() == [2, 6]
+    assert y.checked_sub(1).to_ints() == [0, 4]
+    assert y.checked_mul(2**200).to_ints() == [2**200, 5 * 2**200]
+
+
+# plain ints broadcast across the whole array, like a vault-wide total over many positions
+def test_uint256_broadcasting():
+    amounts = random_values(1_000, 4)
+    x = Uint256Array.from_ints(amounts)
+    total_supply = 12_345_678 * 10**18
+    total_assets = 13_000_000 * 10**18 + 7
+
+    expected = [i * total_supply // total_assets for i in amounts]
+    fits = [i for i in range(len(amounts)) if amounts[i] * total_supply < MODULUS]
+    small = x[np.array(fits)]
+    assert (small * total_supply // total_assets).to_ints() == [
+        expected[i] for i in fits
+    ]
+    assert x.mul_div(total_supply, total_assets).to_ints() == expected
+    assert (1 - x).to_ints() == [(1 - i) % MODULUS for i in amounts]
+    assert x[0] == amounts[0]
+
+    with pytest.raises(ValueError):
+        Uint256Array.from_ints([-1])
+    with pytest.raises(ValueError):
+        Uint256Array.from_ints([MODULUS])
+
+
+def test_uint256_selection():
+    (a, b) = pairs()
+    (x, y) = (Uint256Array.from_ints(a), Uint256Array.from_ints(b))
+
+    assert x.minimum(y).to_ints() == [min(i, j) for i, j in zip(a, b)]
+    assert x.maximum(y).to_ints() == [max(i, j) for i, j in zip(a, b)]
+    assert x.where(x > y, 7).to_ints() == [i if i > j else 7 for i, j in zip(a, b)]
+    # only as close as float64 gets
+    assert list(x.to_floats()) == pytest.approx([float(i) for i in a], rel=1e-15)
@@ -0,0 +1,132 @@
+import pytest
+from brownie import chain
+from scripts.withdraw_sim import simulate, snapshot
+
+# idle funds, a plain strategy, then a router whose destination is at 1.1 share price
+STATE = {
+    "total_supply": 1_000_000,
+    "free_funds": 1_000_000,
+    "idle": 1_000,
+    "queue": [
+        {"address": "plain", "total_debt": 9_000, "assets": 9_000},
+        {
+            "address": "router",
+            "total_debt": 990_000,
+            "assets": 990_000,
+            "router": {
+                "loose": 100,
+                "shares": 900_000,
+                "dust_threshold": 10,
+                "max_loss": 0,
+                "destination": {
+                    "total_supply": 10_000_000,
+                    "free_funds": 11_000_000,
+                    "idle": 50_000,
+                    "strategy_debts": [500_000, 10_450_000],
+                },
+                "destination_loss_bps": 0,
+            },
+        },
+    ],
+}
+
+
+# walk our queue for a grid of sizes, with every size checked against what we'd expect by hand
+def test_withdraw_sim_paths():
+    amounts = [500, 5_000, 10_050, 500_000, 990_000, 1_000_000]
+    result = simulate(STATE, amounts)
+    steps = result["strategies"]
+
+    # idle covers the first, the plain strategy the second, and the router everything past that
+    assert list(steps["plain"]["touched"]) == [False, True, True, True, True, True]
+    assert list(steps["router"]["touched"]) == [False, False, True, True, True, True]
+    assert result["received"].to_ints()[:3] == amounts[:3]
+    assert steps["plain"]["freed"].to_ints()[1] == 4_000
+
+    # the router's loose want covers 50, so it doesn't redeem anything for that one
+    assert list(steps["router"]["redeeming"]) == [False, False, False, True, True, True]
+
+    # the destination pays from idle, then its first strategy, then its second
+    assert list(steps["router"]["destination_strategies"]) == [0, 0, 0, 1, 2, 2]
+    assert (result["loss"] == 0).all()
+    assert not result["reverted"].any()
+
+    # more gas the deeper we go
+    gas = list(result["gas"])
+    assert gas == sorted(gas)
+
+
+def test_withdraw_sim_losses():
+    # our router's shares are worth 5 wei less than its debt, so that much is dust and gets reported as a loss
+    router = dict(STATE["queue"][1]["router"], loose=0, shares=899_996)
+    state = dict(STATE, idle=0, queue=[dict(STATE["queue"][1], router=router)])
+    result = simulate(state, [990_000])
+    assert result["loss"].to_ints() == [5]
+    assert result["received"].to_ints() == [989_995]
+
+    # past dust we come back short instead, and the vault only burns shares for what it paid
+    router["shares"] = 899_900
+    result = simulate(state, [990_000])
+    assert result["loss"].to_ints() == [0]
+    assert result["received"].to_ints() == [989_890]
+    assert result["shares"].to_ints() == [989_890]
+
+    # a dust loss still has to fit under the vault's maxLoss
+    state = dict(state, queue=[dict(state["queue"][0], total_debt=20)])
+    router["shares"] = 17
+    result = simulate(state, [20], max_loss=1)
+    assert result["loss"].to_ints() == [2]
+    assert list(result["reverted"]) == [True]
+
+    # a lossy destination reverts past our router's maxLoss
+    router = dict(STATE["queue"][1]["router"], destination_loss_bps=50)
+    state = dict(STATE, queue=[dict(STATE["queue"][1], router=router)])
+    assert list(simulate(state, [500, 500_000])["reverted"]) == [False, True]
+
+    router["max_loss"] = 100
+    assert list(simulate(state, [500, 500_000])["reverted"]) == [False, False]
+
+    # our V3 routers only redeem what their destination can pay within maxLoss instead, here just its idle funds
+    router = dict(
+        STATE["queue"][1]["router"], destination_loss_bps=50, caps_redeem=True
+    )
+    state = dict(STATE, idle=0, queue=[dict(STATE["queue"][1], router=router)])
+    result = simulate(state, [500, 500_000])
+    assert not result["reverted"].any()
+    assert result["received"].to_ints() == [500, 100 + 49_999]
+    assert (result["loss"] == 0).all()
+
+    # and everything it has when its strategies are fine
+    router["destination_loss_bps"] = 0
+    assert simulate(state, [500_000])["received"].to_ints() == [500_000]
+
+
+# our simulation should match a real withdrawal on the fork
+def test_withdraw_sim_fork(
+    token,
+    vault,
+    whale,
+    funded_router,
+    amount,
+    RELATIVE_APPROX,
+):
+    strategy = funded_router
+    chain.sleep(1)
+    chain.mine(1)
+
+    state = snapshot(vault.address)
+    assert state["queue"][0]["address"] == strategy.address
+    assert "router" in state["queue"][0]
+
+    to_withdraw = amount // 2
+    result = simulate(state, [amount // 10, to_withdraw, amount])
+    assert list(result["strategies"][strategy.address]["touched"])[1]
+    received = result["received"].to_ints()
+    assert received == sorted(received)
+
+    before = token.balanceOf(whale)
+    vault.withdraw(result["shares"][1], whale, 1, {"from": whale})
+    assert (
+        pytest.approx(token.balanceOf(whale) - before, rel=RELATIVE_APPROX)
+        == received[1]
+    )
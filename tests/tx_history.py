@@ -0,0 +1,124 @@
+import gc
+from collections import deque
+
+import psutil
+import pytest
+from brownie import history
+from brownie.network import rpc
+
+# only there on unix, we go without our peak memory elsewhere
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# receipt attributes holding a trace, brownie fetches these again from the node if anything asks for them later
+TRACE_ATTRIBUTES = ("_raw_trace", "_trace", "_subcalls", "_modified_state")
+
+
+# keep brownie's tx history and our node from growing without bound over a long session
+class BoundedHistory:
+    def __init__(self, node, keep=200, compact_every=50):
+        self.node = node
+        self.keep = keep
+        self.compact_every = compact_every
+        self.tests_run = 0
+        self.compacted_at = 0
+        self.failed = False
+        self.kept = {}
+        self.recent = deque(maxlen=keep)
+        self.dropped_receipts = 0
+        self.dropped_traces = 0
+        self.compactions = []
+        self.samples = {}
+        self.peak = None
+
+    # sample our own memory and our node's, in MB
+    @staticmethod
+    def memory():
+        python = psutil.Process().memory_info().rss / 1e6
+        process = getattr(rpc, "process", None)
+        try:
+            node = process.memory_info().rss / 1e6 if process else None
+        except psutil.Error:
+            node = None
+        return {"python": python, "node": node}
+
+    def strip_traces(self, receipts):
+        for tx in receipts:
+            if id(tx) in self.kept:
+                continue
+            if any(getattr(tx, x, None) is not None for x in TRACE_ATTRIBUTES):
+                self.dropped_traces += 1
+            for attribute in TRACE_ATTRIBUTES:
+                setattr(tx, attribute, None)
+
+    # move this test's receipts out of brownie's history and into our own, which only holds the last few
+    def trim(self, receipts):
+        self.dropped_receipts += max(len(self.recent) + len(receipts) - self.keep, 0)
+        self.recent.extend(receipts)
+        history.clear()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item):
+        if not self.samples:
+            self.samples["start"] = self.memory()
+        self.failed = False
+        yield
+
+        # history only holds this test's receipts, we clear it after every test
+        receipts = list(history)
+
+        # hang on to a failing test's receipts and traces so we can still dig into them
+        if self.failed:
+            self.kept.update((id(tx), tx) for tx in receipts)
+        self.strip_traces(receipts)
+        self.trim(receipts)
+        gc.collect()
+
+        self.tests_run += 1
+
+    # only compact between modules, once the last one's fixtures are finalized and the next one's aren't set up yet,
+    # so no fixture is holding on to anything from the node we replace
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        yield
+        if nextitem is None or nextitem.module is item.module:
+            return
+        if self.tests_run - self.compacted_at < self.compact_every:
+            return
+
+        self.compacted_at = self.tests_run
+        before = self.memory()
+        if self.node.compact():
+            self.compactions.append((before, self.memory()))
+
+    def pytest_runtest_logreport(self, report):
+        if report.failed:
+            self.failed = True
+
+    def pytest_sessionfinish(self, session):
+        self.samples["end"] = self.memory()
+        # ru_maxrss is in KB on linux
+        if resource is not None:
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+    def pytest_terminal_summary(self, terminalreporter):
+        write = terminalreporter.write_line
+        terminalreporter.section("memory")
+        for label, sample in self.samples.items():
+            node = f"{sample['node']:8.1f} MB" if sample["node"] else "       n/a"
+            write(f"  {label:<6} python {sample['python']:8.1f} MB, node {node}")
+        if self.peak is not None:
+            write(f"  peak   python {self.peak:8.1f} MB")
+        write(
+            f"Kept {len(self.recent)} receipts, dropped {self.dropped_receipts} receipts and "
+            f"{self.dropped_traces} traces"
+        )
+        for before, after in self.compactions:
+            if before["node"] and after["node"]:
+                write(
+                    f"  compacted our node from {before['node']:.1f} MB to {after['node']:.1f} MB"
+                )
+        if not self.compactions:
+            write("Never compacted our node")
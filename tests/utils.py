@@ -1,7 +1,18 @@
 import pytest
 import brownie
-from brownie import interface, chain, accounts, Contract
+from brownie import interface, chain, accounts, Contract, web3
 import time
+from abi_registry import resolve_contract
+
+# token address => (balance mapping slot, whether the mapping uses vyper's key ordering)
+balance_slots = {}
+
+# json-rpc methods for writing storage, whichever one our node accepts gets moved to the front
+storage_methods = [
+    "anvil_setStorageAt",
+    "hardhat_setStorageAt",
+    "evm_setAccountStorageAt",
+]
 
 
 # returns (profit, loss) of a harvest
@@ -48,7 +59,7 @@ def harvest_strategy(
     # do hacky workaround for V3 version...anvil/brownie seems to struggle with it
     if use_v3:
         # check gain before
-        vault = Contract(strategy.vault())
+        vault = resolve_contract(strategy.vault())
         before_gain = vault.strategies(strategy)["totalGain"]
         before_loss = vault.strategies(strategy)["totalLoss"]
         # we can use the tx for debugging if needed
@@ -113,9 +124,8 @@ def trade_handler_action(
         target_tx = destination_strategy.harvest({"from": gov})
         target_profit = target_tx.events["Harvested"]["profit"]
 
-    # sleep 5 days so share price normalizes
-    chain.sleep(86400 * 5)
-    chain.mine(1)
+    # sleep until our destination's profit is fully unlocked so share price normalizes
+    sleep_until_unlocked(destination_vault, use_v3)
 
     # make sure we made a profit
     assert target_profit > 0
@@ -125,6 +135,25 @@ def trade_handler_action(
     return 0
 
 
+# warp only as far as needed for a vault's locked profit to fully unlock, returns how long we slept
+def sleep_until_unlocked(vault, use_v3):
+    now = chain.time()
+    if use_v3:
+        # zero if nothing is unlocking
+        remaining = vault.fullProfitUnlockDate() - now
+    else:
+        # V2 unlocks lockedProfitDegradation / 1e18 of locked profit per second since lastReport, round up
+        degradation = vault.lockedProfitDegradation()
+        unlock_time = -(-(10**18) // degradation) if degradation > 0 else 0
+        remaining = vault.lastReport() + unlock_time - now
+
+    remaining = max(remaining, 0)
+    if remaining > 0:
+        chain.sleep(remaining)
+    chain.mine(1)
+    return remaining
+
+
 # do a check on our strategy and vault of choice
 def check_status(
     strategy,
@@ -199,3 +228,62 @@ def check_status(
         )
 
     return strategy_params
+
+
+# give an account tokens by writing its balance straight into the token's storage, no whale needed
+def fund_account(token, account, amount):
+    address = str(account)
+    (slot, is_vyper) = find_balance_slot(token)
+    key = balance_key(address, slot, is_vyper)
+    set_storage(token.address, key, token.balanceOf(address) + amount)
+    assert token.balanceOf(address) >= amount
+
+
+# find which storage slot holds a token's balanceOf mapping, only need to do this once per token
+def find_balance_slot(token):
+    if token.address in balance_slots:
+        return balance_slots[token.address]
+
+    # use an address nobody holds tokens at, and poke each candidate slot until balanceOf sees it
+    probe = "0x000000000000000000000000000000000000dEaD"
+    probe_amount = 1337 * 10**18 + token.balanceOf(probe) + 1
+    for slot in range(50):
+        for is_vyper in (False, True):
+            key = balance_key(probe, slot, is_vyper)
+            original = web3.eth.get_storage_at(token.address, key)
+            set_storage(token.address, key, probe_amount)
+            found = token.balanceOf(probe) == probe_amount
+            set_storage(token.address, key, int.from_bytes(original, "big"))
+            if found:
+                balance_slots[token.address] = (slot, is_vyper)
+                return (slot, is_vyper)
+
+    raise ValueError(
+        "Couldn't find the balanceOf slot for this token. Is it a proxy or rebasing token?"
+    )
+
+
+# solidity hashes key then slot, vyper hashes slot then key
+def balance_key(address, slot, is_vyper):
+    address_bytes = bytes.fromhex(address[2:].rjust(64, "0"))
+    slot_bytes = slot.to_bytes(32, "big")
+    if is_vyper:
+        return int.from_bytes(web3.keccak(slot_bytes + address_bytes), "big")
+    return int.from_bytes(web3.keccak(address_bytes + slot_bytes), "big")
+
+
+# write a single storage slot on our local node, whichever flavor it is
+def set_storage(address, key, value):
+    params = [
+        address,
+        "0x" + key.to_bytes(32, "big").hex(),
+        "0x" + value.to_bytes(32, "big").hex(),
+    ]
+    for method in list(storage_methods):
+        response = web3.provider.make_request(method, params)
+        if "error" not in response:
+            # try this one first next time
+            storage_methods.remove(method)
+            storage_methods.insert(0, method)
+            return
+    raise ValueError("Our node doesn't let us write storage directly.")